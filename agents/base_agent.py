@@ -43,10 +43,60 @@ Classes:
                     • model (Ollama): Language model to be used by the tester.
                     • interactive (bool): Defines whether the process will be interactive.
 """
+import hashlib
 import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from utils.checkpoint import input_fingerprint
+from utils.llm_cache import LLMResponseCache
+from utils.ollama_client import generation_info
+from utils.run_log import emit_event, text_digest, text_preview
+from utils.token_budget import record_token_count
+from utils.tracing import estimate_tokens, span
 from utils.translation_utils import translate_string
 
+# Model parameters that do not change the generated text and must not be part of the cache key
+NON_DETERMINING_PARAMS = ("keep_alive", "headers", "timeout", "base_url")
+
+class GenerationOutcome:
+    """
+    Result of one prompt of BaseAgent.generate_many(): the generated text, or the error of its request.
+    """
+    __slots__ = ("prompt", "text", "error")
+
+    def __init__(self, prompt, text=None, error=None):
+        self.prompt = prompt
+        self.text = text
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f"GenerationOutcome(ok={self.ok}, chars={len(self.text or '')}, error={self.error!r})"
+
 class BaseAgent:
+    # On-disk response cache shared by every agent (see utils/llm_cache.py).
+    # None disables caching.
+    response_cache = None
+
+    # How prompts and responses are logged: "full" prints them entirely,
+    # "preview" prints the first log_preview_chars characters with a hash and size
+    log_verbosity = "full"
+    log_preview_chars = 500
+
+    # Evaluated prompt prefixes shared by every agent (see utils/prefix_context.py).
+    # None sends every prompt in full.
+    prefix_contexts = None
+
+    # Model-affinity gate of the model calls (see utils/model_scheduler.py). None sends them right away.
+    model_scheduler = None
+
+    # Requests sent concurrently by generate_many (the server's OLLAMA_NUM_PARALLEL)
+    max_in_flight = 1
+
     def __init__(self, name, llm, language, interactive):
         self.name = name
         self.llm = llm
@@ -54,52 +104,371 @@ class BaseAgent:
         self.interactive = interactive
         self.output = ""
 
-    def evaluate(self, prompt):
+    def _model_name(self):
+        return getattr(self.llm, "model", self.llm.__class__.__name__)
+
+    def _model_options(self):
+        """
+        Returns the generation options of the model that change its output.
+        """
+        try:
+            options = dict(self.llm._default_params)
+        except Exception:
+            options = {}
+        for param in NON_DETERMINING_PARAMS:
+            options.pop(param, None)
+        return options
+
+    def _cache_key(self, prompt):
+        """
+        Builds the response cache key from the model name, its generation options and the prompt.
+        """
+        return LLMResponseCache.make_key(self._model_name(), self._model_options(), prompt)
+
+    def input_fingerprint(self, *parts):
+        """
+        Fingerprint of the inputs of a generation done by this agent: model name and
+        options, language and the given parts (prompt templates, upstream outputs...).
+        """
+        return input_fingerprint(self._model_name(), self._model_options(), self.language, *parts)
+
+    def _cached_response(self, prompt):
+        """
+        Returns the cached response for the prompt, or None when there is no cache or no entry.
+        """
+        if self.response_cache is None:
+            return None
+        output = self.response_cache.get(self._cache_key(prompt))
+        if output is not None:
+            print(f"{translate_string('base_agent', 'base_agent_cache_hit', self.language).format(name=self.name)}")
+        return output
+
+    def _store_response(self, prompt, output):
+        """
+        Stores the model response in the cache, if there is one.
+        """
+        if self.response_cache is not None and isinstance(output, str):
+            self.response_cache.put(self._cache_key(prompt), output)
+
+    def _cache_status(self, cached):
+        """
+        Cache status recorded in the trace spans: "hit", "miss" or "off".
+        """
+        if self.response_cache is None or not self.response_cache.enabled:
+            return "off"
+        return "hit" if cached else "miss"
+
+    def _llm_span(self, operation, prompt):
+        """
+        Opens the trace span of an LLM call.
+        """
+        return span(operation, "llm", agent=self.name, model=self._model_name(),
+                    prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt))
+
+    def _finish_llm_span(self, llm_span, output, cached, generation_info=None, response_chars=None, prompt_chars=None):
+        """
+        Records the response size and cache status of an LLM call. Token counts reported
+        by the model (Ollama's prompt_eval_count / eval_count) replace the estimates.
+        """
+        if output is not None:
+            response_chars = len(output)
+        llm_span.set(response_chars=response_chars, cache=self._cache_status(cached),
+                     response_tokens=max(1, response_chars // 4) if response_chars else 0)
+        if generation_info:
+            if generation_info.get("prompt_eval_count") is not None:
+                llm_span.set(prompt_tokens=generation_info["prompt_eval_count"])
+                if prompt_chars:
+                    # Calibrates the prompt token estimates of the model (see utils/token_budget.py)
+                    record_token_count(self._model_name(), prompt_chars, generation_info["prompt_eval_count"])
+            if generation_info.get("eval_count") is not None:
+                llm_span.set(response_tokens=generation_info["eval_count"])
+
+    def _loggable(self, text):
+        """
+        Returns the text as it should appear in the run log, according to log_verbosity.
+        """
+        if self.log_verbosity == "preview":
+            return text_preview(text, self.log_preview_chars)
+        return text
+
+    def _log_prompt(self, prompt):
+        """
+        Logs the prompt sent to the model and returns the request start time.
+        """
+        print(f"\n{translate_string('base_agent', 'base_agent_evaluating_prompt', self.language).format(name=self.name, prompt=self._loggable(prompt))}")
+        emit_event("llm_request", agent=self.name, model=self._model_name(), prompt_chars=len(prompt), prompt_sha256=text_digest(prompt))
+        return time.perf_counter()
+
+    def _log_response(self, prompt, output, cached, started_at):
+        """
+        Logs the model response.
+        """
+        print(f"{translate_string('base_agent', 'base_agent_model_response', self.language).format(output=self._loggable(output))}")
+        self._emit_response_event(prompt, output, cached, started_at)
+
+    def _emit_response_event(self, prompt, output, cached, started_at, response_chars=None, response_sha256=None):
+        if output is not None:
+            response_chars = len(output)
+            response_sha256 = text_digest(output)
+        emit_event("llm_response", agent=self.name, model=self._model_name(), prompt_sha256=text_digest(prompt),
+                   response_chars=response_chars, response_sha256=response_sha256, cached=cached,
+                   seconds=round(time.perf_counter() - started_at, 3))
+
+    @contextmanager
+    def _model_turn(self, llm_span):
+        """
+        Waits for the turn of the agent's model in the model scheduler. The first call
+        admitted after a model swap unloads the evicted models and warms the new one up.
+        """
+        scheduler = self.model_scheduler
+        if scheduler is None:
+            yield
+            return
+        model = self._model_name()
+        started_at = time.perf_counter()
+        must_load, evicted = scheduler.acquire(model)
+        try:
+            llm_span.set(queue_seconds=round(time.perf_counter() - started_at, 3))
+            if must_load:
+                self._load_model(scheduler, model, evicted, llm_span)
+            yield
+        finally:
+            scheduler.release(model)
+
+    def _load_model(self, scheduler, model, evicted, llm_span):
+        load_seconds = None
+        try:
+            for evicted_model in evicted:
+                if hasattr(self.llm, "unload"):
+                    self.llm.unload(evicted_model)
+            if hasattr(self.llm, "warm_up"):
+                load_started_at = time.perf_counter()
+                self.llm.warm_up()
+                load_seconds = time.perf_counter() - load_started_at
+                llm_span.set(load_seconds=round(load_seconds, 3))
+            emit_event("model_loaded", model=model, evicted=evicted, seconds=load_seconds)
+        except Exception as e:
+            # The call itself loads the model when the warm-up fails
+            emit_event("model_load_error", model=model, error=str(e))
+        finally:
+            scheduler.loaded(model, load_seconds)
+
+    def _prefixed_request(self, prefix, prompt, llm_span):
+        """
+        Sends prefix + prompt as a continuation of the evaluated prefix state, when the
+        model supports it and the prefix is worth reusing.
+
+        Returns:
+            dict: The response object, or None when the full prompt must be sent instead.
+        """
+        store = self.prefix_contexts
+        if store is None or not store.usable(self.llm, prefix):
+            return None
+        try:
+            context = store.context(self.llm, prefix)
+            if context is not None:
+                data = self.llm.generate_with_context(prompt, context)
+                llm_span.set(prefix_chars=len(prefix), prefix_reused=True)
+                return data
+        except Exception as e:
+            # The server refused the state (e.g. model reloaded with other options): send the full prompt
+            store.forget(self.llm, prefix)
+            emit_event("prefix_context_error", agent=self.name, model=self._model_name(), error=str(e))
+        store.record_fallback()
+        return None
+
+    def evaluate(self, prompt, prefix=""):
         """
         Queries the Ollama model using the invoke() function.
 
         Parameters:
             prompt (str): The prompt to be used for the query.
+            prefix (str): Prompt prefix shared with other calls. It is sent before the prompt and,
+                when the model supports it, evaluated once and reused (see utils/prefix_context.py).
 
         Returns:
             str: The derived type or None if not found.
         """
-        try:
-            print(f"\n{translate_string('base_agent', 'base_agent_evaluating_prompt', self.language).format(name=self.name, prompt=prompt)}")
-            output = self.llm.invoke(prompt)
-            print(f"{translate_string('base_agent', 'base_agent_model_response', self.language).format(output=output)}")
-            self.output = output
-            return output
-        except Exception as e:
-            print(f"{translate_string('base_agent', 'base_agent_error_evaluating_prompt', self.language).format(error=e)}")
-            return None
+        full_prompt = f"{prefix}{prompt}"
+        with self._llm_span("evaluate", full_prompt) as llm_span:
+            try:
+                started_at = self._log_prompt(full_prompt)
+                output = self._cached_response(full_prompt)
+                cached = output is not None
+                if not cached:
+                    with self._model_turn(llm_span):
+                        data = self._prefixed_request(prefix, prompt, llm_span)
+                        output = data["response"] if data is not None else self.llm.invoke(full_prompt)
+                    self._store_response(full_prompt, output)
+                self._log_response(full_prompt, output, cached, started_at)
+                self._finish_llm_span(llm_span, output, cached)
+                self.output = output
+                return output
+            except Exception as e:
+                print(f"{translate_string('base_agent', 'base_agent_error_evaluating_prompt', self.language).format(error=e)}")
+                emit_event("llm_error", agent=self.name, model=self._model_name(), error=str(e))
+                llm_span.set(error=str(e))
+                return None
         
-    def generate(self, prompt):
+    def generate(self, prompt, prefix=""):
         """
         Queries the Ollama model using the generate() function.
 
         Parameters:
             prompt (str): The prompt to be used for the query.
+            prefix (str): Prompt prefix shared with other calls (see evaluate()).
 
         Returns:
             str: The derived type or None if not found.
         """
-        try:
-            print(f"\n{translate_string('base_agent', 'base_agent_evaluating_prompt', self.language).format(name=self.name, prompt=prompt)}")
-            output = self.llm.generate([prompt])
-            print(f"{translate_string('base_agent', 'base_agent_model_response', self.language).format(output=output.generations[0][0].text)}")
-            # Extract the text from the response (assuming it's in the first element of generations)
-            if hasattr(output, 'generations') and output.generations:
-                complete_response = output.generations[0][0]
-                final_response = complete_response.text
-                self.output = final_response  # Get the text from the first generation
-            else:
-                print(f"No generations found in the response.")
+        full_prompt = f"{prefix}{prompt}"
+        with self._llm_span("generate", full_prompt) as llm_span:
+            try:
+                return self._generate(full_prompt, prefix, prompt, llm_span)
+            except Exception as e:
+                print(f"{translate_string('base_agent', 'base_agent_error_evaluating_prompt', self.language).format(error=e)}")
+                emit_event("llm_error", agent=self.name, model=self._model_name(), error=str(e))
+                llm_span.set(error=str(e))
                 return None
+
+    def _generate(self, full_prompt, prefix, prompt, llm_span):
+        """
+        Body of generate(): the errors of the model call are raised to the caller.
+        """
+        started_at = self._log_prompt(full_prompt)
+        final_response = self._cached_response(full_prompt)
+        if final_response is not None:
+            self._log_response(full_prompt, final_response, True, started_at)
+            self._finish_llm_span(llm_span, final_response, True)
+            self.output = final_response
             return final_response
-        except Exception as e:
-            print(f"{translate_string('base_agent', 'base_agent_error_evaluating_prompt', self.language).format(error=e)}")
+        with self._model_turn(llm_span):
+            data = self._prefixed_request(prefix, prompt, llm_span)
+            if data is None:
+                output = self.llm.generate([full_prompt])
+        if data is not None:
+            final_response = data["response"]
+            self._log_response(full_prompt, final_response, False, started_at)
+            # Only the suffix was evaluated: the prompt token count is not calibrated on it
+            self._finish_llm_span(llm_span, final_response, False, generation_info(data))
+            self.output = final_response
+            self._store_response(full_prompt, final_response)
+            return final_response
+        # Extract the text from the response (assuming it's in the first element of generations)
+        if hasattr(output, 'generations') and output.generations:
+            complete_response = output.generations[0][0]
+            final_response = complete_response.text
+            self._log_response(full_prompt, final_response, False, started_at)
+            self._finish_llm_span(llm_span, final_response, False, getattr(complete_response, 'generation_info', None),
+                                  prompt_chars=len(full_prompt))
+            self.output = final_response  # Get the text from the first generation
+            self._store_response(full_prompt, final_response)
+        else:
+            print(f"No generations found in the response.")
             return None
+        return final_response
+
+    def generate_many(self, prompts, prefix="", max_in_flight=None):
+        """
+        Queries the model with several prompts concurrently, keeping at most max_in_flight
+        requests in flight (the server's OLLAMA_NUM_PARALLEL, see BaseAgent.max_in_flight).
+
+        Parameters:
+            prompts (list): The prompts to be used for the queries.
+            prefix (str): Prompt prefix shared by all the prompts (see evaluate()).
+            max_in_flight (int): Concurrent requests. Defaults to the class setting.
+
+        Returns:
+            list: A GenerationOutcome per prompt, in the order of the prompts. A failed
+            prompt carries its error instead of a text, without affecting the others.
+        """
+        limit = max(1, max_in_flight or self.max_in_flight)
+
+        def run(prompt):
+            full_prompt = f"{prefix}{prompt}"
+            with self._llm_span("generate", full_prompt) as llm_span:
+                try:
+                    text = self._generate(full_prompt, prefix, prompt, llm_span)
+                    if text is None:
+                        raise ValueError("No generations found in the response.")
+                    return GenerationOutcome(prompt, text)
+                except Exception as e:
+                    emit_event("llm_error", agent=self.name, model=self._model_name(), error=str(e))
+                    llm_span.set(error=str(e))
+                    return GenerationOutcome(prompt, error=e)
+
+        if limit == 1 or len(prompts) <= 1:
+            return [run(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(limit, len(prompts))) as executor:
+            return list(executor.map(run, prompts))
+
+    def generate_stream(self, prompt, metrics=None):
+        """
+        Queries the Ollama model using the stream() function, yielding the
+        response chunks as they arrive.
+
+        Parameters:
+            prompt (str): The prompt to be used for the query.
+            metrics (dict): Optional dictionary receiving the "time_to_first_token" of this call
+                (kept per call, as several threads may stream with the same agent).
+
+        Yields:
+            str: Response chunks.
+        """
+        if metrics is None:
+            metrics = {}
+        with self._llm_span("generate_stream", prompt) as llm_span:
+            yield from self._stream_response(prompt, llm_span, metrics)
+
+    def _stream_response(self, prompt, llm_span, metrics):
+        started_at = self._log_prompt(prompt)
+        metrics["time_to_first_token"] = None
+        cached = self._cached_response(prompt)
+        if cached is not None:
+            metrics["time_to_first_token"] = time.perf_counter() - started_at
+            self._log_response(prompt, cached, True, started_at)
+            self._finish_llm_span(llm_span, cached, True)
+            self.output = cached
+            yield cached
+            return
+
+        full_log = self.log_verbosity != "preview"
+        if full_log:
+            print(f"{translate_string('base_agent', 'base_agent_model_response', self.language).format(output='')}", end='')
+        # The complete response is only kept when it has to be stored in the cache
+        keep_response = self.response_cache is not None and self.response_cache.enabled
+        chunks = []
+        head = ''
+        response_chars = 0
+        digest = hashlib.sha256()
+        with self._model_turn(llm_span):
+            for chunk in self.llm.stream(prompt):
+                if metrics["time_to_first_token"] is None:
+                    metrics["time_to_first_token"] = time.perf_counter() - started_at
+                if full_log:
+                    print(chunk, end='', flush=True)
+                elif len(head) <= self.log_preview_chars:
+                    head += chunk
+                response_chars += len(chunk)
+                digest.update(chunk.encode("utf-8", errors="replace"))
+                if keep_response:
+                    chunks.append(chunk)
+                yield chunk
+        if full_log:
+            print()
+        else:
+            if response_chars > self.log_preview_chars:
+                head = f"{head[:self.log_preview_chars]}... [+{response_chars - self.log_preview_chars} chars]"
+            preview = f"{head} [sha256:{digest.hexdigest()[:12]}, {response_chars} chars]"
+            print(f"{translate_string('base_agent', 'base_agent_model_response', self.language).format(output=preview)}")
+        ttft = metrics["time_to_first_token"] or 0.0
+        print(f"{translate_string('base_agent', 'base_agent_time_to_first_token', self.language).format(name=self.name, seconds=ttft)}")
+        self._emit_response_event(prompt, None, False, started_at, response_chars, digest.hexdigest()[:12])
+        self._finish_llm_span(llm_span, None, False, response_chars=response_chars)
+        llm_span.set(time_to_first_token=round(ttft, 3))
+        if keep_response:
+            self.output = ''.join(chunks)
+            self._store_response(prompt, self.output)
 
     def interact(self, prompt):
         """
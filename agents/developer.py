@@ -18,11 +18,25 @@ import os
 import io
 import sys
 import re
+import time
 import unidecode
+from contextlib import contextmanager
 from .base_agent import BaseAgent
 from .prompt_templates.developer_prompts import DeveloperPrompts
-from utils.translation_utils import translate_string
+from utils.code_block_parser import CodeBlockParser
+from utils.translation_utils import load_translations, translate_string
 from utils.pattern_matching import PatternMatching
+from utils.run_log import emit_event
+from utils.test_verdict import combined_verdict, parse_verdict
+from utils.write_buffer import StagedWriteBuffer
+from utils.tracing import span, traced
+
+# Pattern removed from file names: '##folder/'
+FOLDER_PREFIX_PATTERN = re.compile(r'##(\w+)\/')
+
+# Asterisks removed from markdown lines ('**text**' and '* text')
+DOUBLE_ASTERISK_PATTERN = re.compile(r'^\*\*|\*\*$')
+SINGLE_ASTERISK_PATTERN = re.compile(r'^\*')
 
 class Developer(BaseAgent):
     """
@@ -32,12 +46,22 @@ class Developer(BaseAgent):
             - llm (Ollama): Language model to be used by the developer.
             - name (str): Name of the developer (e.g., "Backend Developer", "Frontend Developer").
             - interactive (bool): Defines if the process should run with interactions with the user.
+            - streaming (bool): Streams the model response and writes each file as soon as it is complete
+              ("normal" and "tdd" styles, non interactive runs only).
     """
-    def __init__(self, name, llm, development_style, language, interactive):
+    # Local syntax checks run before the model checks (see utils/static_checks.py). None asks the model only.
+    static_checker = None
+    # Sandboxed runner of the generated Python tests (see utils/test_runner.py). None asks the model to imagine the execution.
+    test_runner = None
+
+    def __init__(self, name, llm, development_style, language, interactive, streaming=False):
         super().__init__(name, llm, language, interactive)
         self.prompts = DeveloperPrompts(self.language)
         self.development_style = development_style
         self.patterns = PatternMatching()
+        self.streaming = streaming
+        # Latency metrics of the streamed responses: time to first token and per file latencies
+        self.stream_metrics = []
 
     def develop_code(self, prompt):
         final_prompt = f"{prompt}\n\n{self.prompts.develop_code_instructions()}"
@@ -57,6 +81,26 @@ class Developer(BaseAgent):
             final_code = code
         return self._parse_code_response(final_code)
     
+    def develop_code_stream(self, prompt, instructions, metrics=None):
+        """
+        Streams the code generation, yielding each file as soon as its "##end##" marker arrives.
+
+        Args:
+            - prompt (str): Task prompt.
+            - instructions (str): Code generation instructions appended to the prompt.
+            - metrics (dict): Optional dictionary receiving the latency metrics of the call (see BaseAgent.generate_stream()).
+
+        Yields:
+            - tuple: (filename, code) of each completed file.
+        """
+        final_prompt = f"{prompt}\n\n{instructions}"
+        parser = CodeBlockParser()
+        for chunk in self.generate_stream(final_prompt, metrics):
+            for block in parser.feed(chunk):
+                yield block
+        for block in parser.finish():
+            yield block
+
     def develop_code_with_correction(self, general_report):
         print("Starting code generation with 01 cycle of testing and correction...")
         generated_code_with_tests = self.develop_code_with_tests(general_report)
@@ -81,40 +125,163 @@ class Developer(BaseAgent):
             - final_test_evaluation_results (str): success or error.
         """
         print("Testing the generated code...\n\n")
-        issues = []
-
-        # Step 1: Syntax Check
-        test_execution_prompt = f"{generated_code_with_tests}\n\n{self.prompts.check_syntax_of_generated_code()}"
-        syntax_test_results = self.generate(test_execution_prompt)
-        if self.interactive:
-            final_syntax_test_results = self.interact(syntax_test_results)
+        timings = {}
+
+        # Step 0: Local syntax checks. Parser errors go straight to the correction,
+        # skipping the syntax, execution and evaluation calls. Heuristic findings are only
+        # hints given to the model syntax check
+        with self._timed_step("static_checks", timings):
+            static_result = self.static_check(generated_code_with_tests)
+        if static_result is not None and static_result.issues:
+            self.static_checker.record_saved_calls(3)
+            print(translate_string("developer", "static_checks_failed", self.language).format(count=len(static_result.issues)))
+            self.report_test_timings(timings)
+            return "fail\n" + "\n".join(f"- {issue}" for issue in static_result.issues)
+
+        # Step 0b: Real execution of the Python tests. Failing tests go straight to the correction,
+        # passing ones replace the model execution check
+        with self._timed_step("sandbox_tests", timings):
+            test_run = self.run_tests(generated_code_with_tests)
+        if test_run is not None and not test_run.ok:
+            self.test_runner.record_saved_calls(3)
+            print(translate_string("developer", "tests_run_failed", self.language).format(
+                count=max(1, len(test_run.failures)), status=test_run.status))
+            failures = "\n".join(f"- {line}" for line in test_run.failure_lines())
+            self.report_test_timings(timings)
+            return f"fail\n{failures}\n\n{test_run.summary()}"
+
+        # Steps 1 and 2: Syntax Check and Code and Tests Execution Check. Both depend only on
+        # the code, so the model calls still needed are sent together
+        results = {}    # Step: (result, verdict)
+        prompts = {}
+        if static_result is not None and static_result.clean:
+            # Every file was parsed locally without errors: the model check is not needed
+            self.static_checker.record_saved_calls(1)
+            results["syntax"] = (translate_string("developer", "static_checks_passed", self.language).format(
+                files=", ".join(static_result.files)), "success")
         else:
-            final_syntax_test_results = syntax_test_results
-        print("\n\nSyntax check finished.\n\n")
-
-        # Step 2: Code and Tests Execution Check
-        test_code_execution_prompt = f"{generated_code_with_tests}\n\n{self.prompts.execute_tests_and_generated_code()}"
-        test_code_execution_results = self.generate(test_code_execution_prompt)
-        if self.interactive:
-            final_test_code_execution_results = self.interact(test_code_execution_results)
+            prompts["syntax"] = self.prompts.check_syntax_of_generated_code()
+            if static_result is not None and static_result.hints:
+                hints = "\n".join(f"- {hint}" for hint in static_result.hints)
+                prompts["syntax"] += "\n\n" + translate_string("developer", "static_checks_hints", self.language).format(
+                    hints=hints)
+        if test_run is not None:
+            self.test_runner.record_saved_calls(1)
+            print(translate_string("developer", "tests_run_passed", self.language).format(
+                passed=test_run.passed, seconds=test_run.seconds))
+            results["execution"] = (test_run.summary(), "success")
         else:
-            final_test_code_execution_results = test_code_execution_results
+            prompts["execution"] = self.prompts.execute_tests_and_generated_code()
+        # The code is the prefix shared by the syntax and execution checks
+        with self._timed_step("model_checks", timings):
+            responses = self.generate_checks(prompts, prefix=f"{generated_code_with_tests}\n\n")
+        for step, response in responses.items():
+            if self.interactive:
+                response = self.interact(response)
+            results[step] = (response, parse_verdict(response))
+        print("\n\nSyntax check finished.\n\n")
         print("\n\nCode execution test finished.\n\n")
 
         # Join results
-        final_tests_results = f"{final_syntax_test_results}\n\n{final_test_code_execution_results}"
+        final_tests_results = f"{results['syntax'][0]}\n\n{results['execution'][0]}"
 
-        # Step 3: Evaluate Results
-        test_evaluation_prompt = f"{final_tests_results}\n\n{self.prompts.evaluate_test_results()}"
-        test_evaluation_results = self.generate(test_evaluation_prompt)
-        if self.interactive:
-            final_test_evaluation_results = self.interact(test_evaluation_results)
+        # Step 3: Evaluate Results. Results that clearly pass or fail need no evaluation call
+        verdict = combined_verdict(result_verdict for _, result_verdict in results.values())
+        if verdict is not None:
+            print(translate_string("developer", "test_evaluation_skipped", self.language).format(verdict=verdict))
+            final_test_evaluation_results = "success" if verdict == "success" else f"fail\n{final_tests_results}"
         else:
-            final_test_evaluation_results = test_evaluation_results
+            with self._timed_step("evaluation", timings):
+                test_evaluation_prompt = f"{final_tests_results}\n\n{self.prompts.evaluate_test_results()}"
+                test_evaluation_results = self.generate(test_evaluation_prompt)
+                if self.interactive:
+                    final_test_evaluation_results = self.interact(test_evaluation_results)
+                else:
+                    final_test_evaluation_results = test_evaluation_results
         print("\n\nTests Evaluation finished.\n\n")
+        self.report_test_timings(timings)
 
         return final_test_evaluation_results
 
+    def generate_checks(self, prompts, prefix):
+        """
+        Sends the check prompts sharing a prefix concurrently (see BaseAgent.generate_many()).
+
+        Args:
+            - prompts (dict): Prompt of each check step.
+            - prefix (str): Prompt prefix shared by the checks (the generated code).
+
+        Returns:
+            - dict: Model response of each check step (None when its call failed).
+        """
+        if len(prompts) <= 1:
+            return {step: self.generate(prompt, prefix=prefix) for step, prompt in prompts.items()}
+        outcomes = self.generate_many(list(prompts.values()), prefix=prefix)
+        responses = {}
+        for step, outcome in zip(prompts, outcomes):
+            if not outcome.ok:
+                print(translate_string('base_agent', 'base_agent_error_evaluating_prompt', self.language).format(error=outcome.error))
+            responses[step] = outcome.text
+        return responses
+
+    @contextmanager
+    def _timed_step(self, step, timings):
+        """
+        Records the wall time of a test_code step in timings (and as a trace span).
+        """
+        started_at = time.perf_counter()
+        with span(f"Developer.test_code.{step}", "agent", agent=self.name):
+            try:
+                yield
+            finally:
+                timings[step] = time.perf_counter() - started_at
+
+    def report_test_timings(self, timings):
+        """
+        Prints the wall time of each test_code step and records it in the event log.
+        """
+        steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items())
+        print(translate_string("developer", "test_step_timings", self.language).format(steps=steps))
+        emit_event("test_code_timings", agent=self.name, **{step: round(seconds, 3) for step, seconds in timings.items()})
+
+    def static_check(self, generated_code):
+        """
+        Checks the syntax of the generated files with the local parsers (see utils/static_checks.py).
+
+        Args:
+            - generated_code (dict or str): Generated files by file name, or a response with "##file" markers.
+
+        Returns:
+            - StaticCheckResult: The result, or None when the checks are disabled or no file was found.
+        """
+        if self.static_checker is None:
+            return None
+        files = self.generated_files(generated_code)
+        if not files:
+            return None
+        return self.static_checker.check_files(files)
+
+    def run_tests(self, generated_code):
+        """
+        Runs the generated Python tests in a sandboxed subprocess (see utils/test_runner.py).
+
+        Args:
+            - generated_code (dict or str): Generated files by file name, or a response with "##file" markers.
+
+        Returns:
+            - SandboxRunResult: The result, or None when the runner is disabled or the files have no Python tests.
+        """
+        if self.test_runner is None:
+            return None
+        return self.test_runner.run(self.generated_files(generated_code))
+
+    def generated_files(self, generated_code):
+        """
+        Returns the clean code of each generated file, as it would be saved.
+        """
+        files = generated_code if isinstance(generated_code, dict) else self._parse_code_response(generated_code)
+        return {filename: self.clean_generated_code(code) for filename, code in files.items() if isinstance(code, str)}
+
     def correct_code(self, generated_code_with_tests, test_results):
         """
         Corrects the issues found during testing by modifying the generated code.
@@ -146,45 +313,14 @@ class Developer(BaseAgent):
 
         if isinstance(response, str):
             # Extract filenames and code content
-            lines = response.splitlines()
-            current_filename = None
-            current_code = []
-            inside_code_block = False  # Flag to check if execution is inside a code block
-
-            # Patterns list to be tested along 
-            # with the right group indexes to be extracted
-            patterns = self.patterns.filename_matching_patterns_no_hashtag()
-
-            # iterates generated code
-            for line in lines:
-                # 1st condition: file name retrieval
-                if ("##begin##") in line:
-                    # Iterate over the patterns to find a match
-                    for pattern, group_index in patterns:
-                        filename_match = re.search(pattern, line)
-                        if current_filename == None:
-                            if filename_match:
-                                # Update current filename
-                                current_filename = filename_match.group(group_index)
-                                inside_code_block = True  # Enter the code block
-                                break
-                # 2nd conition: end of file
-                elif inside_code_block and ( ("##end##") in line or line == '```' ):  # End of the code block
-                    # Save the current filename and its code
-                    if current_filename:
-                        # Save the current filename and its code
-                        parsed_code[current_filename] = "\n".join(current_code).strip()
-                    current_filename = None  # Reset filename
-                    current_code = []  # Reset code
-                    inside_code_block = False # Reset code block flag
-                # 3rd condition: Add line to the current code block 
-                # (if inside a code block)
-                elif inside_code_block and current_filename and not line.startswith('```'):
-                    current_code.append(line)
-
+            parser = CodeBlockParser()
+            for line in response.splitlines():
+                block = parser.feed_line(line)
+                if block:
+                    parsed_code[block[0]] = block[1]
             # Save the last file's code if it exists
-            if current_filename and current_filename:
-                parsed_code[current_filename] = "\n".join(current_code).strip()
+            for filename, code in parser.finish():
+                parsed_code[filename] = code
 
             return parsed_code
 
@@ -201,7 +337,7 @@ class Developer(BaseAgent):
         removes the pattern '##(\w+)\/' using the re.sub() function.
         """
         file_name = unidecode.unidecode(file_name)
-        file_name = re.sub('##(\w+)\/', '', file_name)
+        file_name = FOLDER_PREFIX_PATTERN.sub('', file_name)
         return file_name.lower()
     
     def detect_language_by_file_extension(self, text):
@@ -214,15 +350,9 @@ class Developer(BaseAgent):
         Returns:
             - str: Detected file extension or None if not found.
         """
-        # List of common file extensions for different programming languages
-        language_extensions = self.patterns.language_extensions_list()
-
-        # Regex pattern to match filenames with extensions (e.g., filename.ext)
-        # The extension must match one of the valid language extensions
-        pattern = r'\b\w+\.(' + '|'.join(language_extensions) + r')\b'
-
-        # Search for the first occurrence of the filename with the correct extension
-        match = re.search(pattern, text, re.IGNORECASE)
+        # Search for the first occurrence of a filename with one of the
+        # language extensions (pattern compiled once in utils/pattern_matching.py)
+        match = self.patterns.language_extension_pattern().search(text)
         
         if match:
             # Return the detected file extension
@@ -390,6 +520,102 @@ class Developer(BaseAgent):
         modified_code = '\n'.join(modified_lines)
         return modified_code
 
+    def clean_generated_code(self, code):
+        """
+        Cleans generated code in a single pass. Gives the same output as
+        fix_comments_prefix(remove_markup_from_code(code)).
+
+        Args:
+            - code (str): Code generated with markup.
+
+        Returns:
+            - str: Clean code with corrected comment prefixes.
+        """
+        return '\n'.join(self.iter_clean_code_lines(code.split('\n')))
+
+    def iter_clean_code_lines(self, lines):
+        """
+        Streaming line transformer performing, in one pass, the fence stripping and
+        asterisk conversion of remove_markup_from_code() and the comment prefix
+        normalisation of fix_comments_prefix(). The language is detected once.
+
+        Args:
+            - lines (iterable): Lines of generated code (without line breaks).
+
+        Yields:
+            - str: Clean lines.
+        """
+        block_language = None
+        markup_prefix = None
+        markup_suffix = ''
+        comment_prefixes = None
+        single_prefix_pattern = None
+        carry = ''
+
+        lines = iter(lines)
+        next_line = next(lines, None)
+        while next_line is not None:
+            line = next_line
+            next_line = next(lines, None)
+
+            # Fence stripping: "```" removes the rest of its line and the line break
+            # (joining what comes before it with the next line); on the last line
+            # only the backticks are removed
+            fence = line.find('```')
+            if fence != -1:
+                if next_line is not None:
+                    carry += line[:fence]
+                    continue
+                line = line.replace('```', '')
+            if carry:
+                line = carry + line
+                carry = ''
+
+            # Asterisk lines become comments once the language is known
+            stripped_line = line.strip()
+            if stripped_line.startswith('**'):
+                modified_line = DOUBLE_ASTERISK_PATTERN.sub('', stripped_line).strip()
+                if block_language:
+                    modified_line = f'{markup_prefix} {modified_line}{markup_suffix}'
+            elif stripped_line.startswith('*'):
+                modified_line = SINGLE_ASTERISK_PATTERN.sub('', stripped_line).strip()
+                if block_language:
+                    modified_line = f'{markup_prefix} {modified_line}{markup_suffix}'
+            else:
+                modified_line = line
+
+            if block_language is None:
+                # Detect the language based on the first file name with a known extension
+                language_extension = self.detect_language_by_file_extension(stripped_line)
+                if language_extension:
+                    block_language = language_extension
+                    comment_prefixes = self.get_comment_prefix(block_language)
+                    markup_prefix = comment_prefixes
+                    markup_suffix = ' */' if block_language.lower() in ['css', 'html', 'xml'] else ''
+                    single_prefix_pattern = re.compile(r'^[' + re.escape(''.join(comment_prefixes.values())) + r']+')
+                else:
+                    # Keep the line as it is while the language is not detected
+                    yield modified_line
+                    continue
+
+            # Comment prefix normalisation
+            stripped_line = modified_line.strip()
+            multi_start = comment_prefixes['multi_start']
+            multi_end = comment_prefixes['multi_end']
+            single = comment_prefixes['single']
+            if multi_start and stripped_line.startswith(multi_start):
+                # Início de bloco de comentário
+                yield modified_line.replace(multi_start, f"{multi_start} ")
+            elif multi_end and stripped_line.endswith(multi_end):
+                # Fim de bloco de comentário
+                yield modified_line.replace(multi_end, f" {multi_end}")
+            elif single and stripped_line.startswith(single):
+                # Comentário de linha única
+                cleaned_line = single_prefix_pattern.sub('', stripped_line).strip()
+                yield f"{single} {cleaned_line}"
+            else:
+                yield modified_line
+
     # Define a helper function to extract headers and code from content
     def extract_headers(self, code_content):
         lines = code_content.splitlines()
@@ -402,24 +628,32 @@ class Developer(BaseAgent):
                 code_lines.append(line)
         return header_lines, code_lines
 
-    def generate_and_write_code(self, file_path, task_description):
+    def generate_and_write_code(self, file_path, task_description, emit=None):
         """
         Generates and writes code to a file.
 
         Args:
         - file_path (str): Path to write the generated code.
         - task_description (str): Description of the task.
+        - emit (callable): Optional receiver of each (path, code) pair. Defaults to write_code_file().
 
         Notes:
         - Uses the `develop_code()` method to generate code based on the provided task description.
         - Removes markup from the generated code using the `remove_markup_from_code()` method.
         - Writes the cleaned code to the specified file path.
         - Corrects comment prefixes using `fix_comments_prefix()` if necessary.
-        - Checks for existing headers and appends new content after existing content.
+        - Writes each file through `write_code_file()` unless another `emit` is given.
         """
         code_prompt = f"{self.prompts.code_prompt_instruction()}{task_description}"
         code_processing_message = translate_string("developer", "code_processing_message", self.language)
         print(f"{code_processing_message}: {task_description}")
+        if emit is None:
+            emit = self.write_code_file
+
+        if self.streaming and not self.interactive and self.development_style in ["normal", "tdd"]:
+            self.stream_and_write_code(file_path, code_prompt, task_description, emit)
+            return
+
         try:
             if self.development_style == "normal":
                 code = self.develop_code(code_prompt)
@@ -432,6 +666,17 @@ class Developer(BaseAgent):
             print(f"{error_message}: {task_description}: {e}")
             return
 
+        self._emit_generated_code(file_path, code, emit)
+
+    def _emit_generated_code(self, file_path, code, emit):
+        """
+        Cleans the generated code of a task and hands over each of its files.
+
+        Args:
+        - file_path (str): Path of the task file.
+        - code (str or dict): Generated code, or generated files by file name.
+        - emit (callable): Receiver of each (path, code) pair.
+        """
         # Prepare a list to hold the file paths and corresponding code
         file_paths_and_codes = []
 
@@ -439,63 +684,153 @@ class Developer(BaseAgent):
         if isinstance(code, dict):
             # Iterate over the code items
             for filename, file_content in code.items():
-                # Clean code content
-                cleaned_code = self.remove_markup_from_code(file_content)
-                cleaned_code = self.fix_comments_prefix(cleaned_code)
-
-                # Determine file path
-                # If the filename is absolute, use it directly; otherwise, construct the path relative to file_path
-                if os.path.isabs(filename):
-                    full_path = filename
-                else:
-                    # Construct full path relative to the directory of file_path
-                    full_path = os.path.join(os.path.dirname(file_path), filename)
-
-                file_paths_and_codes.append((full_path, cleaned_code))
+                file_paths_and_codes.append(self._prepare_code_file(file_path, filename, file_content))
         else:
             # For normal development style or single code output
-            cleaned_code = self.remove_markup_from_code(code)
-            cleaned_code = self.fix_comments_prefix(cleaned_code)
+            cleaned_code = self.clean_generated_code(code)
             file_paths_and_codes = [(file_path, cleaned_code)]
 
-        # Write to all files
+        # Write (or hand over) all files
         for path, content in file_paths_and_codes:
-            try:
-                existing_headers, existing_code = [], []
-                if os.path.exists(path):
-                    try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            existing_content = f.read()
-                    except UnicodeDecodeError:
-                        with open(path, 'r', encoding='iso-8859-1') as f:
-                            existing_content = f.read()
-                    existing_headers, existing_code = self.extract_headers(existing_content)
-                
-                new_headers, new_code = self.extract_headers(content)
-                
-                # Determine new headers to add (headers in new_headers but not in existing_headers)
-                headers_to_add = [h for h in new_headers if h not in existing_headers]
-                
-                # Combine headers
-                all_headers = existing_headers + headers_to_add
-                
-                # Prepare final content
-                final_content = '\n'.join(all_headers).strip()
-                if existing_code:
-                    final_content += '\n' + '\n'.join(existing_code).strip()
-                if new_code:
-                    final_content += '\n' + '\n'.join(new_code).strip()
-                
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(final_content.strip())
-            except Exception as e:
-                error_message = translate_string("developer", "code_written_fail", self.language)
-                print(f"{error_message}: {path}: {e}")
-                continue  # Continue to next file if one fails
+            emit(path, content)
 
         generate_code_message = translate_string("developer", "generate_and_write_code_success", self.language)
         print(f"{generate_code_message}: {', '.join([path for path, _ in file_paths_and_codes])}")
 
+    def _prepare_code_file(self, file_path, filename, file_content):
+        """
+        Cleans a generated file and resolves its path.
+
+        Returns:
+        - tuple: (full_path, cleaned_code).
+        """
+        # Clean code content (markup removal and comment prefixes in a single pass)
+        cleaned_code = self.clean_generated_code(file_content)
+
+        # Determine file path
+        # If the filename is absolute, use it directly; otherwise, construct the path relative to file_path
+        if os.path.isabs(filename):
+            full_path = filename
+        else:
+            # Construct full path relative to the directory of file_path
+            full_path = os.path.join(os.path.dirname(file_path), filename)
+
+        return full_path, cleaned_code
+
+    def can_batch_tasks(self):
+        """
+        Tells whether the tasks can be generated in batches (see process_task_batch()): the
+        single-call styles ("normal" and "tdd") of non interactive, non streamed runs.
+        """
+        return not self.interactive and not self.streaming and self.development_style in ["normal", "tdd"]
+
+    def process_task_batch(self, tasks):
+        """
+        Generates the code of several tasks, sending their prompts together through
+        generate_many(). A task whose request fails is reported without affecting the others.
+
+        Args:
+        - tasks (list): (node, development_dir) pairs of the tasks.
+
+        Returns:
+        - list: The generated (path, code) pairs of each task, in the order of the tasks.
+        """
+        if self.development_style == "tdd":
+            instructions = self.prompts.develop_code_with_tests_instructions()
+        else:
+            instructions = self.prompts.develop_code_instructions()
+        code_processing_message = translate_string("developer", "code_processing_message", self.language)
+
+        requests = []
+        for index, (node, development_dir) in enumerate(tasks):
+            file_path = self.task_file_path(node, development_dir)
+            if file_path is None:
+                continue
+            task_description = self.task_description(node)
+            print(f"{code_processing_message}: {task_description}")
+            code_prompt = f"{self.prompts.code_prompt_instruction()}{task_description}"
+            requests.append((index, file_path, task_description, f"{code_prompt}\n\n{instructions}"))
+
+        results = [[] for _ in tasks]
+        outcomes = self.generate_many([prompt for _, _, _, prompt in requests])
+        for (index, file_path, task_description, _), outcome in zip(requests, outcomes):
+            if not outcome.ok:
+                error_message = translate_string("developer", "generate_and_write_code_error", self.language)
+                print(f"{error_message}: {task_description}: {outcome.error}")
+                continue
+            files = results[index]
+            self._emit_generated_code(file_path, self._parse_code_response(outcome.text),
+                                      lambda path, content, files=files: files.append((path, content)))
+        return results
+
+    def stream_and_write_code(self, file_path, code_prompt, task_description, emit):
+        """
+        Streams the code generation and hands over each file the moment it is complete.
+
+        Args:
+        - file_path (str): Path of the task file.
+        - code_prompt (str): Prompt describing the task.
+        - task_description (str): Description of the task.
+        - emit (callable): Receiver of each (path, code) pair.
+        """
+        if self.development_style == "tdd":
+            instructions = self.prompts.develop_code_with_tests_instructions()
+        else:
+            instructions = self.prompts.develop_code_instructions()
+
+        written_paths = []
+        file_latencies = []
+        # Metrics of this call: the graph workers stream with the same Developer at the same time
+        call_metrics = {}
+        started_at = time.perf_counter()
+        try:
+            for filename, file_content in self.develop_code_stream(code_prompt, instructions, call_metrics):
+                path, content = self._prepare_code_file(file_path, filename, file_content)
+                emit(path, content)
+                latency = time.perf_counter() - started_at
+                file_latencies.append((path, latency))
+                written_paths.append(path)
+                streamed_file_message = translate_string("developer", "streamed_file_written", self.language)
+                print(f"\n{streamed_file_message.format(path=path, latency=latency)}")
+        except Exception as e:
+            error_message = translate_string("developer", "generate_and_write_code_error", self.language)
+            print(f"{error_message}: {task_description}: {e}")
+            return
+
+        self.stream_metrics.append({
+            "task": file_path,
+            "time_to_first_token": call_metrics.get("time_to_first_token"),
+            "file_latencies": file_latencies,
+        })
+        generate_code_message = translate_string("developer", "generate_and_write_code_success", self.language)
+        print(f"{generate_code_message}: {', '.join(written_paths)}")
+
+    def write_code_file(self, path, content):
+        """
+        Writes generated code to a file, merging it with the file's existing content.
+
+        Args:
+        - path (str): Path of the file to write.
+        - content (str): Cleaned code to be added to the file.
+
+        Notes:
+        - Checks for existing headers and appends new content after existing content.
+        - The file is replaced atomically while holding its path lock, so concurrent
+          tasks writing the same file cannot interleave their merges.
+        - Task graphs stage all their files in a StagedWriteBuffer instead, writing each file once.
+        """
+        write_buffer = StagedWriteBuffer(self.extract_headers)
+        write_buffer.add(path, content)
+        for failed_path, error in write_buffer.flush():
+            self.report_write_failure(failed_path, error)
+
+    def report_write_failure(self, path, error):
+        """
+        Prints the error of a file that could not be written.
+        """
+        error_message = translate_string("developer", "code_written_fail", self.language)
+        print(f"{error_message}: {path}: {error}")
+
     def extract_test_file_name(self, main_file_name):
         """
         Generates the test file name based on the main file name.
@@ -510,37 +845,60 @@ class Developer(BaseAgent):
         test_file_name = f"test_{base}{ext}"
         return test_file_name
 
-    def process_task(self, node, development_dir):
+    def task_description(self, node):
+        """
+        Returns the description of a task sent to the model: the task line followed by its subtasks.
+        """
+        all_subtasks = [subnode.name for subnode in node.subnodes]
+        all_subtasks_str = "\n".join(all_subtasks)
+        return f"{node.name}\n{all_subtasks_str}"
+
+    def task_fingerprint(self, node):
+        """
+        Fingerprint of everything the files of a task are generated from: the task description,
+        the development style, the developer prompt templates and the model with its options.
+        """
+        return self.input_fingerprint(self.development_style, dict(load_translations("developer_prompts", self.language)),
+                                      self.task_description(node))
+
+    @traced("Developer.process_task", "task")
+    def process_task(self, node, development_dir, emit=None):
         """
         Processes a task, generating the necessary structure and code.
         Handles nested subnodes if provided.
+
+        Args:
+        - node (Node): Task node to be processed.
+        - development_dir (str): Directory where the task files are generated.
+        - emit (callable): Optional receiver of each generated (path, code) pair.
+        """
+        file_path = self.task_file_path(node, development_dir)
+        if file_path:
+            self.generate_and_write_code(file_path, self.task_description(node), emit)
+
+    def task_file_path(self, node, development_dir):
+        """
+        Returns the path of the file generated by a task (creating its folder), or None
+        when the task line names no file.
         """
         task = node.name
         file_name = None  # Initialize file_name at the start
-            
+
         if "##" in task:
-            
-            # Patterns list to be tested along 
-            # with the right group indexes to be extracted
-            patterns = self.patterns.filename_matching_patterns()
-                    
-            # Iterate over the patterns to find a match
-            for pattern, group_index in patterns:
-                match = re.search(pattern, task)
-                if match:
-                    # Get the correct group that matched as file name
-                    file_name = match.group(group_index)
-
-                if file_name != None:
-                    file_name = self.sanitize_file_name(file_name)
-                    file_path = os.path.join(development_dir, file_name)
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    
-                    if file_path:
-                        all_subtasks = [subnode.name for subnode in node.subnodes]
-                        all_subtasks_str = "\n".join(all_subtasks)
-                        complete_task_description = f"{task}\n{all_subtasks_str}"
-                        self.generate_and_write_code(file_path, complete_task_description)
+
+            # Match the task against all file name patterns at once,
+            # the first matching rule gives the group index to be extracted
+            match = self.patterns.filename_pattern_set().match(task)
+            if match:
+                # Get the correct group that matched as file name
+                file_name = match.group(match.index)
+
+            if file_name != None:
+                file_name = self.sanitize_file_name(file_name)
+                file_path = os.path.join(development_dir, file_name)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                return file_path
+        return None
 
     def get_source_code(self):
         # Get the source code of the base class
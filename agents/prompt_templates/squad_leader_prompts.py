@@ -30,4 +30,8 @@ class SquadLeaderPrompts:
 
     # Instructions for creating the tests activity backlog
     def get_tests_instructions(self, language):
-        return translate_string("squad_leader_prompts", "tests_instructions", language)
\ No newline at end of file
+        return translate_string("squad_leader_prompts", "tests_instructions", language)
+
+    # Instructions for summarizing a context too large for the model (properties, reports)
+    def get_context_summary_instructions(self, language):
+        return translate_string("squad_leader_prompts", "context_summary_instructions", language)
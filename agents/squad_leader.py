@@ -12,11 +12,18 @@ Classes:
     - model (Ollama): Language model to be used by the agent.
     - name (str): Agent name (only for Developer).
     - interactive (bool): Defines whether the process will be interactive.
+
+  The prompts (templates + project properties + reports) are kept within the token
+  budget of the model (see utils/token_budget.py): when a prompt does not fit, the
+  properties and reports are compacted and, if needed, summarized once by the model.
 """
 from .base_agent import BaseAgent
 import configparser
 from .prompt_templates.squad_leader_prompts import SquadLeaderPrompts
+from utils.run_log import emit_event
+from utils.token_budget import TokenBudget
 from utils.translation_utils import translate_string
+from utils.tracing import traced
 
 class SquadLeader(BaseAgent):
     """
@@ -25,11 +32,18 @@ class SquadLeader(BaseAgent):
         - model (Ollama): Language model to be used by the team leader.
         - interactive (bool): Defines whether the process will be interactive.
     """
+    # Prompt token budget (0 = context of the model minus its response tokens)
+    # and whether prompts over the budget are compacted
+    prompt_token_budget = 0
+    context_compaction = True
+
     def __init__(self, name, llm, properties_file, language, interactive):
         super().__init__(name, llm, language, interactive)
         self.properties_file = properties_file
         self.project_data = self.read_properties()
+        self.project_info = self.format_project_info()
         self.prompts = SquadLeaderPrompts()
+        self.token_budget = TokenBudget(llm, self.prompt_token_budget, self.context_compaction, self.summarize_context)
     
     def read_properties(self):
         """
@@ -39,6 +53,47 @@ class SquadLeader(BaseAgent):
         config.read(self.properties_file)
         return config
 
+    def format_project_info(self):
+        """
+        Formats the project properties for the prompts (built once per agent).
+        """
+        return "\n".join([f"{section}:\n{', '.join([f'{key}: {value}' for key, value in section_data.items()])}" for section, section_data in self.project_data.items()])
+
+    def input_fingerprint(self, *parts):
+        # The token budget changes the prompts that are compacted
+        return super().input_fingerprint(self.token_budget.settings(), *parts)
+
+    def summarize_context(self, text, max_tokens):
+        """
+        Summarizes a context part (properties or report) that does not fit the prompt budget.
+        The summary goes through the response cache, so it is only requested once per text.
+        """
+        instructions = self.prompts.get_context_summary_instructions(self.language).format(words=max(50, max_tokens * 3 // 4))
+        return self.evaluate(f"{instructions}\n\n{text}")
+
+    def build_prompt(self, context=(), instructions=()):
+        """
+        Builds a prompt within the token budget of the model: the context parts (properties,
+        reports) come first and are compacted when needed, the templates and instructions are kept.
+
+        Returns:
+            - tuple: (prefix, suffix). The prefix holds the context, shared by the prompts built
+              from the same context, so its evaluation can be reused (see BaseAgent.evaluate).
+        """
+        prompt, result = self.token_budget.fit((), [str(part) for part in context], instructions)
+        if result.steps:
+            print(translate_string("squad_leader", "prompt_compacted", self.language).format(
+                name=self.name, original=result.original_tokens, tokens=result.tokens, limit=result.limit,
+                saved=result.saved_tokens, steps=", ".join(result.steps)))
+            emit_event("prompt_compacted", agent=self.name, model=self._model_name(), original_tokens=result.original_tokens,
+                       tokens=result.tokens, limit=result.limit, steps=result.steps)
+        if result.over_budget:
+            print(translate_string("squad_leader", "prompt_over_budget", self.language).format(
+                name=self.name, tokens=result.tokens, limit=result.limit))
+        prefix = "".join(f"{part}\n\n" for part in result.context)
+        return prefix, prompt[len(prefix):]
+
+    @traced("SquadLeader.generate_general_report", "agent")
     def generate_general_report(self, analyst_report):
         """
         Generates the project general report.
@@ -46,15 +101,15 @@ class SquadLeader(BaseAgent):
         Args:
             - analyst_report (str): Initial report generated by the analyst.
         """
-        project_info = "\n".join([f"{section}:\n{', '.join([f'{key}: {value}' for key, value in section_data.items()])}" for section, section_data in self.project_data.items()])
-        prompt = f"{project_info}\n\n{analyst_report}\n\n{self.prompts.get_general_report_instructions(self.language)}"
-        response = self.evaluate(prompt)
+        prefix, prompt = self.build_prompt([self.project_info, analyst_report], [self.prompts.get_general_report_instructions(self.language)])
+        response = self.evaluate(prefix + prompt)
         if self.interactive:
             final_response = self.interact(response)
         else:
             final_response = response
         return self._parse_response(final_response)
 
+    @traced("SquadLeader.generate_backend_backlog", "agent")
     def generate_backend_backlog(self, analyst_report):
         """
         Generates the backend task backlog.
@@ -62,15 +117,17 @@ class SquadLeader(BaseAgent):
         Args:
             - analyst_report (str): Initial report generated by the analyst.
         """
-        project_info = "\n".join([f"{section}:\n{', '.join([f'{key}: {value}' for key, value in section_data.items()])}" for section, section_data in self.project_data.items()])
-        prompt = f"{self.prompts.get_backend_backlog_model(self.language)}\n\n{project_info}\n\n{analyst_report}\n\n{self.prompts.get_backend_instructions(self.language)}"
-        response = self.evaluate(prompt)
+        # Properties and report first: the three backlog prompts share them as prefix
+        prefix, prompt = self.build_prompt([self.project_info, analyst_report],
+                                           [self.prompts.get_backend_backlog_model(self.language), self.prompts.get_backend_instructions(self.language)])
+        response = self.evaluate(prompt, prefix=prefix)
         if self.interactive:
             final_response = self.interact(response)
         else:
             final_response = response
         return self._parse_response(final_response)
 
+    @traced("SquadLeader.generate_frontend_backlog", "agent")
     def generate_frontend_backlog(self, analyst_report):
         """
         Generates the frontend task backlog.
@@ -78,15 +135,17 @@ class SquadLeader(BaseAgent):
         Args:
             - analyst_report (str): Initial report generated by the analyst.
         """
-        project_info = "\n".join([f"{section}:\n{', '.join([f'{key}: {value}' for key, value in section_data.items()])}" for section, section_data in self.project_data.items()])
-        prompt = f"{self.prompts.get_frontend_backlog_model(self.language)}\n\n{project_info}\n\n{analyst_report}\n\n{self.prompts.get_frontend_instructions(self.language)}"
-        response = self.evaluate(prompt)
+        # Properties and report first: the three backlog prompts share them as prefix
+        prefix, prompt = self.build_prompt([self.project_info, analyst_report],
+                                           [self.prompts.get_frontend_backlog_model(self.language), self.prompts.get_frontend_instructions(self.language)])
+        response = self.evaluate(prompt, prefix=prefix)
         if self.interactive:
             final_response = self.interact(response)
         else:
             final_response = response
         return self._parse_response(final_response)
 
+    @traced("SquadLeader.generate_test_backlog", "agent")
     def generate_test_backlog(self, analyst_report):
         """
         Generates the backlog of testing tasks.
@@ -94,9 +153,10 @@ class SquadLeader(BaseAgent):
         Args:
             - analyst_report (str): Initial report generated by the analyst.
         """
-        project_info = "\n".join([f"{section}:\n{', '.join([f'{key}: {value}' for key, value in section_data.items()])}" for section, section_data in self.project_data.items()])
-        prompt = f"{self.prompts.get_tests_backlog_model(self.language)}\n\n{project_info}\n\n{analyst_report}\n\n{self.prompts.get_tests_instructions(self.language)}"
-        response = self.evaluate(prompt)
+        # Properties and report first: the three backlog prompts share them as prefix
+        prefix, prompt = self.build_prompt([self.project_info, analyst_report],
+                                           [self.prompts.get_tests_backlog_model(self.language), self.prompts.get_tests_instructions(self.language)])
+        response = self.evaluate(prompt, prefix=prefix)
         if self.interactive:
             final_response = self.interact(response)
         else:
@@ -18,11 +18,11 @@ from .prompt_templates.developer_prompts import DeveloperPrompts
 from utils.translation_utils import translate_string
 
 class Tester(Developer):
-    def __init__(self, name, llm, language, development_style, interactive):
+    def __init__(self, name, llm, language, development_style, interactive, streaming=False):
         """
         Initializes the Tester agent.            
         """
-        super().__init__(name, llm, language, development_style, interactive)
+        super().__init__(name, llm, language, development_style, interactive, streaming)
         self.prompts = DeveloperPrompts(self.language)
 
     def develop_tests(self, prompt):
@@ -0,0 +1,63 @@
+# benchmarks/code_postprocessing.py
+"""
+code_postprocessing.py
+
+Golden-corpus check and benchmark of the generated code post-processing:
+compares the two-step path (remove_markup_from_code() followed by
+fix_comments_prefix()) with the single-pass Developer.clean_generated_code().
+The outputs must be byte-identical.
+
+Usage (from the project root):
+    python -m benchmarks.code_postprocessing [lines_per_file]
+"""
+import sys
+import time
+from agents.developer import Developer
+
+# Line templates per language, mixing code, comments, markdown asterisks and fences
+CORPUS_TEMPLATES = {
+    "py": ["```python", "# file: app/main.py", "import os", "#comment without space", "def handler_{i}(request):",
+           "    return compute({i})", '"""Docstring', 'end of docstring"""', "**Section {i}**", "* item {i}", "```"],
+    "js": ["```javascript", "// file: src/app.js", "const value{i} = require('lib');", "////comment {i}",
+           "/* block {i}", "still block */", "function f{i}() {{ return {i}; }}", "* note {i}", "```"],
+    "css": ["```css", "/* styles.css */", ".class-{i} {{ color: red; }}", "/*comment {i}*/", "**Title {i}**", "```"],
+    "html": ["```html", "<!-- index.html -->", "<div id='{i}'></div>", "<!--comment {i}-->", "* list {i}", "```"],
+    "lua": ["```lua", "-- main.lua", "local x{i} = {i}", "---- comment {i}", "--[[ block {i}", "]]", "```"],
+}
+
+def build_corpus(lines_per_file):
+    """
+    Builds one synthetic generated file per language with the requested number of lines.
+    """
+    corpus = {}
+    for language, templates in CORPUS_TEMPLATES.items():
+        lines = [templates[i % len(templates)].format(i=i) for i in range(lines_per_file)]
+        corpus[language] = "\n".join(lines)
+    return corpus
+
+def main():
+    lines_per_file = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    developer = Developer("Benchmark", None, "normal", "en-us", interactive=False)
+    corpus = build_corpus(lines_per_file)
+
+    two_step_time = 0.0
+    single_pass_time = 0.0
+    for language, code in corpus.items():
+        started_at = time.perf_counter()
+        expected = developer.fix_comments_prefix(developer.remove_markup_from_code(code))
+        two_step_time += time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        cleaned = developer.clean_generated_code(code)
+        single_pass_time += time.perf_counter() - started_at
+
+        if cleaned != expected:
+            raise SystemExit(f"Output mismatch for the {language} corpus file")
+
+    total_lines = lines_per_file * len(corpus)
+    print(f"corpus: {len(corpus)} files, {total_lines} lines (outputs byte-identical)")
+    print(f"two-step path : {two_step_time * 1e3:10.1f} ms")
+    print(f"single pass   : {single_pass_time * 1e3:10.1f} ms ({two_step_time / single_pass_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
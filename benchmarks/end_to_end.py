@@ -0,0 +1,181 @@
+# benchmarks/end_to_end.py
+"""
+end_to_end.py
+
+Offline benchmark of the framework's own overhead. The Ollama models are replaced
+by the deterministic FakeLLM (benchmarks/fake_llm.py), so the timings only contain
+the work done by codegenies itself: building and processing the task graphs,
+parsing the "##begin##/##end##" responses, cleaning the generated code and
+writing the files. Every step is measured at several graph sizes (file nodes)
+and reported as JSON (seconds, throughput and tracemalloc peak memory), so the
+results can be compared between commits.
+
+The full pipeline (main.run_pipeline with the fake models) is measured as well
+when the main module dependencies are installed.
+
+Usage (from the project root):
+    python -m benchmarks.end_to_end [--scales 10 100 1000] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# The benchmark must not read or fill the on-disk response cache
+os.environ.setdefault("CODEGENIES_LLM_CACHE", "off")
+
+from agents.developer import Developer
+from benchmarks.fake_llm import FakeLLM, fake_llm_factory
+from graph import build_task_graph, process_task_graph
+from utils.write_buffer import StagedWriteBuffer
+
+LANGUAGE = "en-us"
+PROPERTIES_FILE = os.path.join(os.path.dirname(__file__), "..", "project.properties.template")
+
+def measure(func, repeat_for_memory=True):
+    """
+    Runs func once for its wall time and, with tracemalloc, once more for its peak memory
+    (tracemalloc slows allocations down, so both are not measured in the same run).
+
+    Returns:
+        - tuple: (result of the timed run, seconds, peak memory in bytes)
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        started_at = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - started_at
+        peak = None
+        if repeat_for_memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result, seconds, peak
+
+def step_result(seconds, peak, items, unit, size_bytes=None):
+    result = {"seconds": round(seconds, 6), unit: items,
+              f"{unit}_per_second": round(items / seconds, 1) if seconds else None,
+              "peak_memory_bytes": peak}
+    if size_bytes is not None:
+        result["bytes"] = size_bytes
+        result["mb_per_second"] = round(size_bytes / seconds / 1e6, 2) if seconds else None
+    return result
+
+def benchmark_scale(nodes, files_per_response, lines_per_file, graph_workers):
+    """
+    Measures every step of the code generation for a backlog with the given number of file nodes.
+    """
+    llm = FakeLLM(model="fake-developer", tasks=nodes, files_per_response=files_per_response, lines_per_file=lines_per_file)
+    developer = Developer("Benchmark Developer", llm, "normal", LANGUAGE, interactive=False)
+    results = {"nodes": nodes}
+
+    backlog = llm.backlog(f"BACKLOG {nodes}")
+    task_graph, seconds, peak = measure(lambda: build_task_graph(backlog))
+    results["build_task_graph"] = step_result(seconds, peak, nodes, "nodes", len(backlog))
+
+    # Responses of every file node, as returned by the model
+    file_nodes = task_graph.nodes[0].subnodes
+    prompts = [f"{developer.prompts.code_prompt_instruction()}{node.name}\n\n{developer.prompts.develop_code_instructions()}"
+               for node in file_nodes]
+    responses = [llm.respond(prompt) for prompt in prompts]
+    response_bytes = sum(len(response) for response in responses)
+
+    parsed, seconds, peak = measure(lambda: [developer._parse_code_response(response) for response in responses])
+    parsed_files = [content for files in parsed for content in files.values()]
+    results["parse_code_response"] = step_result(seconds, peak, len(responses), "responses", response_bytes)
+
+    cleaned, seconds, peak = measure(lambda: [developer.clean_generated_code(content) for content in parsed_files])
+    results["clean_generated_code"] = step_result(seconds, peak, len(parsed_files), "files",
+                                                  sum(len(content) for content in parsed_files))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        def write_files():
+            write_buffer = StagedWriteBuffer(developer.extract_headers)
+            for index, content in enumerate(cleaned):
+                write_buffer.add(os.path.join(output_dir, f"module{index % 100}", f"file{index}.txt"), content)
+            write_buffer.flush()
+            shutil.rmtree(output_dir)
+            os.makedirs(output_dir)
+        _, seconds, peak = measure(write_files)
+        results["write_files"] = step_result(seconds, peak, len(cleaned), "files", sum(len(content) for content in cleaned))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        def process_graph():
+            development_dir = tempfile.mkdtemp(dir=output_dir)
+            process_task_graph(developer, task_graph, development_dir, max_workers=graph_workers)
+            return sum(len(files) for _, _, files in os.walk(development_dir))
+        files_written, seconds, peak = measure(process_graph)
+        results["process_task_graph"] = step_result(seconds, peak, nodes, "nodes")
+        results["process_task_graph"]["files_written"] = files_written
+        results["process_task_graph"]["graph_workers"] = graph_workers
+
+    return results
+
+def benchmark_pipeline(nodes, files_per_response, lines_per_file):
+    """
+    Runs main.run_pipeline with the fake models (all components, "normal" style).
+    """
+    try:
+        import main
+    except ImportError as e:
+        return {"skipped": str(e)}
+
+    project_name = f"_benchmark_{nodes}_nodes"
+    project_path = os.path.join(os.path.dirname(os.path.abspath(main.__file__)), "build", project_name)
+    factories = []
+
+    def run():
+        shutil.rmtree(project_path, ignore_errors=True)
+        factory = fake_llm_factory(tasks=nodes, files_per_response=files_per_response, lines_per_file=lines_per_file)
+        factories.append(factory)
+        main.run_pipeline(project_name, PROPERTIES_FILE, "normal", LANGUAGE, False, True, True, True, llm_factory=factory)
+
+    try:
+        _, seconds, peak = measure(run)
+    finally:
+        shutil.rmtree(project_path, ignore_errors=True)
+    model_calls = sum(llm.calls for llm in factories[0].models)
+    return {"seconds": round(seconds, 6), "file_nodes_per_graph": nodes, "model_calls": model_calls,
+            "model_calls_per_second": round(model_calls / seconds, 1) if seconds else None, "peak_memory_bytes": peak}
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the codegenies pipeline with a fake model.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000], help="File nodes per task graph.")
+    parser.add_argument("--files-per-response", type=int, default=2)
+    parser.add_argument("--lines-per-file", type=int, default=40)
+    parser.add_argument("--graph-workers", type=int, default=1)
+    parser.add_argument("--skip-pipeline", action="store_true", help="Only measure the individual steps.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"files_per_response": args.files_per_response, "lines_per_file": args.lines_per_file},
+        "scales": [],
+    }
+    for nodes in args.scales:
+        results = benchmark_scale(nodes, args.files_per_response, args.lines_per_file, args.graph_workers)
+        if not args.skip_pipeline:
+            results["run_pipeline"] = benchmark_pipeline(nodes, args.files_per_response, args.lines_per_file)
+        report["scales"].append(results)
+        print(f"{nodes} nodes done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/fake_llm.py
+"""
+fake_llm.py
+
+Deterministic in-process stand-in for the Ollama models, used to measure the
+framework's own overhead without a model server. The response is chosen from the
+prompt (backlog template, "##begin##" code instructions, test evaluation or a
+plain report) and generated from a seed derived from the prompt, so the same
+prompt always gets the same answer.
+
+Classes:
+
+- FakeLLM: Implements the parts of the langchain Ollama interface used by the agents
+  (model, num_ctx, _default_params, invoke, generate, stream).
+  - __init__(self, model, tasks, subtasks, files_per_response, lines_per_file, report_paragraphs, chunk_size, num_ctx):
+    - tasks (int): Number of file tasks (graph nodes) in each generated backlog.
+    - subtasks (int): Function lines under each file task.
+    - files_per_response (int): Files in each "##begin##/##end##" code response.
+    - lines_per_file (int): Lines of each generated file.
+    - report_paragraphs (int): Paragraphs of each generated report.
+    - chunk_size (int): Size of the chunks yielded by stream().
+    - num_ctx (int): Context window seen by the prompt token budget (not enforced).
+
+Functions:
+
+- fake_llm_factory(**settings): Returns a factory with the signature of the Ollama constructor.
+"""
+import hashlib
+import random
+import re
+
+# File extensions used for the generated tasks
+EXTENSIONS = ("py", "js", "ts", "css", "sql")
+
+# Lines of the generated code files, including markup the developer has to clean
+CODE_TEMPLATES = {
+    "py": ["import os", "from typing import List", "#comment without space {i}", "def handler_{i}(request):",
+           "    return compute({i})", "**Section {i}**", "* note {i}"],
+    "js": ["const lib{i} = require('lib');", "////comment {i}", "function f{i}() {{ return {i}; }}", "* note {i}"],
+    "ts": ["import {{ Service{i} }} from './service';", "//comment {i}", "export const value{i}: number = {i};"],
+    "css": ["/* styles {i} */", ".class-{i} {{ color: red; }}", "/*comment {i}*/", "**Title {i}**"],
+    "sql": ["-- query {i}", "SELECT id_{i} FROM items;", "----comment {i}", "**Table {i}**"],
+}
+
+# Prompt markers used to choose the kind of response
+FILE_NAME_PATTERN = re.compile(r'##([\w./-]+\.[a-z]{2,4})\b')
+BACKLOG_MARKER = "BACKLOG"
+CODE_MARKER = "##begin##"
+EVALUATION_MARKERS = ("success (in English)", "success (em inglês)")
+
+class FakeGeneration:
+    def __init__(self, text):
+        self.text = text
+        self.generation_info = {"eval_count": max(1, len(text) // 4)}
+
+class FakeLLMResult:
+    def __init__(self, text):
+        self.generations = [[FakeGeneration(text)]]
+
+class FakeLLM:
+    """
+    Deterministic fake model replaying synthetic reports, backlogs and code responses.
+    """
+    def __init__(self, model="fake", tasks=10, subtasks=3, files_per_response=2, lines_per_file=40,
+                 report_paragraphs=20, chunk_size=64, num_ctx=None):
+        self.model = model
+        self.num_ctx = num_ctx
+        self.tasks = tasks
+        self.subtasks = subtasks
+        self.files_per_response = files_per_response
+        self.lines_per_file = lines_per_file
+        self.report_paragraphs = report_paragraphs
+        self.chunk_size = chunk_size
+        self.calls = 0
+
+    @property
+    def _default_params(self):
+        return {"model": self.model, "tasks": self.tasks, "files_per_response": self.files_per_response,
+                "lines_per_file": self.lines_per_file}
+
+    def _random(self, prompt):
+        return random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+    def respond(self, prompt):
+        """
+        Returns the response to a prompt.
+        """
+        self.calls += 1
+        if CODE_MARKER in prompt:
+            return self.code_response(prompt)
+        if any(marker in prompt for marker in EVALUATION_MARKERS):
+            return "success"
+        if BACKLOG_MARKER in prompt:
+            return self.backlog(prompt)
+        return self.report(prompt)
+
+    def report(self, prompt):
+        rng = self._random(prompt)
+        words = ("module", "service", "controller", "model", "endpoint", "view", "component", "test", "data", "user")
+        paragraphs = []
+        for index in range(self.report_paragraphs):
+            sentence = " ".join(rng.choice(words) for _ in range(40))
+            paragraphs.append(f"**Section {index + 1}**\n{sentence.capitalize()}.")
+        return "\n\n".join(paragraphs)
+
+    def backlog(self, prompt):
+        """
+        Backlog in the format of the squad leader templates, with self.tasks file tasks.
+        """
+        rng = self._random(prompt)
+        lines = ["**Create Files, Folders, Classes, and Functions**", ""]
+        for index in range(1, self.tasks + 1):
+            extension = EXTENSIONS[rng.randrange(len(EXTENSIONS))]
+            lines.append(f"{index:03d}.##module{index}/item{index}_service.{extension}: Implements the item {index} service.")
+            for subtask in range(self.subtasks):
+                lines.append(f"   *Function operation{index}_{subtask}(): Handles operation {subtask} of item {index}.")
+        return "\n".join(lines)
+
+    def code_response(self, prompt):
+        """
+        Multi-file "##begin##/##end##" response for the file named in the prompt.
+        """
+        rng = self._random(prompt)
+        match = FILE_NAME_PATTERN.search(prompt.replace(CODE_MARKER, ""))
+        main_file = match.group(1).split("/")[-1] if match else "main.py"
+        base, _, extension = main_file.rpartition(".")
+        templates = CODE_TEMPLATES.get(extension, CODE_TEMPLATES["py"])
+        parts = [f"Here is the code for {main_file}:"]
+        for file_index in range(self.files_per_response):
+            filename = main_file if file_index == 0 else f"{base}_part{file_index}.{extension}"
+            parts.append(f"##begin##{filename}")
+            parts.append(f"```{extension}")
+            offset = rng.randrange(1000)
+            parts.extend(templates[i % len(templates)].format(i=offset + i) for i in range(self.lines_per_file))
+            parts.append("```")
+            parts.append(f"##end##{filename}")
+        return "\n".join(parts)
+
+    def invoke(self, prompt):
+        return self.respond(prompt)
+
+    def generate(self, prompts):
+        return FakeLLMResult(self.respond(prompts[0]))
+
+    def stream(self, prompt):
+        response = self.respond(prompt)
+        for start in range(0, len(response), self.chunk_size):
+            yield response[start:start + self.chunk_size]
+
+def fake_llm_factory(**settings):
+    """
+    Returns a factory creating FakeLLM objects, called like the Ollama constructor (model=...).
+    The created models are kept in the factory's "models" list.
+    """
+    def factory(model, num_ctx=None, **kwargs):
+        llm = FakeLLM(model=model, num_ctx=num_ctx, **settings)
+        factory.models.append(llm)
+        return llm
+    factory.models = []
+    return factory
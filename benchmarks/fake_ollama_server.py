@@ -0,0 +1,263 @@
+# benchmarks/fake_ollama_server.py
+"""
+fake_ollama_server.py
+
+Local stand-in for the Ollama HTTP server, answering the generate API
+(POST /api/generate, streamed or not) and the model lists (GET /api/tags, /api/ps) with the
+deterministic FakeLLM responses (benchmarks/fake_llm.py). It imitates the parts of
+the protocol the first-party client relies on:
+
+- "context": every response returns the evaluated text as context state, and a
+  request carrying a context continues it, so only the new prompt is counted in
+  prompt_eval_count (as Ollama does with its KV cache);
+- "options.num_predict" = 0 evaluates the prompt without generating text;
+- an empty prompt loads the model and "keep_alive" = 0 unloads it. Only
+  max_loaded_models models stay loaded, and loading one takes load_latency seconds;
+- connections are kept alive (HTTP/1.1) between non-streamed requests.
+
+The next fail_requests generate requests answer HTTP 503, like a restarting
+server, to exercise the client retries.
+
+The counters (requests, prompt tokens evaluated) show how much prefill work the
+client avoided. Started with context=False, the server never returns a context,
+like servers or models that cannot reuse it.
+
+Classes:
+
+- FakeOllamaServer: Threaded fake server.
+  - __init__(self, port, context, latency, chunk_size, max_loaded_models, load_latency, fail_requests, **fake_settings):
+    port 0 picks a free port.
+  - start() / stop(): Runs the server in a background thread (also usable with "with").
+  - url: Base URL of the server.
+  - stats(): Returns the request, connection and token counters.
+
+Usage (from the project root):
+    python -m benchmarks.fake_ollama_server [--port 11434] [--no-context]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fake_llm import FakeLLM
+
+def count_tokens(text):
+    return max(1, len(text) // 4) if text else 0
+
+def encode_context(text):
+    """
+    Context state of an evaluated text (the server keeps no session: the state is the text itself).
+    """
+    return [ord(character) for character in text]
+
+def decode_context(context):
+    return "".join(chr(code) for code in context or ())
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeOllama/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.fake.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": name} for name in sorted(self.server.fake.models)]})
+        elif self.path == "/api/ps":
+            self._send_json(200, {"models": [{"name": name} for name in self.server.fake.loaded_models()]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        fake = self.server.fake
+        if fake.take_failure():
+            self._send_json(503, {"error": "server is restarting"})
+            return
+        if "context" in payload and not fake.context:
+            self._send_json(400, {"error": "context is not supported"})
+            return
+        model = payload.get("model", "fake")
+        prompt = payload.get("prompt", "")
+        options = payload.get("options") or {}
+        started_at = time.perf_counter()
+        if payload.get("keep_alive") in (0, "0", "0s"):
+            fake.unload(model)
+            self._send_json(200, {"model": model, "response": "", "done": True, "done_reason": "unload"})
+            return
+        fake.load(model)
+        if not prompt and "context" not in payload:
+            self._send_json(200, {"model": model, "response": "", "done": True, "done_reason": "load",
+                                  "load_duration": int((time.perf_counter() - started_at) * 1e9)})
+            return
+        text = decode_context(payload.get("context")) + prompt
+        response = "" if options.get("num_predict") == 0 else fake.llm(model).respond(text)
+        if fake.latency:
+            time.sleep(fake.latency)
+        fake.record(model, count_tokens(prompt), count_tokens(response))
+        final = {"model": model, "done": True, "prompt_eval_count": count_tokens(prompt),
+                 "eval_count": count_tokens(response), "total_duration": int((time.perf_counter() - started_at) * 1e9)}
+        if fake.context:
+            final["context"] = encode_context(text + response)
+        if not payload.get("stream", True):
+            self._send_json(200, {**final, "response": response})
+            return
+        # The streamed body has no length: the connection ends with it
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for start in range(0, len(response), fake.chunk_size):
+            chunk = {"model": model, "response": response[start:start + fake.chunk_size], "done": False}
+            self.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+        self.wfile.write((json.dumps({**final, "response": ""}) + "\n").encode("utf-8"))
+
+class FakeOllamaServer:
+    """
+    Fake Ollama server running in a background thread.
+    """
+    def __init__(self, port=0, context=True, latency=0.0, chunk_size=64, max_loaded_models=1, load_latency=0.0,
+                 fail_requests=0, **fake_settings):
+        self.context = context
+        self.latency = latency
+        self.max_loaded_models = max_loaded_models
+        self.load_latency = load_latency
+        self.loads = 0
+        self._loaded = []
+        self.chunk_size = chunk_size
+        self.fake_settings = fake_settings
+        self.models = {}
+        self.fail_requests = fail_requests
+        self.failures = 0
+        self.connections = 0
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def llm(self, model):
+        with self._lock:
+            if model not in self.models:
+                self.models[model] = FakeLLM(model=model, **self.fake_settings)
+            return self.models[model]
+
+    def load(self, model):
+        """
+        Loads a model, unloading the least recently used one when the server is full.
+        """
+        with self._lock:
+            if model in self._loaded:
+                self._loaded.remove(model)
+                self._loaded.append(model)
+                return
+            while len(self._loaded) >= self.max_loaded_models:
+                self._loaded.pop(0)
+            self._loaded.append(model)
+            self.loads += 1
+        if self.load_latency:
+            time.sleep(self.load_latency)
+
+    def unload(self, model):
+        with self._lock:
+            if model in self._loaded:
+                self._loaded.remove(model)
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._loaded)
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def take_failure(self):
+        """
+        Tells whether the current request must fail (one of the next fail_requests requests).
+        """
+        with self._lock:
+            if self.fail_requests <= 0:
+                return False
+            self.fail_requests -= 1
+            self.failures += 1
+            return True
+
+    def record(self, model, prompt_tokens, response_tokens):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.response_tokens += response_tokens
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "prompt_tokens": self.prompt_tokens, "response_tokens": self.response_tokens,
+                    "loads": self.loads, "connections": self.connections, "failures": self.failures}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server answering with deterministic responses.")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--no-context", action="store_true", help="Never return or accept a context state.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request.")
+    parser.add_argument("--max-loaded-models", type=int, default=1)
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Seconds taken to load a model.")
+    parser.add_argument("--fail-requests", type=int, default=0, help="Number of first requests answered with HTTP 503.")
+    args = parser.parse_args()
+    server = FakeOllamaServer(args.port, context=not args.no_context, latency=args.latency,
+                              max_loaded_models=args.max_loaded_models, load_latency=args.load_latency,
+                              fail_requests=args.fail_requests)
+    print(f"Fake Ollama server listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/pattern_matching.py
+"""
+pattern_matching.py
+
+Benchmark of the pattern engine over a large synthetic LLM output: compares the
+previous per-pattern re.search() loops (and the extension regex rebuilt for every
+line) with the patterns compiled once in utils/pattern_matching.py.
+
+Usage (from the project root):
+    python -m benchmarks.pattern_matching [files]
+"""
+import re
+import sys
+import time
+from utils.pattern_matching import PatternMatching, FILENAME_PATTERNS_NO_HASHTAG, LANGUAGE_EXTENSION_PATTERN
+
+def synthetic_response(files):
+    """
+    Builds a multi-file response with ##begin##/##end## markers, comments and code lines.
+    """
+    lines = []
+    extensions = ["py", "js", "ts", "html", "css", "java"]
+    for index in range(files):
+        filename = f"module_{index}/file_{index}.{extensions[index % len(extensions)]}"
+        lines.append(f"##begin##{filename}")
+        lines.append("```")
+        for line in range(40):
+            lines.append(f"    value_{line} = compute(value_{line - 1}, '{filename}')  # step {line}")
+        lines.append("```")
+        lines.append(f"##end##{filename}")
+    return lines
+
+def previous_engine(lines, pm):
+    matches = 0
+    patterns = pm.filename_matching_patterns_no_hashtag()
+    for line in lines:
+        if "##begin##" in line:
+            for pattern, group_index in patterns:
+                if re.search(pattern, line):
+                    matches += 1
+                    break
+        # Extension regex rebuilt for every line
+        pattern = r'\b\w+\.(' + '|'.join(pm.language_extensions_list()) + r')\b'
+        if re.search(pattern, line, re.IGNORECASE):
+            matches += 1
+    return matches
+
+def compiled_engine(lines):
+    matches = 0
+    for line in lines:
+        if "##begin##" in line and FILENAME_PATTERNS_NO_HASHTAG.match(line):
+            matches += 1
+        if LANGUAGE_EXTENSION_PATTERN.search(line):
+            matches += 1
+    return matches
+
+def measure(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started_at
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    lines = synthetic_response(files)
+    pm = PatternMatching()
+
+    previous_matches, previous_time = measure(previous_engine, lines, pm)
+    compiled_matches, compiled_time = measure(compiled_engine, lines)
+    assert previous_matches == compiled_matches
+
+    print(f"lines: {len(lines)}")
+    print(f"per-pattern search : {len(lines) / previous_time:12.0f} lines/s")
+    print(f"compiled engine    : {len(lines) / compiled_time:12.0f} lines/s ({previous_time / compiled_time:.1f}x)")
+
+if __name__ == "__main__":
+    main()
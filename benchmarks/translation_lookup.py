@@ -0,0 +1,54 @@
+# benchmarks/translation_lookup.py
+"""
+translation_lookup.py
+
+Micro-benchmark of translate_string(): compares the per-lookup cost of the
+previous implementation (one json file read per lookup) with the in-memory catalog.
+
+Usage (from the project root):
+    python -m benchmarks.translation_lookup [lookups]
+"""
+import sys
+import timeit
+from utils import translation_utils
+from utils.translation_utils import preload_translations, translate_string
+
+# Lookups performed by a typical run: agent messages and prompt fragments
+LOOKUPS = [
+    ("base_agent", "base_agent_evaluating_prompt", "en-us"),
+    ("base_agent", "base_agent_model_response", "pt-br"),
+    ("developer_prompts", "develop_code_instructions", "en-us"),
+    ("developer_prompts", "code_prompt_instruction", "pt-br"),
+    ("main", "pycache_removed", "en-us"),
+    ("squad_leader_prompts", "backend_instructions", "pt-br"),
+]
+
+def translate_string_from_disk(module_name, key, language):
+    """
+    Previous implementation: reads and parses the json file on every call.
+    """
+    translations_file = translation_utils._translations_file(module_name)
+    translations = translation_utils._read_translations_file(translations_file).get(language, {})
+    return translations.get(key, key)
+
+def run_lookups(translate, repetitions):
+    for _ in range(repetitions):
+        for module_name, key, language in LOOKUPS:
+            translate(module_name, key, language)
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    lookups = repetitions * len(LOOKUPS)
+
+    disk_time = timeit.timeit(lambda: run_lookups(translate_string_from_disk, repetitions), number=1)
+    catalog_time = timeit.timeit(lambda: run_lookups(translate_string, repetitions), number=1)
+
+    json_cold_start = timeit.timeit(lambda: preload_translations(), number=20) / 20
+
+    print(f"lookups: {lookups}")
+    print(f"json file per lookup : {disk_time / lookups * 1e6:10.3f} us/lookup")
+    print(f"in-memory catalog    : {catalog_time / lookups * 1e6:10.3f} us/lookup ({disk_time / catalog_time:.0f}x faster)")
+    print(f"preload from json    : {json_cold_start * 1e3:10.3f} ms")
+
+if __name__ == "__main__":
+    main()
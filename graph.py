@@ -5,26 +5,103 @@ graph.py
 This file contains functions for constructing and processing task graphs. 
 Graphs are used to organize and manage project development and testing tasks.
 
+A task graph is a tree of typed nodes (groups, files, functions and other tasks,
+in backlog order) plus a DAG of dependency edges between file nodes, inferred
+from the path and import references found in the backlog. Nodes use __slots__,
+node kinds and parents are kept in arrays indexed by node, and the dependency
+edges are stored in compressed arrays (offsets + targets).
+
+Classes:
+
+- Node: Task node (name, kind, normalized path of file nodes, subnodes).
+- Graph: Task graph.
+  - nodes: Root nodes, in backlog order.
+  - path_index: Normalized file path -> file nodes.
+  - dependencies(node) / dependents(node): Dependency edges of a node.
+  - topological_levels(kinds): Nodes grouped in levels, each level only depending on the previous ones.
+  - to_dict() / from_dict(data): JSON compatible serialization.
+
 Main Functions:
 
+- normalize_path(path): Normalizes a file path referenced in a backlog.
+
 - build_task_graph(backlog): Builds a task graph from a backlog.
   - backlog (str): Task backlog in string format.
 
-- process_task_graph(agent, task_graph, output_dir): Processes a task graph and generates corresponding code files.
+- process_task_graph(agent, task_graph, output_dir, max_workers, max_buffered_bytes): Processes a task graph and generates corresponding code files.
   - agent (object): Agent responsible for processing tasks (Developer or Tester).
   - task_graph (Graph): Task graph to be processed.
   - output_dir (str): Output directory where generated files will be saved.
+  - max_workers (int): Number of file nodes processed concurrently, each one once the nodes it depends on are done.
+  - max_buffered_bytes (int): Staged code size that triggers writing the files before the end of the graph.
+  - manifest (NodeManifest): Optional record of the finished nodes, used for resumed and incremental runs.
+  - checkpoint_nodes / checkpoint_seconds (int): With a manifest, the staged files are written and their nodes
+    recorded every checkpoint_nodes finished nodes or checkpoint_seconds seconds.
+  - batch_size (int): Number of file nodes whose prompts are sent together (0 = one node per call).
 """
 
-import re
 import os
+import posixpath
+import re
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import unidecode
 from utils.pattern_matching import PatternMatching
+from utils.write_buffer import StagedWriteBuffer, DEFAULT_MAX_BUFFERED_BYTES
+from utils.tracing import traced
+from utils.translation_utils import translate_string
+
+# With a manifest, the finished nodes are written and recorded at least this often (nodes, seconds)
+DEFAULT_CHECKPOINT_NODES = 8
+DEFAULT_CHECKPOINT_SECONDS = 60
+
+# Format version of the serialized graphs (part of the checkpoint fingerprints)
+GRAPH_FORMAT_VERSION = 2
+
+# Node kinds
+GROUP = "group"
+FILE = "file"
+FUNCTION = "function"
+TASK = "task"
+NODE_KINDS = (GROUP, FILE, FUNCTION, TASK)
+_KIND_CODES = {kind: code for code, kind in enumerate(NODE_KINDS)}
+
+# File path of a "##path/file.ext: description" task line
+FILE_PATH_PATTERN = re.compile(r'##\s*([^\s:*`\'"]+)')
+# Extension of a file path
+FILE_EXTENSION_PATTERN = re.compile(r'\.[A-Za-z0-9]{1,5}$')
+# Words of a backlog line that may reference a file or a module
+REFERENCE_TOKEN_PATTERN = re.compile(r'[\w@~./-]+')
+
+def normalize_path(path):
+    """
+    Normalizes a file path found in a backlog: forward slashes, no "./" or leading "/",
+    no trailing punctuation, "." and ".." segments resolved.
+    """
+    path = path.replace('\\', '/').strip().rstrip('.,;:)')
+    while path.startswith(('./', '../', '@/', '~/')):
+        path = path.split('/', 1)[1]
+    path = posixpath.normpath(path.lstrip('/')) if path else ''
+    return '' if path == '.' else path
+
+def is_group_line(line):
+    """
+    Tells whether a backlog line opens a task category.
+    """
+    return line.startswith("**") and line.endswith("**") or \
+        "Criar Arquivos, Pastas, Classes e Funções" in line or \
+        "Create Files, Folders, Classes, and Functions" in line
 
 class Node:
-    def __init__(self, name):
+    __slots__ = ("name", "kind", "path", "subnodes", "index")
+
+    def __init__(self, name, kind=TASK, path=None):
         self.name = name
+        self.kind = kind
+        self.path = path        # Normalized file path (file nodes only)
         self.subnodes = []
+        self.index = -1         # Position in Graph.all_nodes
 
     def add_subnode(self, subnode):
         self.subnodes.append(subnode)
@@ -35,14 +112,252 @@ class Node:
 class Graph:
     def __init__(self):
         self.nodes = []
+        self.all_nodes = []             # Every node, indexed by Node.index
+        self.kinds = array('b')         # Kind code of every node
+        self.parents = array('i')       # Parent index of every node (-1 for root nodes)
+        self.path_index = {}            # Normalized path -> file nodes
+        self._children = {}             # (parent index, name) -> node, merges repeated lines of a parent
+        self._dependency_offsets = array('i', [0])
+        self._dependency_targets = array('i')
+        self._dependent_offsets = array('i', [0])
+        self._dependent_targets = array('i')
+        self._indexed = True
 
     def add_node(self, node):
         self.nodes.append(node)
+        self._indexed = False
+
+    def add_child(self, parent, name, kind, path=None):
+        """
+        Adds a node under parent (None for a root node). A line repeated under the same
+        parent returns the existing node; the same line under another parent is a distinct node.
+        """
+        parent_index = parent.index if parent is not None else -1
+        node = self._children.get((parent_index, name))
+        if node is not None:
+            return node
+        node = Node(name, kind, path)
+        node.index = len(self.all_nodes)
+        self.all_nodes.append(node)
+        self.kinds.append(_KIND_CODES[kind])
+        self.parents.append(parent_index)
+        self._children[(parent_index, name)] = node
+        if parent is None:
+            self.nodes.append(node)
+        else:
+            parent.subnodes.append(node)
+        if path:
+            self.path_index.setdefault(path, []).append(node)
+        self._dependency_offsets.append(self._dependency_offsets[-1])
+        self._dependent_offsets.append(self._dependent_offsets[-1])
+        return node
+
+    def _ensure_index(self):
+        """
+        Indexes nodes added with add_node()/add_subnode() (graphs built by hand).
+        """
+        if self._indexed:
+            return
+        nodes = self.nodes
+        self.__init__()
+        pending = [(node, -1) for node in reversed(nodes)]
+        while pending:
+            node, parent_index = pending.pop()
+            if parent_index == -1:
+                self.nodes.append(node)
+            node.index = len(self.all_nodes)
+            self.all_nodes.append(node)
+            self.kinds.append(_KIND_CODES.get(node.kind, _KIND_CODES[TASK]))
+            self.parents.append(parent_index)
+            if node.path:
+                self.path_index.setdefault(node.path, []).append(node)
+            self._dependency_offsets.append(0)
+            self._dependent_offsets.append(0)
+            pending.extend((subnode, node.index) for subnode in reversed(node.subnodes))
+        self._indexed = True
+
+    def set_dependencies(self, edges):
+        """
+        Stores the dependency edges as compressed arrays.
+
+        Args:
+            - edges (iterable): (node index, index of the node it depends on) pairs.
+        """
+        self._ensure_index()
+        count = len(self.all_nodes)
+        self._dependency_offsets, self._dependency_targets = _compressed_adjacency(count, edges, reverse=False)
+        self._dependent_offsets, self._dependent_targets = _compressed_adjacency(count, edges, reverse=True)
+
+    def dependencies(self, node):
+        """
+        Returns the nodes the given node depends on.
+        """
+        self._ensure_index()
+        start, end = self._dependency_offsets[node.index], self._dependency_offsets[node.index + 1]
+        return [self.all_nodes[target] for target in self._dependency_targets[start:end]]
+
+    def dependents(self, node):
+        """
+        Returns the nodes depending on the given node.
+        """
+        self._ensure_index()
+        start, end = self._dependent_offsets[node.index], self._dependent_offsets[node.index + 1]
+        return [self.all_nodes[target] for target in self._dependent_targets[start:end]]
+
+    def edges(self):
+        """
+        Yields the (node, dependency) pairs of the graph.
+        """
+        self._ensure_index()
+        for index, node in enumerate(self.all_nodes):
+            for target in self._dependency_targets[self._dependency_offsets[index]:self._dependency_offsets[index + 1]]:
+                yield node, self.all_nodes[target]
+
+    def nodes_of_kind(self, kind):
+        self._ensure_index()
+        code = _KIND_CODES[kind]
+        return [node for node, node_code in zip(self.all_nodes, self.kinds) if node_code == code]
+
+    def topological_levels(self, kinds=(FILE,)):
+        """
+        Groups the nodes of the given kinds in levels: every node only depends on
+        nodes of previous levels, so the nodes of a level can be processed in parallel.
+        Nodes left in a dependency cycle are placed together in a last level.
+
+        Returns:
+            - list: Lists of nodes, in backlog order inside each level.
+        """
+        self._ensure_index()
+        codes = {_KIND_CODES[kind] for kind in kinds}
+        selected = [index for index, code in enumerate(self.kinds) if code in codes]
+        selected_set = set(selected)
+        remaining = {}
+        for index in selected:
+            targets = self._dependency_targets[self._dependency_offsets[index]:self._dependency_offsets[index + 1]]
+            remaining[index] = sum(1 for target in targets if target in selected_set)
+        levels = []
+        current = [index for index in selected if remaining[index] == 0]
+        placed = 0
+        while current:
+            levels.append([self.all_nodes[index] for index in current])
+            placed += len(current)
+            following = []
+            for index in current:
+                for dependent in self._dependent_targets[self._dependent_offsets[index]:self._dependent_offsets[index + 1]]:
+                    if dependent in remaining:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            following.append(dependent)
+            current = sorted(following)
+        if placed < len(selected):
+            levels.append([self.all_nodes[index] for index in selected if remaining[index] > 0])
+        return levels
+
+    def infer_dependencies(self):
+        """
+        Infers the dependency edges between file nodes: a file depends on the files
+        its task line or its subtasks reference by path, file name or module name
+        ("models/user.model.js", "user.model.js", "./models/user.model", "models.user").
+        """
+        self._ensure_index()
+        references = {}
+        for path in self.path_index:
+            segments = path.split('/')
+            stem_segments = FILE_EXTENSION_PATTERN.sub('', path).split('/')
+            keys = {segments[-1]}
+            # Bare file stems are only used when they are distinctive ("user.model", "user_service")
+            if any(separator in stem_segments[-1] for separator in '._-'):
+                keys.add(stem_segments[-1])
+            # Every trailing part of the path, as a path or a module: "src/utils/helpers.js",
+            # "utils/helpers.js", "utils/helpers", "utils.helpers"
+            for start in range(len(segments) - 1):
+                keys.add('/'.join(segments[start:]))
+                keys.add('/'.join(stem_segments[start:]))
+                keys.add('.'.join(stem_segments[start:]))
+            for key in keys:
+                references.setdefault(key, set()).add(path)
+        # Ambiguous references (two files named index.js in different folders) are ignored
+        references = {key: next(iter(paths)) for key, paths in references.items() if len(paths) == 1}
+
+        edges = set()
+        for node in self.all_nodes:
+            if node.kind != FILE:
+                continue
+            text = " ".join([node.name] + [subnode.name for subnode in node.subnodes])
+            for token in REFERENCE_TOKEN_PATTERN.findall(text):
+                token = token.strip('.-')
+                path = references.get(token)
+                if path is None and '/' in token:
+                    path = references.get(normalize_path(token))
+                if path is None or path == node.path:
+                    continue
+                for target in self.path_index[path]:
+                    edges.add((node.index, target.index))
+        self.set_dependencies(sorted(edges))
+
+    def to_dict(self):
+        """
+        Serializes the graph into JSON compatible data: node names, kind codes
+        and parent indexes in node order, plus the flattened dependency edges.
+        """
+        self._ensure_index()
+        edges = []
+        for node, dependency in self.edges():
+            edges.extend((node.index, dependency.index))
+        return {
+            "version": GRAPH_FORMAT_VERSION,
+            "names": [node.name for node in self.all_nodes],
+            "kinds": self.kinds.tolist(),
+            "parents": self.parents.tolist(),
+            "edges": edges,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds a graph serialized by to_dict().
+        """
+        if data.get("version") != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported task graph format: {data.get('version')}")
+        graph = cls()
+        for name, kind_code, parent_index in zip(data["names"], data["kinds"], data["parents"]):
+            kind = NODE_KINDS[kind_code]
+            path = _task_file_path(name) if kind == FILE else None
+            parent = graph.all_nodes[parent_index] if parent_index >= 0 else None
+            graph.add_child(parent, name, kind, path)
+        edges = data["edges"]
+        graph.set_dependencies(zip(edges[0::2], edges[1::2]))
+        return graph
 
     def __repr__(self):
         return f"Graph(nodes={len(self.nodes)})"
 
+def _compressed_adjacency(count, edges, reverse):
+    """
+    Builds (offsets, targets) arrays: the targets of node i are targets[offsets[i]:offsets[i + 1]].
+    """
+    edges = [(target, source) if reverse else (source, target) for source, target in edges]
+    edges.sort()
+    offsets = array('i', [0]) * (count + 1)
+    targets = array('i', (target for _, target in edges))
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for index in range(count):
+        offsets[index + 1] += offsets[index]
+    return offsets, targets
+
+def _task_file_path(line):
+    """
+    Returns the normalized file path of a "##path/file.ext: description" line, or None.
+    """
+    match = FILE_PATH_PATTERN.search(line)
+    if match is None:
+        return None
+    path = normalize_path(match.group(1))
+    return path if FILE_EXTENSION_PATTERN.search(path) else None
+
 
+@traced("build_task_graph", "graph")
 def build_task_graph(backlog):
     """
     Builds a task graph from a backlog.
@@ -55,61 +370,43 @@ def build_task_graph(backlog):
     graph = Graph()
     current_group_node = None
     current_task_node = None
-    nodes = {}
 
     for line in backlog.splitlines():
         line = line.strip()
         if not line:
             continue
         
-        if line.startswith("**") and line.endswith("**") or \
-            "Criar Arquivos, Pastas, Classes e Funções" in line or \
-            "Create Files, Folders, Classes, and Functions" in line:
+        if is_group_line(line):
             # New task category
             group_name = line.strip("**").strip()
-            current_group_node = nodes.setdefault(group_name, Node(group_name))
-            graph.add_node(current_group_node)
+            current_group_node = graph.add_child(None, group_name, GROUP)
             current_task_node = None
             
         elif "##" in line:
             # New task to create folder or file
-            task_name = line
-            task_node = nodes.setdefault(task_name, Node(task_name))
-            if current_group_node:
-                current_group_node.add_subnode(task_node)
-            else:
-                graph.add_node(task_node)
-            current_task_node = task_node
+            path = _task_file_path(line)
+            current_task_node = graph.add_child(current_group_node, line, FILE if path else TASK, path)
     
         elif line.startswith("*") or line.startswith("+"):
             # New function to be created inside a file
             if current_task_node != None:
-                function_name = line
-                function_node = nodes.setdefault(function_name, Node(function_name))
-                current_task_node.add_subnode(function_node)
+                graph.add_child(current_task_node, line, FUNCTION)
             else:
                 # Treat as task if there is no current task node
-                task_name = line
-                task_node = nodes.setdefault(task_name, Node(task_name))
-                if current_group_node:
-                    current_group_node.add_subnode(task_node)
-                else:
-                    graph.add_node(task_node)
+                graph.add_child(current_group_node, line, TASK)
         
         else:
             # Line that does not match any of the categories above
-            task_name = line
-            task_node = nodes.setdefault(task_name, Node(task_name))
-            if current_group_node:
-                current_group_node.add_subnode(task_node)
-            else:
-                graph.add_node(task_node)
-            current_task_node = task_node
+            current_task_node = graph.add_child(current_group_node, line, TASK)
 
+    graph.infer_dependencies()
     return graph
     
 
-def process_task_graph(developer, task_graph, development_dir):
+@traced("process_task_graph", "graph")
+def process_task_graph(developer, task_graph, development_dir, max_workers=1, max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES,
+                       manifest=None, batch_size=0, checkpoint_nodes=DEFAULT_CHECKPOINT_NODES,
+                       checkpoint_seconds=DEFAULT_CHECKPOINT_SECONDS):
     """
     Processes a task graph and generates corresponding code files.
 
@@ -117,19 +414,36 @@ def process_task_graph(developer, task_graph, development_dir):
         - agent (object): Agent responsible for processing tasks (Developer or Tester).
         - task_graph (Graph): Task graph to be processed.
         - output_dir (str): Output directory where generated files will be saved.
+        - max_workers (int): Number of file nodes processed concurrently.
+          Interactive agents are always processed one node at a time.
+        - max_buffered_bytes (int): The generated code is staged in memory and every file is
+          written once at the end of the graph, or earlier when this size is exceeded.
+        - manifest (NodeManifest): Optional record of the finished nodes (see utils/checkpoint.py).
+          Nodes recorded with the same input fingerprint are reused, the others are regenerated
+          (replacing their previous files). A node is recorded once its files are written: by a
+          checkpoint, by a flush triggered by max_buffered_bytes or at the end of the graph, so a
+          crashed run continues from its last checkpoint.
+        - checkpoint_nodes (int): With a manifest, the staged files are written and the nodes recorded
+          once this many finished nodes are pending...
+        - checkpoint_seconds (float): ...or once this many seconds passed since the last checkpoint.
+        - batch_size (int): When above 0 and the agent supports it (see Developer.can_batch_tasks()),
+          the prompts of batch_size nodes are sent together through generate_many(), which keeps
+          BaseAgent.max_in_flight of them in flight. The batches replace the max_workers threads.
+
+    The threads and the batches dispatch each file node as soon as the nodes it depends on
+    (see Graph.dependencies()) are generated, without waiting for unrelated nodes.
+    The results are staged in graph order whatever the dispatch order.
     """
 
     pm = PatternMatching()
 
-    # List of folder name patterns to test
-    patterns = pm.foldername_matching_patterns()
+    # Compiled set of folder name patterns to test
+    patterns = pm.foldername_pattern_set()
 
     # Find the index of the root node starting and ending with "**"
     root_index = None
     for idx, node in enumerate(task_graph.nodes):
-        if node.name.startswith("**") and node.name.endswith("**") or \
-            "Criar Arquivos, Pastas, Classes e Funções" in node.name or \
-            "Create Files, Folders, Classes, and Functions" in node.name :
+        if is_group_line(node.name):
             root_index = idx
             break
 
@@ -138,30 +452,232 @@ def process_task_graph(developer, task_graph, development_dir):
         print("No root node found starting and ending with '**'. unsing index 1 instead of 0.")
         root_index = 1
 
+    # File tasks to be processed, in graph order
+    tasks = []
+
     for node in task_graph.nodes[root_index].subnodes:
         if "##" in node.name:
             node_name = node.name.replace(' ', '_')
-            found_match = False
-
-            # Identifies the task's folder name pattern
-            for pattern, index in patterns:
-                match = re.search(pattern, node_name)
-                if match:
-                    if index == 0:
-                        node_name = match.group(1)
-                    elif index == 1:
-                        node_name = f"{match.group(1)}-{match.group(2)}"
-                    elif index == 2:
-                        node_name = f"{match.group(1)}/{match.group(2)}"
-                    elif index == 3:
-                        node_name = f"{match.group(1)}/{match.group(2)}-{match.group(3)}"
-                    found_match = True
-                    break
-            
-            if not found_match:
+
+            # Identifies the task's folder name pattern (first matching rule wins)
+            match = patterns.match(node_name)
+            if match is None:
                 continue
+            index = match.index
+            if index == 0:
+                node_name = match.group(1)
+            elif index == 1:
+                node_name = f"{match.group(1)}-{match.group(2)}"
+            elif index == 2:
+                node_name = f"{match.group(1)}/{match.group(2)}"
+            elif index == 3:
+                node_name = f"{match.group(1)}/{match.group(2)}-{match.group(3)}"
 
             node_name = unidecode.unidecode(node_name)
             node_development_dir = os.path.join(development_dir, node_name)
-            # Process Task
-            developer.process_task(node, node_development_dir)
+            tasks.append((node, node_development_dir))
+
+    # Nodes whose inputs did not change since the previous run are reused
+    fingerprints = {}
+    if manifest is not None:
+        fingerprints = {node.name: developer.task_fingerprint(node) for node, _ in tasks}
+        tasks, reused_count = _plan_incremental_build(manifest, tasks, fingerprints)
+        if reused_count:
+            print(translate_string("developer", "nodes_reused", developer.language).format(count=reused_count, name=developer.name))
+
+    # Contributions of all nodes are merged per file and each file is written once, or at each
+    # checkpoint with a manifest. Staged nodes are recorded once their files are written
+    # (see _record_written_nodes())
+    write_buffer = StagedWriteBuffer(developer.extract_headers, max_buffered_bytes)
+    pending = []
+    checkpoint = _Checkpoint(checkpoint_nodes, checkpoint_seconds) if manifest is not None else None
+
+    try:
+        if batch_size > 0 and developer.can_batch_tasks():
+            results = {}
+            staged = 0
+            tracker = _DependencyTracker(task_graph, tasks)
+            ready = []
+            while True:
+                ready.extend(tracker.take_ready(idle=not ready))
+                if not ready:
+                    break
+                positions, ready = ready[:batch_size], ready[batch_size:]
+                batch = [tasks[position] for position in positions]
+                for position, files in zip(positions, developer.process_task_batch(batch)):
+                    results[position] = files
+                    tracker.finished(position)
+                staged = _stage_ready_tasks(write_buffer, pending, manifest, tasks, results, staged, fingerprints,
+                                            checkpoint)
+        elif max_workers <= 1 or developer.interactive or len(tasks) <= 1:
+            for node, node_development_dir in tasks:
+                # Process Task
+                if manifest is None:
+                    developer.process_task(node, node_development_dir, emit=write_buffer.add)
+                else:
+                    files = _generate_task_files(developer, node, node_development_dir)
+                    _stage_node_files(write_buffer, pending, manifest, node, files, fingerprints.get(node.name), checkpoint)
+        else:
+            results = {}
+            staged = 0
+            tracker = _DependencyTracker(task_graph, tasks)
+            running = {}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    for position in tracker.take_ready(idle=not running):
+                        running[executor.submit(_generate_task_files, developer, *tasks[position])] = position
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        position = running.pop(future)
+                        results[position] = future.result()
+                        tracker.finished(position)
+                    staged = _stage_ready_tasks(write_buffer, pending, manifest, tasks, results, staged, fingerprints,
+                                                checkpoint)
+    finally:
+        write_buffer.flush()
+        _record_written_nodes(write_buffer, manifest, pending)
+        for path, error in write_buffer.failures:
+            developer.report_write_failure(path, error)
+
+class _DependencyTracker:
+    """
+    Dispatch order of the tasks: a task is ready once the tasks of the file nodes it depends on
+    (see Graph.dependencies()) are finished. Nodes reused from a previous run are already done.
+    Tasks left in a dependency cycle are released one at a time, in graph order, when nothing
+    else is ready or running.
+    """
+    def __init__(self, task_graph, tasks):
+        dependencies = [task_graph.dependencies(node) for node, _ in tasks]
+        positions = {node.index: position for position, (node, _) in enumerate(tasks)}
+        self.dependents = [[] for _ in tasks]
+        self.remaining = [0] * len(tasks)
+        for position, nodes in enumerate(dependencies):
+            for dependency in {positions.get(node.index) for node in nodes}:
+                if dependency is not None and dependency != position:
+                    self.dependents[dependency].append(position)
+                    self.remaining[position] += 1
+        self.waiting = set(range(len(tasks)))
+        self._ready = [position for position in range(len(tasks)) if self.remaining[position] == 0]
+
+    def take_ready(self, idle):
+        """
+        Returns the positions of the tasks ready to run, in graph order. With idle (nothing
+        ready nor running), the first waiting task of a dependency cycle is released.
+        """
+        if idle and not self._ready and self.waiting:
+            self._ready.append(min(self.waiting))
+        ready = sorted(self._ready)
+        self._ready = []
+        self.waiting.difference_update(ready)
+        return ready
+
+    def finished(self, position):
+        for dependent in self.dependents[position]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] == 0 and dependent in self.waiting:
+                self._ready.append(dependent)
+
+def _stage_ready_tasks(write_buffer, pending, manifest, tasks, results, staged, fingerprints, checkpoint=None):
+    """
+    Stages the generated files in graph order, up to the first task not generated yet, so the
+    generated tree is identical to the one produced by a serial run.
+
+    Returns:
+        - int: Number of tasks staged so far.
+    """
+    while staged in results:
+        node = tasks[staged][0]
+        _stage_node_files(write_buffer, pending, manifest, node, results.pop(staged), fingerprints.get(node.name),
+                          checkpoint)
+        staged += 1
+    return staged
+
+def _plan_incremental_build(manifest, tasks, fingerprints):
+    """
+    Splits the tasks into reused and rebuilt nodes. A node is reused when the manifest
+    has it with the same fingerprint and its files exist. The files of a rebuilt node are
+    regenerated from scratch, so every reused node writing one of them is rebuilt as well.
+    The previous files of the rebuilt nodes, and of the nodes no longer in the backlog,
+    are removed before the files are generated again.
+
+    Returns:
+        - tuple: (tasks to process, number of reused nodes)
+    """
+    reused = {node.name for node, _ in tasks if manifest.is_done(node.name, fingerprints[node.name])}
+    removed = set(manifest.entries) - {node.name for node, _ in tasks}
+    while True:
+        dirty_paths = {path for node, _ in tasks if node.name not in reused for path in manifest.paths(node.name)}
+        dirty_paths.update(path for name in removed for path in manifest.paths(name))
+        invalidated = {name for name in reused if dirty_paths.intersection(manifest.paths(name))}
+        if not invalidated:
+            break
+        reused -= invalidated
+
+    rebuilt_tasks = [(node, node_development_dir) for node, node_development_dir in tasks if node.name not in reused]
+    for name in removed.union(node.name for node, _ in rebuilt_tasks):
+        manifest.forget(name)
+    for path in dirty_paths:
+        if os.path.exists(path):
+            os.remove(path)
+    manifest.reused += len(reused)
+    manifest.rebuilt += len(rebuilt_tasks)
+    return rebuilt_tasks, len(reused)
+
+class _Checkpoint:
+    """
+    When the staged files are written and the pending nodes recorded: every nodes finished
+    nodes, or once seconds passed since the previous checkpoint (0 disables a limit).
+    """
+    __slots__ = ("nodes", "seconds", "started_at")
+
+    def __init__(self, nodes, seconds):
+        self.nodes = nodes
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+
+    def due(self, pending):
+        return (self.nodes > 0 and len(pending) >= self.nodes) or \
+            (self.seconds > 0 and time.monotonic() - self.started_at >= self.seconds)
+
+def _stage_node_files(write_buffer, pending, manifest, node, files, fingerprint=None, checkpoint=None):
+    """
+    Stages the files of a finished node. With a manifest, the node waits in pending until
+    its files are written: by a checkpoint, by a flush triggered by the buffer size or by
+    the final flush.
+    """
+    flushes = write_buffer.flushes
+    for path, content in files:
+        write_buffer.add(path, content)
+    if manifest is None or not files:
+        return
+    if write_buffer.flushes != flushes:
+        # The buffer was flushed while this node was staged: the nodes staged before it are on disk
+        _record_written_nodes(write_buffer, manifest, pending)
+    pending.append((node.name, [path for path, _ in files], fingerprint))
+    if checkpoint is not None and checkpoint.due(pending):
+        write_buffer.flush()
+        _record_written_nodes(write_buffer, manifest, pending)
+        checkpoint.started_at = time.monotonic()
+
+def _record_written_nodes(write_buffer, manifest, pending):
+    """
+    Records the pending nodes in the manifest (with their input fingerprints), except the
+    ones with a file that could not be written, and empties pending.
+    """
+    if manifest is None:
+        return
+    failed_paths = {path for path, _ in write_buffer.failures}
+    for name, paths, fingerprint in pending:
+        if not failed_paths.intersection(paths):
+            manifest.mark_done(name, paths, fingerprint)
+    pending.clear()
+
+def _generate_task_files(developer, node, node_development_dir):
+    """
+    Processes a task without writing it, collecting the generated (path, code) pairs.
+    """
+    files = []
+    developer.process_task(node, node_development_dir, emit=lambda path, content: files.append((path, content)))
+    return files
@@ -7,7 +7,8 @@ and project structuring.
 
 Functions:
 
-- clean_pycache(root_dir): Removes __pycache__ folders from the specified directory.
+- clean_pycache(root_dir): Removes __pycache__ folders from the specified directory (skipping
+  build/ and the other output, cache and environment directories).
   - root_dir (str): Root directory path where cleaning should be performed.
 
 - create_directories(project_base_path): Creates necessary folder structures in the project.
@@ -16,15 +17,48 @@ Functions:
   - project_name (str): Project name.
   - analyst_properties (str): Path to the analyst properties file.
 
+- create_http_pool(): Creates the keep-alive connection pool shared by the models of the http backend.
+
+- default_llm_factory(http_pool): Returns the model constructor of the configured backend (langchain or http).
+
+- run_pipeline(...): Creates the agents and runs the project stages (reports, backlogs,
+  task graphs, development and README) as a DAG of concurrent stages.
+
+- parse_arguments(argv): Parses the command line options (--append-logs, --rebuild, --profile-startup and the headless options).
+
+- profile_startup(language): Reports the time of each startup phase and the slowest imports (--profile-startup).
+
+- headless_projects(args): Returns the projects of a headless run (--project or --manifest).
+
+- run_batch(projects, jobs, language): Runs the projects of a headless run in parallel processes
+  sharing the model scheduler and the response cache, and reports their times and the projects/hour.
+
 - if __name__ == "__main__": Script entry point when executed directly.
 """
-import inspect, os, shutil, sys
-import inquirer
-from io import StringIO
-from agents import Analyst, SquadLeader, Developer, Tester
-from graph import build_task_graph, process_task_graph
-from langchain_community.llms import Ollama
-from utils.translation_utils import translate_string
+import argparse, contextlib, functools, importlib, inspect, json, os, shutil, sys, time
+# Start of the imports of this module (startup profile)
+IMPORTS_STARTED_AT = time.perf_counter()
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from agents import Analyst, SquadLeader, Developer, Tester, BaseAgent
+from graph import GRAPH_FORMAT_VERSION, Graph, build_task_graph, process_task_graph
+from utils.checkpoint import RunCheckpoint, input_fingerprint
+from utils.endpoint_pool import EndpointPool
+from utils.http_pool import HTTPConnectionPool
+from utils.llm_cache import LLMResponseCache
+from utils.model_scheduler import ModelScheduler, ModelSchedulerManager
+from utils.ollama_client import OllamaClient
+from utils.prefix_context import PrefixContextStore
+from utils.run_log import RunLog, EventLog, set_event_log
+from utils.startup_profile import StartupProfile, import_time_lines, import_times
+from utils.static_checks import StaticChecker
+from utils.stage_scheduler import StageScheduler
+from utils.test_runner import SandboxedTestRunner
+from utils.tracing import Tracer, set_tracer
+from utils.translation_utils import preload_translations, translate_string
+
+# Wall time of the imports of this module. The model stack (langchain) and the interactive
+# prompts (inquirer) are imported when first needed, so they are not part of it
+IMPORTS_SECONDS = time.perf_counter() - IMPORTS_STARTED_AT
 
 # Global variable for language selection
 LANGUAGE = None
@@ -32,6 +66,106 @@ LANGUAGE = None
 # Global variable for development style selection
 DEVSTYLE = None
 
+# LLM response cache settings (set CODEGENIES_LLM_CACHE=off to bypass the cache)
+LLM_CACHE_ENABLED = os.environ.get("CODEGENIES_LLM_CACHE", "on").lower() not in ["0", "off", "false", "no"]
+LLM_CACHE_PATH = os.environ.get("CODEGENIES_LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), ".cache", "llm_responses.sqlite"))
+LLM_CACHE_MAX_MB = int(os.environ.get("CODEGENIES_LLM_CACHE_MAX_MB", "256"))
+
+# Size of the generated code staged in memory before the files are written (MB)
+WRITE_BUFFER_MAX_MB = int(os.environ.get("CODEGENIES_WRITE_BUFFER_MAX_MB", "64"))
+
+# Finished task nodes are written and recorded in the stage manifest every CHECKPOINT_NODES nodes
+# or CHECKPOINT_SECONDS seconds, so a crashed run only regenerates the nodes since the last checkpoint
+CHECKPOINT_NODES = int(os.environ.get("CODEGENIES_CHECKPOINT_NODES", "8"))
+CHECKPOINT_SECONDS = float(os.environ.get("CODEGENIES_CHECKPOINT_SECONDS", "60"))
+
+# Run log settings: "full" logs every prompt and response, "preview" only their first
+# CODEGENIES_LOG_PREVIEW_CHARS characters with a hash; the log rotates past CODEGENIES_LOG_MAX_MB (0 = never)
+LOG_VERBOSITY = os.environ.get("CODEGENIES_LOG_VERBOSITY", "full").lower()
+LOG_PREVIEW_CHARS = int(os.environ.get("CODEGENIES_LOG_PREVIEW_CHARS", "500"))
+LOG_MAX_MB = int(os.environ.get("CODEGENIES_LOG_MAX_MB", "0"))
+# Structured JSONL event stream written next to the run log
+LOG_EVENTS = os.environ.get("CODEGENIES_LOG_EVENTS", "off").lower() in ["1", "on", "true", "yes"]
+
+# Number of task graph file nodes processed concurrently
+GRAPH_WORKERS = int(os.environ.get("CODEGENIES_GRAPH_WORKERS", "4"))
+
+# Number of task graph file nodes whose prompts are sent together (0 = one node per call, see GRAPH_WORKERS)
+# and requests kept in flight by the batches (the server's OLLAMA_NUM_PARALLEL)
+GRAPH_BATCH_SIZE = int(os.environ.get("CODEGENIES_GRAPH_BATCH_SIZE", "0"))
+LLM_PARALLEL = int(os.environ.get("CODEGENIES_LLM_PARALLEL", os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+
+# Stream developer responses and write each file as soon as it is complete
+STREAM_CODE = os.environ.get("CODEGENIES_STREAM_CODE", "off").lower() in ["1", "on", "true", "yes"]
+
+# Number of pipeline stages (reports, backlogs, graphs, development) running concurrently
+STAGE_WORKERS = int(os.environ.get("CODEGENIES_STAGE_WORKERS", "4"))
+
+# Context window requested from the models (Ollama's num_ctx) and the prompt token budget of the
+# squad leader (0 = context minus the response tokens); prompts over the budget are compacted
+MODEL_CONTEXT_TOKENS = int(os.environ.get("CODEGENIES_NUM_CTX", "8192"))
+PROMPT_TOKEN_BUDGET = int(os.environ.get("CODEGENIES_PROMPT_TOKEN_BUDGET", "0"))
+CONTEXT_COMPACTION = os.environ.get("CODEGENIES_CONTEXT_COMPACTION", "on").lower() not in ["0", "off", "false", "no"]
+
+# Model backend: "langchain" (langchain_community Ollama) or "http" (first-party client, utils/ollama_client.py)
+LLM_BACKEND = os.environ.get("CODEGENIES_LLM_BACKEND", "langchain").lower()
+# Ollama server(s): several comma-separated addresses are load balanced (http backend)
+OLLAMA_URLS = [url.strip() for url in os.environ.get("CODEGENIES_OLLAMA_URL", "http://localhost:11434").split(",") if url.strip()]
+# Reuse of the evaluated prompt prefixes shared by several calls (http backend only). Off by default:
+# Ollama applies the chat template to each request and has no evaluate-only request (see utils/prefix_context.py)
+PREFIX_CONTEXT_ENABLED = os.environ.get("CODEGENIES_PREFIX_CONTEXT", "off").lower() in ["1", "on", "true", "yes"]
+
+# Model-affinity scheduling of the model calls: the calls of the loaded model(s) go first and a model is
+# only swapped out once its queue is drained or its turn (CODEGENIES_MODEL_TURN calls, 0 = no limit) is over
+MODEL_SCHEDULER_ENABLED = os.environ.get("CODEGENIES_MODEL_SCHEDULER", "on").lower() not in ["0", "off", "false", "no"]
+MAX_LOADED_MODELS = int(os.environ.get("CODEGENIES_MAX_LOADED_MODELS", "1"))
+MODEL_TURN = int(os.environ.get("CODEGENIES_MODEL_TURN", "64"))
+# How long Ollama keeps a model loaded after a call
+MODEL_KEEP_ALIVE = os.environ.get("CODEGENIES_KEEP_ALIVE", "30m")
+
+# Connections to the Ollama server: keep-alive pool size (http backend), connect and read timeouts
+# (seconds) and retries of the transient errors (refused connections, timeouts, HTTP 429/502/503/504)
+HTTP_POOL_SIZE = int(os.environ.get("CODEGENIES_HTTP_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("CODEGENIES_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.environ.get("CODEGENIES_HTTP_READ_TIMEOUT", "600"))
+HTTP_RETRIES = int(os.environ.get("CODEGENIES_HTTP_RETRIES", "3"))
+
+# Several Ollama servers: consecutive failures that eject a server, seconds before its health check,
+# and delay (seconds, 0 = off) after which an unanswered request is also sent to another server
+ENDPOINT_EJECT_AFTER = int(os.environ.get("CODEGENIES_ENDPOINT_EJECT_AFTER", "3"))
+ENDPOINT_EJECT_SECONDS = float(os.environ.get("CODEGENIES_ENDPOINT_EJECT_SECONDS", "30"))
+HEDGE_AFTER = float(os.environ.get("CODEGENIES_HEDGE_AFTER", "0"))
+
+# Removal of the __pycache__ folders at startup (set CODEGENIES_CLEAN_PYCACHE=off to skip it), and the
+# directories it does not search: generated projects, caches, version control and environments
+CLEAN_PYCACHE_ENABLED = os.environ.get("CODEGENIES_CLEAN_PYCACHE", "on").lower() not in ["0", "off", "false", "no"]
+PYCACHE_SKIP_DIRS = {"build", ".cache", ".git", ".hg", ".svn", "node_modules", ".venv", "venv", ".tox", ".nox",
+                     ".pytest_cache", ".mypy_cache", ".ruff_cache"}
+
+# Modules imported when first needed, whose import time the startup profile reports
+DEFERRED_IMPORTS = ["inquirer", "langchain_community.llms"]
+
+# Local syntax checks of the generated code before the model checks ("code-correction" style)
+STATIC_CHECKS_ENABLED = os.environ.get("CODEGENIES_STATIC_CHECKS", "on").lower() not in ["0", "off", "false", "no"]
+
+# Sandboxed execution of the generated Python tests ("code-correction" style): test processes run at
+# the same time, and their CPU time (seconds), memory (MB) and wall-clock time (seconds) limits
+TEST_RUNNER_ENABLED = os.environ.get("CODEGENIES_TEST_RUNNER", "on").lower() not in ["0", "off", "false", "no"]
+TEST_WORKERS = int(os.environ.get("CODEGENIES_TEST_WORKERS", "2"))
+TEST_CPU_SECONDS = int(os.environ.get("CODEGENIES_TEST_CPU_SECONDS", "30"))
+TEST_MEMORY_MB = int(os.environ.get("CODEGENIES_TEST_MEMORY_MB", "1024"))
+TEST_TIMEOUT = float(os.environ.get("CODEGENIES_TEST_TIMEOUT", "60"))
+
+# Options of the headless runs and projects run at the same time (each in its own process)
+LANGUAGES = ["en-us", "pt-br"]
+DEVELOPMENT_STYLES = ["normal", "tdd", "code-correction"]
+COMPONENTS = ["backend", "frontend", "tests"]
+BATCH_JOBS = int(os.environ.get("CODEGENIES_BATCH_JOBS", "2"))
+
+# Latency tracing of the model calls, agent methods and stages (Chrome trace-event JSON in the project folder)
+TRACE_ENABLED = os.environ.get("CODEGENIES_TRACE", "on").lower() not in ["0", "off", "false", "no"]
+TRACE_FILE = "trace.json"
+
 def select_language():
     """
     Prompt the user to select a language for the project.
@@ -39,6 +173,8 @@ def select_language():
     Returns:
     - str: Language code ("pt-br" or "en-us").
     """
+    import inquirer  # Deferred: only the interactive runs need it
+
     original_stdout = sys.stdout
     sys.stdout = sys.__stdout__  # Restore default stdout for inquirer
 
@@ -61,6 +197,7 @@ def select_development_style(language):
     Returns:
     - str: Language code ("normal", "tdd" or "code-correction").
     """
+    import inquirer
     if language == "en-us": 
         questions = [
             inquirer.List(
@@ -88,6 +225,7 @@ def select_components_to_generate(language, development_style):
     Returns:
     - list: List of components selected by the user.
     """
+    import inquirer
     original_stdout = sys.stdout
     sys.stdout = sys.__stdout__  # Restore default stdout for inquirer
 
@@ -153,29 +291,23 @@ class MultiOutput:
 
 def clean_pycache(root_dir, language):
     """
-    Removes __pycache__ folders from the specified directory.
+    Removes __pycache__ folders from the specified directory, in a single walk that skips
+    PYCACHE_SKIP_DIRS (generated projects in build/, caches, version control, environments).
 
     Args:
     - root_dir (str): Root directory path where cleaning should be performed.
     """
+    if not CLEAN_PYCACHE_ENABLED:
+        return
     # Get pycache message key translation
     pycache_removed = "pycache_removed"
     for root, dirs, files in os.walk(root_dir):
-        for dir_name in dirs:
-            if dir_name == "__pycache__":
-                pycache_dir = os.path.join(root, dir_name)
-                shutil.rmtree(pycache_dir)
-                print(translate_string('main', pycache_removed, language),{pycache_dir})
-
-        # Verifica se estamos na pasta agents ou na subpasta prompt_templates
-        if 'agents' in root and 'prompt_templates' in dirs:
-            prompt_templates_dir = os.path.join(root, 'prompt_templates')
-            for sub_root, sub_dirs, sub_files in os.walk(prompt_templates_dir):
-                for sub_dir_name in sub_dirs:
-                    if sub_dir_name == "__pycache__":
-                        sub_pycache_dir = os.path.join(sub_root, sub_dir_name)
-                        shutil.rmtree(sub_pycache_dir)
-                        print(translate_string('main', pycache_removed, language),{sub_pycache_dir})
+        if "__pycache__" in dirs:
+            pycache_dir = os.path.join(root, "__pycache__")
+            shutil.rmtree(pycache_dir, ignore_errors=True)
+            print(translate_string('main', pycache_removed, language), pycache_dir)
+        # Single pass: the output and tooling directories (and the removed folders) are not searched
+        dirs[:] = [dir_name for dir_name in dirs if dir_name != "__pycache__" and dir_name not in PYCACHE_SKIP_DIRS]
 
 def create_directories(project_base_path):
     """   
@@ -188,12 +320,13 @@ def create_directories(project_base_path):
     for base_dir in base_dirs:
         os.makedirs(os.path.join(project_base_path, base_dir), exist_ok=True)
 
-def start(project_name, analyst_properties, development_style, language):
+def start(project_name, analyst_properties, development_style, language, rebuild=False):
     """
     Initializes and executes the project setup and execution process.
     Args:
     - project_name (str): Project name.
     - analyst_properties (str): Path to the analyst properties file.
+    - rebuild (bool): Regenerates every stage and task node, even when its inputs did not change.
     """
 
     # Define an interactive process
@@ -208,14 +341,6 @@ def start(project_name, analyst_properties, development_style, language):
     generate_backend = False
     generate_frontend = False
     generate_tests = False
-    
-    backend_developer = None
-    frontend_developer = None
-    tester = None
-    
-    backend_backlog = None
-    frontend_backlog = None
-    test_backlog = None
 
     # Define which agents should execute their routines
     yes_inputs = ['s', 'y', 'sim', 'yes']
@@ -257,20 +382,107 @@ def start(project_name, analyst_properties, development_style, language):
     # Clean __pycache__ folders
     clean_pycache(os.path.dirname(__file__), language)
 
+    run_pipeline(project_name, analyst_properties, development_style, language, interactive,
+                 generate_backend, generate_frontend, generate_tests, rebuild=rebuild)
+
+def response_text(parsed_response):
+    """
+    Returns the raw text of a response parsed by an agent ({report_key: text}).
+    """
+    if isinstance(parsed_response, dict):
+        return next(iter(parsed_response.values()), None)
+    return parsed_response
+
+def create_http_pool():
+    """
+    Returns the connection pool shared by the models of the http backend (balancing the requests
+    when several servers are configured), or None for the other backends.
+    """
+    if LLM_BACKEND != "http":
+        return None
+    settings = dict(max_connections=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT)
+    if len(OLLAMA_URLS) > 1:
+        return EndpointPool(OLLAMA_URLS, retries=HTTP_RETRIES, eject_after=ENDPOINT_EJECT_AFTER,
+                            eject_seconds=ENDPOINT_EJECT_SECONDS, hedge_after=HEDGE_AFTER, **settings)
+    return HTTPConnectionPool(OLLAMA_URLS[0], retries=HTTP_RETRIES, **settings)
+
+def default_llm_factory(http_pool=None):
+    """
+    Returns the constructor of the models for the configured backend (CODEGENIES_LLM_BACKEND).
+    The models of the http backend share http_pool.
+    """
+    if LLM_BACKEND == "http":
+        return functools.partial(OllamaClient, pool=http_pool or create_http_pool())
+    # Deferred: the langchain import is the slowest part of the startup
+    from langchain_community.llms import Ollama
+    # langchain only has a single request timeout and uses the first server
+    return functools.partial(Ollama, base_url=OLLAMA_URLS[0], timeout=int(HTTP_READ_TIMEOUT))
+
+def run_pipeline(project_name, analyst_properties, development_style, language, interactive,
+                 generate_backend, generate_frontend, generate_tests, llm_factory=None, rebuild=False,
+                 model_scheduler=None):
+    """
+    Creates the agents and runs the project stages as a DAG: each stage starts as
+    soon as the stages it depends on are finished, so the backlogs, task graphs and
+    development of independent components overlap.
+
+    Args:
+    - project_name (str): Project name.
+    - analyst_properties (str): Path to the analyst properties file.
+    - development_style (str): "normal", "tdd" or "code-correction".
+    - language (str): Language code ("pt-br" or "en-us").
+    - interactive (bool): Defines whether the process will be interactive.
+    - generate_backend, generate_frontend, generate_tests (bool): Components to generate.
+    - llm_factory (callable): Creates the model of each role from its name (model=...).
+      Defaults to the configured backend (see default_llm_factory); benchmarks pass a deterministic fake model.
+    - rebuild (bool): Regenerates every stage and task node. By default the stages and nodes whose
+      input fingerprint did not change since the previous run are reused.
+    - model_scheduler (ModelScheduler): Scheduler shared with other runs (a proxy in batch runs, see run_batch).
+      Defaults to a scheduler of this run (CODEGENIES_MODEL_SCHEDULER).
+    """
+    backend_developer = None
+    frontend_developer = None
+    tester = None
+
+    # Latency tracing of the whole run
+    tracer = Tracer() if TRACE_ENABLED else None
+    set_tracer(tracer)
+
+    # Shared LLM response cache, so unchanged prompts are answered without calling Ollama
+    BaseAgent.response_cache = LLMResponseCache(LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024, enabled=LLM_CACHE_ENABLED)
+
+    # Shared prompt prefixes (properties and report of the backlogs, code of the checks) are evaluated once
+    BaseAgent.prefix_contexts = PrefixContextStore() if PREFIX_CONTEXT_ENABLED else None
+    http_pool = create_http_pool() if llm_factory is None else None
+    llm_factory = llm_factory or default_llm_factory(http_pool)
+
+    # Calls are grouped by model, so Ollama does not swap models back and forth
+    if model_scheduler is None and MODEL_SCHEDULER_ENABLED:
+        model_scheduler = ModelScheduler(MAX_LOADED_MODELS, MODEL_TURN)
+    BaseAgent.model_scheduler = model_scheduler
+    BaseAgent.max_in_flight = LLM_PARALLEL
+
+    # Generated files are parsed locally before asking the model to check their syntax
+    static_checker = StaticChecker() if STATIC_CHECKS_ENABLED else None
+    Developer.static_checker = static_checker
+    # The generated Python tests are run for real instead of asking the model to imagine their execution
+    test_runner = SandboxedTestRunner(TEST_WORKERS, TEST_CPU_SECONDS, TEST_MEMORY_MB, TEST_TIMEOUT) if TEST_RUNNER_ENABLED else None
+    Developer.test_runner = test_runner
+
     # Phi-3 model to play the role of Analyst
-    llm_anl = Ollama(model="phi3:14b-medium-128k-instruct-q4_K_M")
+    llm_anl = llm_factory(model="phi3:14b-medium-128k-instruct-q4_K_M", num_ctx=MODEL_CONTEXT_TOKENS, keep_alive=MODEL_KEEP_ALIVE)
     # DeepSeek Coder model to play the role of Developer | Old model -> codegemma:7b-instruct-q4_K_M
-    llm_dev = Ollama(model="deepseek-coder-v2:16b-lite-instruct-q4_K_M")
+    llm_dev = llm_factory(model="deepseek-coder-v2:16b-lite-instruct-q4_K_M", num_ctx=MODEL_CONTEXT_TOKENS, keep_alive=MODEL_KEEP_ALIVE)
     # Lama-3 model to play the role of Squadleader
-    llm_sq = Ollama(model="llama3.1:8b-instruct-q4_K_M")
+    llm_sq = llm_factory(model="llama3.1:8b-instruct-q4_K_M", num_ctx=MODEL_CONTEXT_TOKENS, keep_alive=MODEL_KEEP_ALIVE)
 
     # Initializing Analyst
     analyst_name = translate_string('main', 'analyst_name', language)
     analyst = Analyst(analyst_name, llm_anl, analyst_properties, language, interactive=interactive)
-    analyst.generate_report()
-    analyst_report = analyst.output
 
     # Initializing Squad Leader
+    SquadLeader.prompt_token_budget = PROMPT_TOKEN_BUDGET
+    SquadLeader.context_compaction = CONTEXT_COMPACTION
     squad_leader_name = translate_string('main', 'squad_leader_name', language)
     squad_leader = SquadLeader(squad_leader_name, llm_sq, analyst_properties, language, interactive=interactive)
 
@@ -283,23 +495,29 @@ def start(project_name, analyst_properties, development_style, language):
     # Creating developer agents and tester
     if generate_backend:
         backend_developer_name = translate_string('main', 'backend_developer_name', language)
-        backend_developer = Developer(backend_developer_name, llm_dev, development_style, language, interactive=interactive)
+        backend_developer = Developer(backend_developer_name, llm_dev, development_style, language, interactive=interactive, streaming=STREAM_CODE)
         agents[backend_developer_name] = backend_developer
 
     if generate_frontend:
         frontend_developer_name = translate_string('main', 'frontend_developer_name', language)
-        frontend_developer = Developer(frontend_developer_name, llm_dev, development_style, language, interactive=interactive)
+        frontend_developer = Developer(frontend_developer_name, llm_dev, development_style, language, interactive=interactive, streaming=STREAM_CODE)
         agents[frontend_developer_name] = frontend_developer
 
     if generate_tests:
         tester_name = translate_string('main', 'tester_name', language)
-        tester = Tester(tester_name, llm_dev, development_style, language, interactive=interactive)
+        tester = Tester(tester_name, llm_dev, development_style, language, interactive=interactive, streaming=STREAM_CODE)
         agents[tester_name] = tester
 
     # Creating folder structure in the build
     project_base_path = os.path.join(os.path.dirname(__file__), "build", project_name)
     create_directories(project_base_path)
 
+    # Every finished stage is saved with a fingerprint of its inputs: stages and task
+    # nodes whose inputs did not change are reused, so an interrupted run continues
+    # where it stopped and an edited input only regenerates what depends on it
+    checkpoint = RunCheckpoint(project_base_path, reuse=not rebuild)
+    project_properties = {section: dict(section_data) for section, section_data in analyst.project_data.items()}
+
     # Saving files in the agents folder
     for agent_name, agent in agents.items():
         agent_file = agent_name.lower().replace(' ', '_') + ".py"
@@ -312,77 +530,418 @@ def start(project_name, analyst_properties, development_style, language):
         with open(agent_path, 'w') as f:
             f.write(agent_content)
 
-    # Generate the project general report
-    squad_leader.generate_general_report(analyst_report)
-    general_report = squad_leader.output
-
-    # Generate developer and tester reports
-    if generate_backend:
-        squad_leader.generate_backend_backlog(general_report)
-        backend_backlog = squad_leader.output
-
-    if generate_frontend:
-        squad_leader.generate_frontend_backlog(general_report)
-        frontend_backlog = squad_leader.output
-        
-    if generate_tests:
-        squad_leader.generate_test_backlog(general_report)
-        test_backlog = squad_leader.output
-
-    # Saving reports in the reports folder
-    reports = {
-        translate_string('main', 'project_report_file', language): general_report
-    }
-
-    if generate_backend:
-        reports[translate_string('main', 'backend_report_file', language)] = backend_backlog
-    if generate_frontend:
-        reports[translate_string('main', 'frontend_report_file', language)] = frontend_backlog
-    if generate_tests:
-        reports[translate_string('main', 'test_report_file', language)] = test_backlog
-    
-    for report_file, report_content in reports.items():
+    def save_report(report_key, report_content):
+        # Saving reports in the reports folder
         if report_content is not None:
+            report_file = translate_string('main', report_key, language)
             with open(os.path.join(project_base_path, "reports", report_file), 'w') as f:
                 f.write(str(report_content))
-    
-    # Creating task graphs
-    if generate_backend:
-        backend_task_graph = build_task_graph(backend_backlog)
-    if generate_frontend:
-        frontend_task_graph = build_task_graph(frontend_backlog)
-    if generate_tests:
-        test_task_graph = build_task_graph(test_backlog)
-        
-    ## Processing Task Graphs
+        return report_content
+
+    def checkpointed(stage_name, func, inputs, dump=None, load=None):
+        # Runs the stage, or reloads its saved result when the fingerprint of its inputs did not change
+        def run(results):
+            fingerprint = inputs(results)
+            reused, value = checkpoint.reuse_stage(stage_name, fingerprint)
+            if reused:
+                print(translate_string('main', 'stage_reused', language).format(stage=stage_name))
+                return load(value) if load else value
+            result = func(results)
+            # Failed stages (no result) are not saved, so the next run retries them
+            if result is not None:
+                checkpoint.save_stage(stage_name, dump(result) if dump else result, fingerprint)
+            return result
+        return run
+
+    def analyst_report_inputs(results):
+        return analyst.input_fingerprint(project_properties, analyst.prompts.get_report_prompt(),
+                                         analyst.prompts.get_refinement_instructions())
+
+    def general_report_inputs(results):
+        return squad_leader.input_fingerprint(project_properties, results["analyst_report"],
+                                              squad_leader.prompts.get_general_report_instructions(language))
+
+    def backlog_inputs(backlog_model, instructions):
+        def inputs(results):
+            return squad_leader.input_fingerprint(project_properties, results["general_report"], backlog_model, instructions)
+        return inputs
+
+    def graph_inputs(backlog_stage_name):
+        def inputs(results):
+            return input_fingerprint("task_graph", GRAPH_FORMAT_VERSION, results[backlog_stage_name])
+        return inputs
+
+    def readme_inputs(results):
+        return analyst.input_fingerprint(project_name, analyst.prompts.get_readme_instructions(), results["general_report"],
+                                         results.get("backend_backlog"), results.get("frontend_backlog"), results.get("test_backlog"))
+
+    def generate_analyst_report(results):
+        return response_text(analyst.generate_report())
+
+    def generate_general_report(results):
+        general_report = response_text(squad_leader.generate_general_report(results["analyst_report"]))
+        return save_report('project_report_file', general_report)
+
+    def backlog_stage(generate_backlog, report_key):
+        def run(results):
+            backlog = response_text(generate_backlog(results["general_report"]))
+            return save_report(report_key, backlog)
+        return run
+
+    def graph_stage(backlog_stage_name):
+        def run(results):
+            return build_task_graph(results[backlog_stage_name])
+        return run
+
+    def development_stage(developer, graph_stage_name, development_dir, stage_name):
+        def run(results):
+            os.makedirs(development_dir, exist_ok=True)
+            processing_task_graph_message = translate_string('main', 'processing_task_graph', language)
+            print(f"{processing_task_graph_message} {developer.name}")
+            process_task_graph(developer, results[graph_stage_name], development_dir, max_workers=GRAPH_WORKERS,
+                               max_buffered_bytes=WRITE_BUFFER_MAX_MB * 1024 * 1024,
+                               manifest=checkpoint.node_manifest(stage_name), batch_size=GRAPH_BATCH_SIZE,
+                               checkpoint_nodes=CHECKPOINT_NODES, checkpoint_seconds=CHECKPOINT_SECONDS)
+            return development_dir
+        return run
+
+    def generate_project_readme(results):
+        # TO-DO - improve README prompt engeneering
+        # Creating Project README
+        readme_content = analyst.generate_readme(project_name, results["general_report"], results.get("backend_backlog"),
+                                                 results.get("frontend_backlog"), results.get("test_backlog"))
+        readme_path = os.path.join(project_base_path, "README.md")
+        with open(readme_path, 'w') as f:
+            f.write(readme_content)
+        return readme_path
+
+    # Stage DAG: analyst report -> general report -> backlogs -> task graphs -> development.
+    # Interactive runs ask the user questions, so their stages run one at a time.
+    scheduler = StageScheduler(max_workers=1 if interactive else STAGE_WORKERS)
+    scheduler.add_stage("analyst_report", checkpointed("analyst_report", generate_analyst_report, analyst_report_inputs))
+    scheduler.add_stage("general_report", checkpointed("general_report", generate_general_report, general_report_inputs), ["analyst_report"])
+    backlog_stages = []
+
     if generate_backend:
+        backend_backlog_inputs = backlog_inputs(squad_leader.prompts.get_backend_backlog_model(language), squad_leader.prompts.get_backend_instructions(language))
+        scheduler.add_stage("backend_backlog", checkpointed("backend_backlog", backlog_stage(squad_leader.generate_backend_backlog, 'backend_report_file'), backend_backlog_inputs), ["general_report"])
+        scheduler.add_stage("backend_graph", checkpointed("backend_graph", graph_stage("backend_backlog"), graph_inputs("backend_backlog"), Graph.to_dict, Graph.from_dict), ["backend_backlog"])
         development_dir = os.path.join(project_base_path, "dev", backend_developer.name.lower().replace(' ', '_'))
-        os.makedirs(development_dir, exist_ok=True)
-        processing_task_graph_message = translate_string('main', 'processing_task_graph', language)
-        print(f"{processing_task_graph_message} {backend_developer.name}")
-        process_task_graph(backend_developer, backend_task_graph, development_dir)
-    
+        scheduler.add_stage("backend_development", development_stage(backend_developer, "backend_graph", development_dir, "backend_development"), ["backend_graph"])
+        backlog_stages.append("backend_backlog")
+
     if generate_frontend:
+        frontend_backlog_inputs = backlog_inputs(squad_leader.prompts.get_frontend_backlog_model(language), squad_leader.prompts.get_frontend_instructions(language))
+        scheduler.add_stage("frontend_backlog", checkpointed("frontend_backlog", backlog_stage(squad_leader.generate_frontend_backlog, 'frontend_report_file'), frontend_backlog_inputs), ["general_report"])
+        scheduler.add_stage("frontend_graph", checkpointed("frontend_graph", graph_stage("frontend_backlog"), graph_inputs("frontend_backlog"), Graph.to_dict, Graph.from_dict), ["frontend_backlog"])
         development_dir = os.path.join(project_base_path, "dev", frontend_developer.name.lower().replace(' ', '_'))
-        os.makedirs(development_dir, exist_ok=True)
-        processing_task_graph_message = translate_string('main', 'processing_task_graph', language)
-        print(f"{processing_task_graph_message} {frontend_developer.name}")
-        process_task_graph(frontend_developer, frontend_task_graph, development_dir)
+        scheduler.add_stage("frontend_development", development_stage(frontend_developer, "frontend_graph", development_dir, "frontend_development"), ["frontend_graph"])
+        backlog_stages.append("frontend_backlog")
 
     if generate_tests:
+        test_backlog_inputs = backlog_inputs(squad_leader.prompts.get_tests_backlog_model(language), squad_leader.prompts.get_tests_instructions(language))
+        scheduler.add_stage("test_backlog", checkpointed("test_backlog", backlog_stage(squad_leader.generate_test_backlog, 'test_report_file'), test_backlog_inputs), ["general_report"])
+        scheduler.add_stage("test_graph", checkpointed("test_graph", graph_stage("test_backlog"), graph_inputs("test_backlog"), Graph.to_dict, Graph.from_dict), ["test_backlog"])
         test_dir = os.path.join(project_base_path, "dev", "tester")
-        os.makedirs(test_dir, exist_ok=True)
-        processing_task_graph_message = translate_string('main', 'processing_task_graph', language)
-        print(f"{processing_task_graph_message} {tester.name}")
-        process_task_graph(tester, test_task_graph, test_dir)
+        scheduler.add_stage("test_development", development_stage(tester, "test_graph", test_dir, "test_development"), ["test_graph"])
+        backlog_stages.append("test_backlog")
+
+    # The README only needs the reports, so it is written while the code is being developed
+    scheduler.add_stage("readme", checkpointed("readme", generate_project_readme, readme_inputs), ["general_report"] + backlog_stages)
+
+    try:
+        scheduler.run()
+    finally:
+        checkpoint.close()
+        set_tracer(None)
+        if tracer is not None:
+            trace_path = os.path.join(project_base_path, TRACE_FILE)
+            tracer.export_chrome_trace(trace_path)
+
+    # Stage timing report
+    print(translate_string('main', 'stage_report_header', language))
+    for line in scheduler.report_lines():
+        print(line)
+
+    # Latency report (p50/p95 per stage, agent method and model)
+    if tracer is not None:
+        print(translate_string('main', 'latency_report_header', language))
+        for line in tracer.summary_lines():
+            print(line)
+        print(translate_string('main', 'trace_written', language).format(path=trace_path))
+
+    # Incremental build report: stages and task nodes rebuilt or reused
+    print(translate_string('main', 'incremental_report_header', language))
+    for line in checkpoint.summary_lines():
+        print(line)
+
+    # Model swap report
+    if model_scheduler is not None:
+        print(translate_string('main', 'model_scheduler_report_header', language))
+        for line in model_scheduler.summary_lines():
+            print(line)
+
+    # Prompt prefix reuse report
+    if BaseAgent.prefix_contexts is not None and BaseAgent.prefix_contexts.prefills:
+        print(translate_string('main', 'prefix_context_stats', language).format(**BaseAgent.prefix_contexts.stats()))
+
+    # Local syntax checks report
+    if static_checker is not None and (static_checker.files_checked or static_checker.files_unchecked):
+        print(translate_string('main', 'static_check_stats', language).format(**static_checker.stats()))
+
+    # Sandboxed test runs report
+    if test_runner is not None and test_runner.runs:
+        print(translate_string('main', 'test_runner_stats', language).format(**test_runner.stats()))
+
+    # Connection pool report (http backend)
+    if http_pool is not None:
+        print(translate_string('main', 'http_pool_stats', language).format(**http_pool.stats()))
+        if isinstance(http_pool, EndpointPool):
+            print(translate_string('main', 'endpoint_report_header', language))
+            for line in http_pool.summary_lines():
+                print(line)
+        http_pool.close()
+
+    # LLM response cache report
+    print(translate_string('main', 'llm_cache_stats', language).format(**BaseAgent.response_cache.stats()))
+    BaseAgent.response_cache.close()
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line options.
+    """
+    parser = argparse.ArgumentParser(description="CodeGenies")
+    parser.add_argument("--append-logs", action="store_true",
+                        help="Append to the logs of the previous run of the project instead of replacing them.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Regenerate every stage and task node, even when its inputs did not change.")
+    headless = parser.add_argument_group("headless runs", "Run without questions: --project for one project, "
+                                                          "--manifest for several projects run in parallel.")
+    headless.add_argument("--project", help="Project name (folder in build/).")
+    headless.add_argument("--manifest", help="JSON file with the projects to run (see README). The options "
+                                             "below are the defaults of its entries.")
+    headless.add_argument("--language", choices=LANGUAGES, default="en-us")
+    headless.add_argument("--style", choices=DEVELOPMENT_STYLES, default="normal")
+    headless.add_argument("--components", nargs="+", choices=COMPONENTS,
+                          help="Components to generate (default: all; tests only in the normal style).")
+    headless.add_argument("--properties", help="Analyst properties file (default: project.properties).")
+    headless.add_argument("--jobs", type=int, default=BATCH_JOBS,
+                          help="Projects run at the same time, each in its own process (CODEGENIES_BATCH_JOBS).")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report the time of each startup phase and the slowest imports, then exit.")
+    return parser.parse_args(argv)
+
+def project_spec(entry, defaults, base_dir):
+    """
+    Completes a headless project description with the defaults and validates it.
+
+    Args:
+    - entry (dict): Project options (name, language, style, components, properties).
+    - defaults (dict): Options used when the entry does not have them.
+    - base_dir (str): Directory of the relative properties paths.
+
+    Returns:
+    - dict: The project options, with the components as generate_* flags.
+    """
+    spec = {**defaults, **{key: value for key, value in entry.items() if value is not None}}
+    if not spec.get("name"):
+        raise ValueError(f"Project without a name: {entry}")
+    if spec["language"] not in LANGUAGES or spec["style"] not in DEVELOPMENT_STYLES:
+        raise ValueError(f"{spec['name']}: unknown language or style ({spec['language']}, {spec['style']})")
+    components = spec.get("components") or COMPONENTS
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"{spec['name']}: unknown components {sorted(unknown)}")
+    properties = spec.get("properties") or os.path.join(os.path.dirname(__file__), "project.properties")
+    if not os.path.isabs(properties):
+        properties = os.path.join(base_dir, properties)
+    if not os.path.isfile(properties):
+        raise ValueError(f"{spec['name']}: properties file not found: {properties}")
+    return {
+        "name": spec["name"],
+        "language": spec["language"],
+        "style": spec["style"],
+        "properties": properties,
+        "generate_backend": "backend" in components,
+        "generate_frontend": "frontend" in components,
+        # Only the normal style generates the tests separately
+        "generate_tests": "tests" in components and spec["style"] == "normal",
+        "append_logs": bool(spec.get("append_logs")),
+        "rebuild": bool(spec.get("rebuild")),
+    }
+
+def headless_projects(args):
+    """
+    Returns the projects of a headless run: the --project options, or the entries of the --manifest file.
+    The manifest is a JSON list of projects, or an object with "projects" and optional "defaults".
+    """
+    defaults = {"language": args.language, "style": args.style, "components": args.components,
+                "properties": args.properties, "append_logs": args.append_logs, "rebuild": args.rebuild}
+    if not args.manifest:
+        return [project_spec({"name": args.project}, defaults, os.getcwd())]
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        defaults.update(manifest.get("defaults", {}))
+        manifest = manifest.get("projects", [])
+    base_dir = os.path.dirname(os.path.abspath(args.manifest))
+    projects = [project_spec(entry, defaults, base_dir) for entry in manifest]
+    names = [project["name"] for project in projects]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Projects listed more than once: {duplicates}")
+    return projects
+
+@contextlib.contextmanager
+def project_logs(project_name, language, append=False, echo=True):
+    """
+    Redirects the standard output to the run log of the project (and to the console when echo
+    is True) and installs its event stream, restoring both at the end.
+    """
+    project_base_path = os.path.join(os.path.dirname(__file__), "build", project_name)
+    actions_report_file = translate_string('main', 'execution_report_file', language)
+    run_log = RunLog(os.path.join(project_base_path, actions_report_file), max_bytes=LOG_MAX_MB * 1024 * 1024, append=append)
+    event_log = EventLog(os.path.join(project_base_path, "run_events.jsonl"), append=append) if LOG_EVENTS else None
+    set_event_log(event_log)
+    BaseAgent.log_verbosity = LOG_VERBOSITY
+    BaseAgent.log_preview_chars = LOG_PREVIEW_CHARS
+    original_stdout = sys.stdout
+    sys.stdout = MultiOutput(original_stdout, run_log) if echo else run_log
+    try:
+        yield
+    finally:
+        # Restore the original stdout and close the logs
+        sys.stdout = original_stdout
+        run_log.close()
+        set_event_log(None)
+        if event_log is not None:
+            event_log.close()
+
+# Model scheduler shared by the projects of a batch run (proxy set in each worker process)
+_batch_model_scheduler = None
 
-    # TO-DO - improve README prompt engeneering
-    # Creating Project README
-    readme_content = analyst.generate_readme(project_name, general_report, backend_backlog, frontend_backlog, test_backlog)
-    with open(os.path.join(project_base_path, "README.md"), 'w') as f:
-        f.write(readme_content)
+def _init_batch_worker(model_scheduler):
+    global _batch_model_scheduler
+    _batch_model_scheduler = model_scheduler
+    preload_translations()
+
+def run_project(project, echo=False):
+    """
+    Runs one project of a headless run, non interactively, logging to its run log.
+
+    Returns:
+    - dict: Project name, run time in seconds and error (None when the run succeeded).
+    """
+    started_at = time.perf_counter()
+    error = None
+    with project_logs(project["name"], project["language"], append=project["append_logs"], echo=echo):
+        try:
+            run_pipeline(project["name"], project["properties"], project["style"], project["language"], False,
+                         project["generate_backend"], project["generate_frontend"], project["generate_tests"],
+                         rebuild=project["rebuild"], model_scheduler=_batch_model_scheduler)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(error)
+    return {"name": project["name"], "seconds": time.perf_counter() - started_at, "error": error}
+
+def run_batch(projects, jobs, language):
+    """
+    Runs the projects of a headless run, jobs at a time, each in its own process. The processes
+    share the model scheduler (served by a multiprocessing manager) and the response cache
+    (a SQLite database opened by every process). A single project runs in this process.
+
+    Returns:
+    - list: The results of run_project(), in completion order.
+    """
+    started_at = time.perf_counter()
+    results = []
+    if len(projects) == 1 or jobs <= 1:
+        # Projects run one after the other, in this process, with their output on the console
+        _init_batch_worker(None)
+        for project in projects:
+            results.append(run_project(project, echo=True))
+        manager = None
+    else:
+        manager = ModelSchedulerManager() if MODEL_SCHEDULER_ENABLED else None
+        model_scheduler = None
+        if manager is not None:
+            manager.start()
+            model_scheduler = manager.ModelScheduler(MAX_LOADED_MODELS, MODEL_TURN)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(projects)), initializer=_init_batch_worker,
+                                 initargs=(model_scheduler,)) as executor:
+            futures = [executor.submit(run_project, project) for project in projects]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(batch_result_line(result, language))
+        if model_scheduler is not None:
+            print(translate_string('main', 'model_scheduler_report_header', language))
+            for line in model_scheduler.summary_lines():
+                print(line)
+
+    seconds = time.perf_counter() - started_at
+    print(translate_string('main', 'batch_report_header', language))
+    for result in sorted(results, key=lambda result: result["name"]):
+        print(f"  {batch_result_line(result, language)}")
+    succeeded = sum(1 for result in results if result["error"] is None)
+    print(translate_string('main', 'batch_throughput', language).format(
+        count=succeeded, total=len(results), seconds=seconds, per_hour=succeeded * 3600 / max(seconds, 1e-9)))
+    if manager is not None:
+        manager.shutdown()
+    return results
+
+def batch_result_line(result, language):
+    if result["error"] is None:
+        return translate_string('main', 'batch_project_done', language).format(**result)
+    return translate_string('main', 'batch_project_failed', language).format(**result)
+
+def profile_startup(language):
+    """
+    Reports where the cold start goes (--profile-startup): the wall time of the startup phases,
+    including the deferred imports, and the slowest imports of a fresh interpreter. The
+    __pycache__ cleanup runs first, as in a normal start, so the imports include their compilation.
+    """
+    profile = StartupProfile()
+    profile.record("import main.py", IMPORTS_SECONDS)
+    with profile.phase("preload translations"):
+        preload_translations()
+    with profile.phase("clean __pycache__"):
+        clean_pycache(os.path.dirname(__file__), language)
+    for module in DEFERRED_IMPORTS:
+        with profile.phase(f"import {module} (deferred)"):
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                print(f"{module}: {e}")
+    print(translate_string('main', 'startup_profile_header', language))
+    for line in profile.summary_lines():
+        print(line)
+    print(translate_string('main', 'startup_imports_header', language))
+    imports = import_times(["main", *DEFERRED_IMPORTS], cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in import_time_lines(imports):
+        print(line)
 
 def main():
+    args = parse_arguments()
+
+    # Startup profile: report the cold start and exit
+    if args.profile_startup:
+        profile_startup(args.language)
+        return
+
+    # Load every translation once, so lookups need no file I/O
+    preload_translations()
+
+    # Headless runs: every option comes from the arguments or the manifest
+    if args.project or args.manifest:
+        try:
+            projects = headless_projects(args)
+        except (OSError, ValueError) as e:
+            sys.exit(f"codegenies: {e}")
+        clean_pycache(os.path.dirname(__file__), args.language)
+        results = run_batch(projects, args.jobs, args.language)
+        sys.exit(0 if all(result["error"] is None for result in results) else 1)
+
     # Ask the user which language to use
     global LANGUAGE
     LANGUAGE = select_language()
@@ -396,22 +955,9 @@ def main():
     
     analyst_properties = os.path.join(os.path.dirname(__file__), "project.properties")
 
-    # Redirecting standard output to capture log
-    original_stdout = sys.stdout
-    captured_stdout = StringIO()
-    sys.stdout = MultiOutput(original_stdout, captured_stdout)
-    project_base_path = os.path.join(os.path.dirname(__file__), "build", project_name)
-
-    try:
-        start(project_name, analyst_properties, DEVSTYLE, LANGUAGE)
-    finally:
-        # Restore the original stdout
-        sys.stdout = original_stdout
-        # Get the captured output
-        actions_report = captured_stdout.getvalue()
-        actions_report_file = translate_string('main', 'execution_report_file', LANGUAGE)
-        with open(os.path.join(project_base_path, actions_report_file), 'w') as f:
-            f.write(actions_report)
+    # Redirecting standard output to the run log, written while the run executes
+    with project_logs(project_name, LANGUAGE, append=args.append_logs):
+        start(project_name, analyst_properties, DEVSTYLE, LANGUAGE, rebuild=args.rebuild)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,13 @@
+# tests/conftest.py
+"""
+conftest.py
+
+Shared setup of the tests: the project root is importable and the on-disk LLM
+response cache is off, so no test reads or fills it (main.py reads the setting
+at import time).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ["CODEGENIES_LLM_CACHE"] = "off"
@@ -0,0 +1,39 @@
+# tests/test_cli.py
+"""
+test_cli.py
+
+Tests of the command line options and of the headless project descriptions (main.py).
+"""
+import json
+import os
+
+import pytest
+
+import main
+
+PROPERTIES_FILE = os.path.join(os.path.dirname(__file__), "..", "project.properties.template")
+
+def test_append_logs_is_passed_to_the_projects():
+    args = main.parse_arguments(["--project", "shop", "--append-logs", "--properties", PROPERTIES_FILE])
+    project, = main.headless_projects(args)
+    assert project["append_logs"] is True
+    assert project["rebuild"] is False
+
+def test_resume_flag_no_longer_exists():
+    with pytest.raises(SystemExit):
+        main.parse_arguments(["--resume"])
+
+def test_manifest_entries_override_the_defaults(tmp_path):
+    manifest = tmp_path / "projects.json"
+    manifest.write_text(json.dumps({
+        "defaults": {"style": "tdd"},
+        "projects": [{"name": "shop"}, {"name": "agenda", "style": "normal", "components": ["backend"], "append_logs": True}],
+    }))
+    args = main.parse_arguments(["--manifest", str(manifest), "--properties", PROPERTIES_FILE])
+    shop, agenda = main.headless_projects(args)
+    assert shop["style"] == "tdd" and shop["generate_frontend"] and not shop["append_logs"]
+    assert agenda["style"] == "normal" and not agenda["generate_frontend"] and agenda["append_logs"]
+
+def test_unknown_style_is_rejected():
+    with pytest.raises(ValueError):
+        main.project_spec({"name": "shop", "style": "waterfall"}, {"language": "en-us", "style": "normal"}, ".")
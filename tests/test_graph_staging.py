@@ -0,0 +1,189 @@
+# tests/test_graph_staging.py
+"""
+test_graph_staging.py
+
+Tests of the scheduling and staging of the task graph nodes (graph.py): nodes are
+generated once the nodes they depend on are done, the files shared by
+several nodes are written once, and a node is recorded in the manifest only
+after its files are on disk.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import graph
+from utils import write_buffer as write_buffer_module
+from utils.checkpoint import NodeManifest
+from utils.write_buffer import StagedWriteBuffer
+
+def split_headers(content):
+    return [], content.splitlines()
+
+def node(name):
+    return SimpleNamespace(name=name)
+
+def counting_writes(monkeypatch):
+    writes = []
+    original = write_buffer_module.write_file_atomically
+
+    def write(path, content):
+        writes.append(path)
+        original(path, content)
+
+    monkeypatch.setattr(write_buffer_module, "write_file_atomically", write)
+    return writes
+
+def test_shared_file_is_written_once_and_nodes_recorded_after_the_flush(tmp_path, monkeypatch):
+    writes = counting_writes(monkeypatch)
+    manifest = NodeManifest(str(tmp_path / "manifest.jsonl"))
+    buffer = StagedWriteBuffer(split_headers)
+    pending = []
+    shared = str(tmp_path / "shared.py")
+    for index in range(5):
+        graph._stage_node_files(buffer, pending, manifest, node(f"node{index}"),
+                                [(shared, f"part_{index} = {index}"), (str(tmp_path / f"own{index}.py"), "x = 1")], "fp")
+    assert writes == []
+    assert manifest.entries == {}
+
+    buffer.flush()
+    graph._record_written_nodes(buffer, manifest, pending)
+    assert writes.count(shared) == 1
+    assert sorted(manifest.entries) == [f"node{index}" for index in range(5)]
+    assert all(manifest.is_done(f"node{index}", "fp") for index in range(5))
+    assert pending == []
+    with open(shared, encoding="utf-8") as f:
+        assert f.read().splitlines() == [f"part_{index} = {index}" for index in range(5)]
+
+def test_node_with_a_failed_file_is_not_recorded(tmp_path):
+    manifest = NodeManifest(str(tmp_path / "manifest.jsonl"))
+    buffer = StagedWriteBuffer(split_headers)
+    pending = []
+    blocked = tmp_path / "blocked"
+    blocked.write_text("a file, not a folder")
+    graph._stage_node_files(buffer, pending, manifest, node("good"), [(str(tmp_path / "good.py"), "x = 1")])
+    graph._stage_node_files(buffer, pending, manifest, node("bad"), [(str(blocked / "bad.py"), "x = 1")])
+    buffer.flush()
+    graph._record_written_nodes(buffer, manifest, pending)
+    assert list(manifest.entries) == ["good"]
+
+def test_size_triggered_flush_records_the_nodes_staged_before_it(tmp_path):
+    manifest = NodeManifest(str(tmp_path / "manifest.jsonl"))
+    buffer = StagedWriteBuffer(split_headers, max_bytes=40)
+    pending = []
+    graph._stage_node_files(buffer, pending, manifest, node("first"), [(str(tmp_path / "a.py"), "a = 1")])
+    assert manifest.entries == {}
+    # Goes past max_bytes: the buffer is flushed while the second node is staged
+    graph._stage_node_files(buffer, pending, manifest, node("second"), [(str(tmp_path / "b.py"), "b = 'x' * 100  # " + "y" * 40)])
+    assert buffer.flushes == 1
+    assert list(manifest.entries) == ["first"]
+    assert [name for name, _, _ in pending] == ["second"]
+
+def test_checkpoint_writes_and_records_every_few_nodes(tmp_path):
+    manifest = NodeManifest(str(tmp_path / "manifest.jsonl"))
+    buffer = StagedWriteBuffer(split_headers)
+    pending = []
+    checkpoint = graph._Checkpoint(nodes=2, seconds=0)
+    for index in range(5):
+        graph._stage_node_files(buffer, pending, manifest, node(f"node{index}"),
+                                [(str(tmp_path / f"file{index}.py"), f"x = {index}")], "fp", checkpoint)
+    assert buffer.flushes == 2
+    assert sorted(manifest.entries) == ["node0", "node1", "node2", "node3"]
+    assert all((tmp_path / f"file{index}.py").exists() for index in range(4))
+    assert [name for name, _, _ in pending] == ["node4"]
+
+def test_checkpoint_after_the_time_limit(tmp_path):
+    manifest = NodeManifest(str(tmp_path / "manifest.jsonl"))
+    buffer = StagedWriteBuffer(split_headers)
+    pending = []
+    checkpoint = graph._Checkpoint(nodes=0, seconds=60)
+    graph._stage_node_files(buffer, pending, manifest, node("first"), [(str(tmp_path / "a.py"), "a = 1")], "fp", checkpoint)
+    assert manifest.entries == {}
+    checkpoint.started_at -= 61
+    graph._stage_node_files(buffer, pending, manifest, node("second"), [(str(tmp_path / "b.py"), "b = 1")], "fp", checkpoint)
+    assert sorted(manifest.entries) == ["first", "second"]
+    assert pending == []
+
+def test_without_manifest_nothing_is_pending(tmp_path):
+    buffer = StagedWriteBuffer(split_headers)
+    pending = []
+    graph._stage_node_files(buffer, pending, None, node("node"), [(str(tmp_path / "a.py"), "a = 1")])
+    assert pending == []
+    graph._record_written_nodes(buffer, None, pending)
+
+class RecordingDeveloper:
+    """
+    Developer generating one file per node, recording the order in which the nodes are
+    started and finished. The nodes of the delays dictionary take that many seconds.
+    """
+    name = "Developer"
+    language = "en-us"
+    interactive = False
+
+    def __init__(self, output_dir, delays=None):
+        self.output_dir = output_dir
+        self.delays = delays or {}
+        self.generated = []
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def extract_headers(self, content):
+        return split_headers(content)
+
+    def can_batch_tasks(self):
+        return True
+
+    def process_task(self, node, node_development_dir, emit):
+        with self._lock:
+            self.generated.append(node.path)
+        time.sleep(self.delays.get(node.path, 0))
+        emit(str(self.output_dir / "tree.txt"), node.path)
+        with self._lock:
+            self.finished.append(node.path)
+
+    def process_task_batch(self, batch):
+        return [graph._generate_task_files(self, node, node_development_dir) for node, node_development_dir in batch]
+
+    def report_write_failure(self, path, error):
+        raise AssertionError(f"{path}: {error}")
+
+BACKLOG = """**Create Files, Folders, Classes, and Functions**
+001.##app/main.py: Starts the server with the routes of api/routes.py
+002.##api/routes.py: Routes using the service of services/user_service.py
+003.##services/user_service.py: User service
+004.##config/settings.py: Settings
+"""
+
+def test_nodes_are_generated_after_their_dependencies_and_staged_in_graph_order(tmp_path):
+    task_graph = graph.build_task_graph(BACKLOG)
+    levels = [[node.path for node in level] for level in task_graph.topological_levels()]
+    assert levels == [["services/user_service.py", "config/settings.py"], ["api/routes.py"], ["app/main.py"]]
+    for max_workers, batch_size in ((4, 0), (1, 2)):
+        output_dir = tmp_path / f"run_{max_workers}_{batch_size}"
+        developer = RecordingDeveloper(output_dir)
+        graph.process_task_graph(developer, task_graph, str(output_dir), max_workers=max_workers, batch_size=batch_size)
+        generated = developer.generated
+        assert generated.index("services/user_service.py") < generated.index("api/routes.py") < generated.index("app/main.py")
+        assert (output_dir / "tree.txt").read_text().splitlines() == ["app/main.py", "api/routes.py", "services/user_service.py",
+                                                                        "config/settings.py"]
+
+def test_slow_node_does_not_hold_up_unrelated_nodes(tmp_path):
+    backlog = BACKLOG + "005.##app/settings_loader.py: Loads config/settings.py\n"
+    task_graph = graph.build_task_graph(backlog)
+    developer = RecordingDeveloper(tmp_path, delays={"services/user_service.py": 0.3})
+    graph.process_task_graph(developer, task_graph, str(tmp_path), max_workers=2)
+    # app/settings_loader.py only waits for config/settings.py, the nodes depending on
+    # services/user_service.py wait for it
+    assert developer.finished == ["config/settings.py", "app/settings_loader.py", "services/user_service.py",
+                                  "api/routes.py", "app/main.py"]
+
+def test_dependency_cycle_is_generated_in_graph_order(tmp_path):
+    backlog = """**Create Files, Folders, Classes, and Functions**
+001.##app/user.py: User model used by app/order.py
+002.##app/order.py: Order model referencing app/user.py
+003.##app/main.py: Entry point loading app/order.py
+"""
+    task_graph = graph.build_task_graph(backlog)
+    for max_workers, batch_size in ((4, 0), (1, 2)):
+        developer = RecordingDeveloper(tmp_path / f"run_{max_workers}_{batch_size}")
+        graph.process_task_graph(developer, task_graph, str(tmp_path), max_workers=max_workers, batch_size=batch_size)
+        assert developer.generated == ["app/user.py", "app/order.py", "app/main.py"]
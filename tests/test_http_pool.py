@@ -0,0 +1,220 @@
+# tests/test_http_pool.py
+"""
+test_http_pool.py
+
+Tests of the connection pool (utils/http_pool.py) and of the endpoint pool
+(utils/endpoint_pool.py) against local servers that drop connections, answer
+HTTP 503 and stall: retries with backoff, timeouts, stale keep-alive connections,
+ejection and readmission of an endpoint, and the cancellation of requests in flight
+(the loser of a hedge).
+"""
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import endpoint_pool as endpoint_pool_module
+from utils.endpoint_pool import EndpointPool
+from utils.http_pool import HTTPConnectionPool, HTTPStatusError, RequestCancel
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json(200 if self.server.scripted.healthy else 503, {"models": []})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        scripted = self.server.scripted
+        action = scripted.next_action()
+        if action == "drop":
+            # Closes the connection without answering
+            self.close_connection = True
+        elif action == "503":
+            self._send_json(503, {"error": "server is restarting"})
+        else:
+            if action == "stall":
+                time.sleep(scripted.stall_seconds)
+            self._send_json(200, {"response": scripted.name})
+            # Closes the keep-alive connection once idle, without telling the client
+            self.close_connection = action == "close"
+
+class ScriptedServer:
+    """
+    Server answering the POST requests with the given actions ("ok", "drop", "503", "stall", "close"),
+    then "ok". GET requests are health checks, answered 200 while healthy.
+    """
+    def __init__(self, name, actions=(), stall_seconds=1.0):
+        self.name = name
+        self.actions = list(actions)
+        self.stall_seconds = stall_seconds
+        self.healthy = True
+        self.posts = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+        self._server.daemon_threads = True
+        self._server.scripted = self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_action(self):
+        with self._lock:
+            self.posts += 1
+            return self.actions.pop(0) if self.actions else "ok"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+def post(pool, **options):
+    with pool.request("POST", "/api/generate", b"{}", {"Content-Type": "application/json"}, **options) as response:
+        return json.loads(response.read())["response"]
+
+def wait_until(condition, seconds=5):
+    deadline = time.monotonic() + seconds
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    monkeypatch.setattr(endpoint_pool_module, "emit_event", lambda event, **fields: events.append(event))
+    return events
+
+def test_dropped_connections_and_503_are_retried(monkeypatch):
+    delays = []
+    monkeypatch.setattr("utils.http_pool.time.sleep", delays.append)
+    with ScriptedServer("a", ["drop", "503", "ok"]) as server:
+        pool = HTTPConnectionPool(server.url, retries=3, backoff=0.1)
+        assert post(pool) == "a"
+        stats = pool.stats()
+    assert stats["retries"] == 2
+    assert stats["failures"] == 0
+    assert server.posts == 3
+    # Exponential backoff with jitter: within [delay / 2, delay] of 0.1, then 0.2
+    assert 0.05 <= delays[0] <= 0.1 and 0.1 <= delays[1] <= 0.2
+
+def test_retries_are_exhausted(monkeypatch):
+    monkeypatch.setattr("utils.http_pool.time.sleep", lambda seconds: None)
+    with ScriptedServer("a", ["503"] * 5) as server:
+        pool = HTTPConnectionPool(server.url, retries=2)
+        with pytest.raises(HTTPStatusError) as error:
+            post(pool)
+        stats = pool.stats()
+    assert error.value.status == 503
+    assert stats["retries"] == 2
+    assert stats["failures"] == 1
+    assert server.posts == 3
+
+def test_stalled_request_times_out_and_is_retried():
+    with ScriptedServer("a", ["stall"], stall_seconds=1.0) as server:
+        pool = HTTPConnectionPool(server.url, read_timeout=0.2, retries=1, backoff=0.01)
+        assert post(pool) == "a"
+        stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["retries"] == 1
+
+def test_idle_connection_closed_by_the_server_is_replaced_without_a_retry():
+    with ScriptedServer("a", ["close"]) as server:
+        pool = HTTPConnectionPool(server.url, retries=0)
+        assert post(pool) == "a"
+        time.sleep(0.05)
+        assert post(pool) == "a"
+        stats = pool.stats()
+    assert stats["stale"] == 1
+    assert stats["retries"] == 0
+    assert stats["opened"] == 2
+
+def test_failing_endpoint_is_ejected_then_readmitted(events):
+    with ScriptedServer("a", ["drop", "503"]) as failing, ScriptedServer("b") as healthy:
+        pool = EndpointPool([failing.url, healthy.url], retries=1, eject_after=2, eject_seconds=0.2, backoff=0.01)
+        first, second = pool.endpoints
+        # Both requests go to the first endpoint, fail and are retried on the second one
+        assert post(pool) == "b"
+        assert post(pool) == "b"
+        assert first.ejected and first.ejections == 1
+        assert events == ["endpoint_ejected"]
+        assert post(pool) == "b"
+        assert failing.posts == 2
+
+        failing.healthy = False
+        time.sleep(0.25)
+        # The health check fails: the endpoint stays out for another eject_seconds
+        assert post(pool) == "b"
+        assert first.ejected
+
+        failing.healthy = True
+        time.sleep(0.25)
+        assert post(pool) == "a"
+        stats = pool.stats()
+        pool.close()
+    assert not first.ejected
+    assert events == ["endpoint_ejected", "endpoint_readmitted"]
+    assert stats["retries"] == 2
+    assert stats["endpoints"][failing.url]["failures"] == 2
+    assert stats["endpoints"][failing.url]["requests"] == 1
+    assert stats["endpoints"][healthy.url]["requests"] == 4
+
+def test_cancelled_request_is_interrupted_and_not_retried():
+    with ScriptedServer("a", ["stall"], stall_seconds=3) as server:
+        pool = HTTPConnectionPool(server.url, retries=3, backoff=0.01)
+        cancel = RequestCancel()
+        threading.Timer(0.2, cancel.cancel).start()
+        started_at = time.monotonic()
+        with pytest.raises((OSError, http.client.HTTPException)):
+            post(pool, cancel=cancel)
+        elapsed = time.monotonic() - started_at
+        stats = pool.stats()
+    assert elapsed < 2
+    assert stats["retries"] == 0
+    assert server.posts == 1
+
+def test_hedge_loser_is_cancelled_in_flight(monkeypatch):
+    closed = []
+    close = endpoint_pool_module._close_response
+
+    def close_response(future):
+        closed.append(future)
+        close(future)
+
+    monkeypatch.setattr(endpoint_pool_module, "_close_response", close_response)
+    with ScriptedServer("a", ["stall"], stall_seconds=3) as slow, ScriptedServer("b") as fast:
+        pool = EndpointPool([slow.url, fast.url], hedge_after=0.1)
+        first, second = pool.endpoints
+        started_at = time.monotonic()
+        assert post(pool) == "b"
+        # The stalled request is stopped long before its response would arrive
+        wait_until(lambda: closed and first.outstanding == 0, seconds=2)
+        elapsed = time.monotonic() - started_at
+        stats = pool.stats()
+        pool.close()
+    assert elapsed < 2
+    assert closed[0].exception() is not None
+    assert stats["hedges"] == 1
+    assert second.hedges_won == 1
+    assert first.requests == 0
+    # The cancelled hedge is not a failure of its endpoint, and its connection is not reused
+    assert first.failures == 0 and not first.ejected
+    assert first.pool.stats()["idle"] == 0
@@ -0,0 +1,71 @@
+# tests/test_pipeline.py
+"""
+test_pipeline.py
+
+End-to-end tests of main.run_pipeline with the deterministic FakeLLM
+(benchmarks/fake_llm.py): the generated files must not depend on how the task
+graph nodes are scheduled (serial, parallel threads or batched prompts) nor on
+how often the finished nodes are written (checkpoints).
+"""
+import contextlib
+import io
+import os
+import shutil
+
+import pytest
+
+import main
+from benchmarks.fake_llm import fake_llm_factory
+
+PROPERTIES_FILE = os.path.join(os.path.dirname(__file__), "..", "project.properties.template")
+BUILD_DIR = os.path.join(os.path.dirname(os.path.abspath(main.__file__)), "build")
+
+def run_project(project_name, style="normal"):
+    """
+    Runs the pipeline with the fake models and returns the content of each generated file.
+    """
+    project_path = os.path.join(BUILD_DIR, project_name)
+    shutil.rmtree(project_path, ignore_errors=True)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.run_pipeline(project_name, PROPERTIES_FILE, style, "en-us", False, True, True, style == "normal",
+                              llm_factory=fake_llm_factory(tasks=6))
+        dev_dir = os.path.join(project_path, "dev")
+        files = {}
+        for root, _, names in os.walk(dev_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as f:
+                    files[os.path.relpath(path, dev_dir)] = f.read()
+        return files
+    finally:
+        shutil.rmtree(project_path, ignore_errors=True)
+
+@pytest.mark.parametrize("style", ["normal", "tdd"])
+def test_scheduling_does_not_change_the_generated_files(monkeypatch, style):
+    monkeypatch.setattr(main, "STAGE_WORKERS", 1)
+    monkeypatch.setattr(main, "GRAPH_WORKERS", 1)
+    monkeypatch.setattr(main, "GRAPH_BATCH_SIZE", 0)
+    monkeypatch.setattr(main, "CHECKPOINT_NODES", 0)
+    monkeypatch.setattr(main, "CHECKPOINT_SECONDS", 0)
+    serial = run_project("_test_pipeline_serial", style)
+
+    monkeypatch.setattr(main, "CHECKPOINT_NODES", 1)
+    checkpointed = run_project("_test_pipeline_checkpointed", style)
+
+    monkeypatch.setattr(main, "STAGE_WORKERS", 4)
+    monkeypatch.setattr(main, "GRAPH_WORKERS", 4)
+    parallel = run_project("_test_pipeline_parallel", style)
+
+    monkeypatch.setattr(main, "GRAPH_BATCH_SIZE", 4)
+    batched = run_project("_test_pipeline_batched", style)
+
+    assert serial
+    assert checkpointed == serial
+    assert parallel == serial
+    assert batched == serial
+
+def test_code_correction_style_generates_files():
+    files = run_project("_test_pipeline_correction", "code-correction")
+    assert files
+    assert all(content.strip() for content in files.values())
@@ -0,0 +1,85 @@
+# tests/test_prefix_context.py
+"""
+test_prefix_context.py
+
+Tests of the prompt prefix reuse (utils/prefix_context.py) against the fake Ollama
+server (benchmarks/fake_ollama_server.py): the prefix is prefilled once, later calls
+send its context state, a missing or refused state falls back to the full prompt,
+and the responses are the ones of the calls sent without reuse.
+"""
+import pytest
+
+from agents.base_agent import BaseAgent
+from benchmarks.fake_ollama_server import FakeOllamaServer, count_tokens
+from utils.ollama_client import OllamaClient
+from utils.prefix_context import PrefixContextStore
+
+PREFIX = "Project properties and general report shared by every prompt.\n" * 8
+SUFFIXES = ["Write the backlog of the backend.", "Write the backlog of the frontend.", "Write the backlog of the tests."]
+
+def recording_client(server, payloads):
+    client = OllamaClient("fake", base_url=server.url)
+    payload = client._payload
+
+    def record(*args, **kwargs):
+        data = payload(*args, **kwargs)
+        payloads.append(data)
+        return data
+
+    client._payload = record
+    return client
+
+def evaluate_all(client, store, monkeypatch):
+    monkeypatch.setattr(BaseAgent, "prefix_contexts", store)
+    monkeypatch.setattr(BaseAgent, "response_cache", None)
+    agent = BaseAgent("Tester", client, "en-us", False)
+    return [agent.evaluate(suffix, prefix=PREFIX) for suffix in SUFFIXES]
+
+@pytest.fixture
+def expected(monkeypatch):
+    with FakeOllamaServer() as server:
+        return evaluate_all(OllamaClient("fake", base_url=server.url), None, monkeypatch)
+
+def test_prefix_is_prefilled_once_and_its_context_sent_by_later_calls(expected, monkeypatch):
+    payloads = []
+    store = PrefixContextStore(min_prefix_chars=16)
+    with FakeOllamaServer() as server:
+        responses = evaluate_all(recording_client(server, payloads), store, monkeypatch)
+        stats = server.stats()
+    assert responses == expected
+    assert store.stats()["prefills"] == 1
+    assert store.stats()["reuses"] == len(SUFFIXES) - 1
+    assert store.stats()["fallbacks"] == 0
+    prefills = [payload for payload in payloads if payload["options"].get("num_predict") == 0]
+    assert [payload["prompt"] for payload in prefills] == [PREFIX]
+    calls = [payload for payload in payloads if payload not in prefills]
+    assert [payload["prompt"] for payload in calls] == SUFFIXES
+    assert all(payload["context"] for payload in calls)
+    # The server evaluated the prefix tokens once
+    assert stats["prompt_tokens"] == count_tokens(PREFIX) + sum(count_tokens(suffix) for suffix in SUFFIXES)
+
+def test_missing_context_falls_back_to_the_full_prompt(expected, monkeypatch):
+    payloads = []
+    store = PrefixContextStore(min_prefix_chars=16)
+    with FakeOllamaServer(context=False) as server:
+        responses = evaluate_all(recording_client(server, payloads), store, monkeypatch)
+    assert responses == expected
+    assert store.stats()["prefills"] == 1
+    assert store.stats()["fallbacks"] == len(SUFFIXES)
+    calls = [payload for payload in payloads if payload["options"].get("num_predict") != 0]
+    assert [payload["prompt"] for payload in calls] == [PREFIX + suffix for suffix in SUFFIXES]
+    assert not any("context" in payload for payload in calls)
+
+def test_refused_context_falls_back_to_the_full_prompt(expected, monkeypatch):
+    payloads = []
+    store = PrefixContextStore(min_prefix_chars=16)
+    with FakeOllamaServer(context=False) as server:
+        client = recording_client(server, payloads)
+        # A state the server cannot continue (it answers HTTP 400 to requests with a context)
+        client.prefill = lambda prefix: {"context": [1, 2, 3], "prompt_eval_count": count_tokens(prefix)}
+        responses = evaluate_all(client, store, monkeypatch)
+    assert responses == expected
+    # The refused state is forgotten, so every call prefills again and falls back
+    assert store.stats()["prefills"] == len(SUFFIXES)
+    assert store.stats()["fallbacks"] == len(SUFFIXES)
+    assert [payload["prompt"] for payload in payloads if "context" not in payload] == [PREFIX + suffix for suffix in SUFFIXES]
@@ -0,0 +1,55 @@
+# tests/test_run_log.py
+"""
+test_run_log.py
+
+Tests of the run log sinks (utils/run_log.py): every complete line must be on
+disk without closing the log, so a killed run keeps its tail.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from utils.run_log import EventLog, RunLog
+
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def test_run_log_lines_reach_the_file_before_close(tmp_path):
+    path = str(tmp_path / "run.log")
+    log = RunLog(path)
+    log.write("first line\n")
+    log.write("second ")
+    log.write("line\n")
+    assert read(path) == "first line\nsecond line\n"
+    log.close()
+
+def test_event_log_events_reach_the_file_before_close(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    events = EventLog(path)
+    events.emit("stage_finished", stage="reports")
+    assert json.loads(read(path))["stage"] == "reports"
+    events.close()
+
+def test_killed_process_keeps_the_tail_of_the_log(tmp_path):
+    path = str(tmp_path / "run.log")
+    script = ("import os, sys\n"
+              "from utils.run_log import RunLog\n"
+              "log = RunLog(sys.argv[1])\n"
+              "for index in range(100):\n"
+              "    log.write(f'line {index}\\n')\n"
+              "os._exit(1)\n")
+    subprocess.run([sys.executable, "-c", script, path], cwd=PROJECT_ROOT, check=False)
+    assert read(path).splitlines()[-1] == "line 99"
+
+def test_rotation_keeps_line_buffering(tmp_path):
+    path = str(tmp_path / "run.log")
+    log = RunLog(path, max_bytes=20, backup_count=2)
+    log.write("a" * 25 + "\n")
+    log.write("after rotation\n")
+    assert read(path) == "after rotation\n"
+    assert read(path + ".1") == "a" * 25 + "\n"
+    log.close()
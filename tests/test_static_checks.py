@@ -0,0 +1,74 @@
+# tests/test_static_checks.py
+"""
+test_static_checks.py
+
+Tests of the local syntax checks (utils/static_checks.py) and of their use in
+Developer.test_code: parser errors go straight to the correction, while the findings
+of the bracket and tag heuristics are only hints given to the model syntax check.
+"""
+import pytest
+
+from agents.developer import Developer
+from benchmarks.fake_llm import FakeLLM
+from utils.static_checks import StaticChecker, check_source, is_heuristic
+
+JSX_LIST = """export function Items({ items }) {
+  return (<ul>{items.map(i => (
+    <li key={i.id}>{i.name}'s item</li>)}
+  </ul>);
+}
+"""
+
+@pytest.fixture
+def checker(monkeypatch):
+    checker = StaticChecker()
+    monkeypatch.setattr(Developer, "static_checker", checker)
+    return checker
+
+@pytest.fixture
+def developer(monkeypatch):
+    developer = Developer("Developer", FakeLLM(), "normal", "en-us", interactive=False)
+    developer.check_prompts = []
+
+    def generate_checks(prompts, prefix):
+        developer.check_prompts.append(prompts)
+        return {step: "No syntax errors were found. All tests passed." for step in prompts}
+
+    monkeypatch.setattr(developer, "generate_checks", generate_checks)
+    return developer
+
+def test_parser_errors_are_certain():
+    assert check_source("app.py", "def f(:\n    pass\n")[0].startswith("app.py:1:")
+    assert check_source("data.json", '{"a": 1,}')
+    assert not is_heuristic("app.py") and not is_heuristic("data.json")
+    assert is_heuristic("app.js") and is_heuristic("index.html")
+
+def test_jsx_and_tsx_are_left_to_the_model():
+    assert check_source("a.jsx", JSX_LIST) is None
+    assert check_source("a.tsx", JSX_LIST) is None
+    assert check_source("a.js", "const a = [1, 2;\n") == ["a.js:1:11: '[' is never closed"]
+
+def test_heuristic_findings_are_hints(checker):
+    result = checker.check_files({"app.py": "x = 1\n", "app.js": "function f() {\n", "a.jsx": JSX_LIST})
+    assert result.issues == []
+    assert result.hints == ["app.js:1:14: '{' is never closed"]
+    assert result.unchecked == ["a.jsx"]
+    assert not result.clean
+    stats = checker.stats()
+    assert stats["files_with_errors"] == 0
+    assert stats["files_with_hints"] == 1
+    assert stats["files_unchecked"] == 1
+
+def test_parser_errors_skip_the_model_checks(checker, developer):
+    result = developer.test_code({"app.py": "def f(:\n    pass\n"})
+    assert result.startswith("fail\n- app.py:1:")
+    assert developer.check_prompts == []
+    assert checker.stats()["llm_calls_saved"] == 3
+
+def test_heuristic_findings_are_sent_to_the_model_check(checker, developer):
+    result = developer.test_code({"app.py": "x = 1\n", "app.js": "function f() {\n"})
+    assert result == "success"
+    [prompts] = developer.check_prompts
+    assert "- app.js:1:14: '{' is never closed" in prompts["syntax"]
+    # The model still checks the syntax: no call is saved
+    assert checker.stats()["llm_calls_saved"] == 0
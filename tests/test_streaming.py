@@ -0,0 +1,54 @@
+# tests/test_streaming.py
+"""
+test_streaming.py
+
+Tests of the streamed code generation (Developer.stream_and_write_code): the latency
+metrics are kept per call when several graph workers stream with the same Developer.
+"""
+import threading
+import time
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.developer import Developer
+from benchmarks.fake_llm import FakeLLM
+
+class DelayedFakeLLM(FakeLLM):
+    """
+    Fake model whose first chunk arrives after the delay given by the task ("slow" or "fast").
+    """
+    DELAYS = {"slow": 0.4, "fast": 0.0}
+
+    def stream(self, prompt):
+        time.sleep(self.DELAYS["slow" if "slow" in prompt else "fast"])
+        yield from super().stream(prompt)
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(BaseAgent, "response_cache", None)
+
+def test_time_to_first_token_is_kept_per_call(tmp_path):
+    developer = Developer("Developer", DelayedFakeLLM(), "normal", "en-us", interactive=False, streaming=True)
+    files = []
+    lock = threading.Lock()
+
+    def emit(path, content):
+        with lock:
+            files.append(path)
+
+    def stream(task):
+        developer.stream_and_write_code(str(tmp_path / task / "main.py"), f"Write the {task} task ##{task}/main.py",
+                                        task, emit)
+
+    slow = threading.Thread(target=stream, args=("slow",))
+    slow.start()
+    time.sleep(0.05)
+    # The fast call finishes while the slow one is still waiting for its first token
+    stream("fast")
+    slow.join()
+
+    metrics = {metric["task"].split("/")[-2]: metric["time_to_first_token"] for metric in developer.stream_metrics}
+    assert metrics["fast"] < 0.2
+    assert metrics["slow"] >= 0.4
+    assert len(files) == 2 * developer.llm.files_per_response
@@ -0,0 +1,151 @@
+# tests/test_test_runner.py
+"""
+test_test_runner.py
+
+Tests of the sandboxed runner of the generated Python tests (utils/test_runner.py):
+report parsing with pytest and unittest, the CPU, memory and wall-clock limits,
+and the runs that collect no test.
+"""
+import os
+import sys
+
+import pytest
+
+from utils.test_runner import SandboxedTestRunner, SandboxRunResult, has_python_tests
+
+SERVICE = "def add(a, b):\n    return a + b\n"
+
+PASSING_TESTS = """from service import add
+
+def test_add():
+    assert add(1, 2) == 3
+
+def test_add_negative():
+    assert add(-1, -2) == -3
+"""
+
+FAILING_TESTS = """from service import add
+
+def test_add():
+    assert add(1, 2) == 3
+
+def test_add_strings():
+    assert add("a", "b") == "ba"
+"""
+
+UNITTEST_TESTS = """import unittest
+from service import add
+
+class AddTest(unittest.TestCase):
+    def test_add(self):
+        self.assertEqual(add(1, 2), 3)
+
+    def test_wrong(self):
+        self.assertEqual(add(1, 1), 3)
+"""
+
+limited = pytest.mark.skipif(not hasattr(os, "killpg"), reason="resource limits and process groups are POSIX only")
+
+@pytest.fixture
+def runner():
+    return SandboxedTestRunner(wall_seconds=30)
+
+def process_state(pid):
+    """
+    Returns the state of a process ("Z" for a zombie), or None when it no longer exists.
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("State:"):
+                    return line.split()[1]
+    except OSError:
+        return None
+
+def test_has_python_tests_only_matches_collected_files():
+    assert has_python_tests({"tests/test_service.py": "x = 1"})
+    assert has_python_tests({"service_test.py": "x = 1"})
+    # Test functions outside test files are not collected by the run
+    assert not has_python_tests({"service.py": SERVICE + "\ndef test_add():\n    assert add(1, 2) == 3\n"})
+    assert not has_python_tests({"checks.py": "import unittest\nclass T(unittest.TestCase):\n    pass\n"})
+    assert not has_python_tests({"test_service.js": "test('add', () => {});"})
+
+def test_passing_tests(runner):
+    result = runner.run({"service.py": SERVICE, "tests/test_service.py": PASSING_TESTS})
+    assert isinstance(result, SandboxRunResult)
+    assert result.status == "passed" and result.ok
+    assert result.passed == 2
+    assert result.failures == []
+    assert runner.stats()["passed"] == 1
+
+def test_failing_tests_are_reported(runner):
+    result = runner.run({"service.py": SERVICE, "test_service.py": FAILING_TESTS})
+    assert result.status == "failed" and not result.ok
+    assert result.passed == 1
+    assert len(result.failures) == 1
+    assert "test_add_strings" in result.failures[0]["test"]
+    assert "assert" in result.failures[0]["message"]
+    assert result.failure_lines()[0].startswith(result.failures[0]["test"])
+    assert "1 passed, 1 failed" in result.summary()
+
+@pytest.mark.parametrize("framework", ["pytest", "unittest"])
+def test_unittest_tests_in_suffixed_files(framework):
+    runner = SandboxedTestRunner(wall_seconds=30)
+    runner.framework = framework
+    result = runner.run({"service.py": SERVICE, "service_test.py": UNITTEST_TESTS})
+    assert result.status == "failed"
+    assert result.passed == 1
+    assert [failure["test"] for failure in result.failures if "test_wrong" in failure["test"]]
+
+def test_import_error_fails_the_run(runner):
+    result = runner.run({"test_service.py": PASSING_TESTS})
+    assert result.status == "failed"
+    assert "service" in result.summary()
+
+def test_run_without_collected_tests_is_left_to_the_model(runner):
+    assert runner.run({"service.py": SERVICE + "\ndef test_add():\n    assert add(1, 2) == 3\n"}) is None
+    assert runner.run({"service.py": SERVICE, "test_service.py": "from service import add\n"}) is None
+    # unittest does not collect test functions
+    runner.framework = "unittest"
+    assert runner.run({"service.py": SERVICE, "test_service.py": PASSING_TESTS}) is None
+    stats = runner.stats()
+    assert stats["runs"] == 2
+    assert stats["empty"] == 2
+    assert stats["passed"] == 0
+
+@limited
+def test_cpu_limit_kills_a_busy_loop():
+    runner = SandboxedTestRunner(cpu_seconds=1, wall_seconds=30)
+    result = runner.run({"test_loop.py": "def test_loop():\n    while True:\n        pass\n"})
+    assert result.status == "error"
+    assert "CPU time" in result.summary()
+    assert result.seconds < 20
+
+@limited
+def test_memory_limit_stops_a_memory_hog():
+    runner = SandboxedTestRunner(memory_mb=512, wall_seconds=30)
+    result = runner.run({"test_memory.py": "def test_memory():\n    data = bytearray(4 * 1024 ** 3)\n"})
+    # The allocation fails inside the test, which is reported as a failure
+    assert result.status == "failed"
+    assert result.failure_lines() == ["test_memory.py::test_memory: MemoryError"]
+
+@limited
+def test_timeout_kills_the_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    code = f"""import subprocess, sys, time
+
+def test_sleep():
+    child = subprocess.Popen([{sys.executable!r}, "-c", "import time; time.sleep(60)"])
+    with open({str(pid_file)!r}, "w") as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+"""
+    runner = SandboxedTestRunner(wall_seconds=2)
+    result = runner.run({"test_sleep.py": code})
+    assert result.status == "timeout" and not result.ok
+    assert "Timed out after 2s" in result.summary()
+    assert result.seconds < 20
+    assert runner.stats()["timeouts"] == 1
+    # The process started by the test is killed with the test process
+    pid = int(pid_file.read_text())
+    assert process_state(pid) in (None, "Z")
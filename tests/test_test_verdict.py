@@ -0,0 +1,56 @@
+# tests/test_test_verdict.py
+"""
+test_test_verdict.py
+
+Tests of the deterministic verdict of the check results (utils/test_verdict.py).
+"""
+import pytest
+
+from utils.test_verdict import combined_verdict, parse_verdict
+
+@pytest.mark.parametrize("text, verdict", [
+    # Clear passes
+    ("No syntax errors were found.", "success"),
+    ("The code is valid and runs without errors.", "success"),
+    ("All 5 tests passed.", "success"),
+    ("Ran 3 tests in 0.01s\n\nOK", "success"),
+    ("===== 4 passed in 0.12s =====", "success"),
+    ("No SyntaxError: all tests passed.", "success"),
+    ("4 passed, 0 failed", "success"),
+    ("Nenhum erro de sintaxe foi encontrado.", "success"),
+    ("Todos os testes passaram.", "success"),
+    # Clear failures
+    ("Traceback (most recent call last):\n  File \"app.py\", line 3\nNameError: name 'x' is not defined", "fail"),
+    ("FAILED test_app.py::test_add - assert 2 == 3", "fail"),
+    ("2 failed, 0 passed", "fail"),
+    ("The tests failed.", "fail"),
+    ("Erro de sintaxe na linha 3.", "fail"),
+    # Negated or hedged passes
+    ("Not all tests passed.", None),
+    ("No syntax errors were found? Actually there is one on line 3.", None),
+    ("All tests passed, but the output is wrong.", None),
+    ("No errors were found. However, the function never returns.", None),
+    ("Nem todos os testes passaram.", None),
+    ("Nenhum erro encontrado, mas a função não retorna nada.", None),
+    # Both kinds of phrases, or none
+    ("3 passed, 1 failed", None),
+    ("All tests passed. FAILED test_app.py::test_add", None),
+    ("The code defines a function add(a, b).", None),
+    ("", None),
+    ("   \n", None),
+    (None, None),
+])
+def test_parse_verdict(text, verdict):
+    assert parse_verdict(text) == verdict
+
+@pytest.mark.parametrize("verdicts, verdict", [
+    (["success", "success"], "success"),
+    (["success", "fail"], "fail"),
+    (["fail", "fail"], "fail"),
+    (["success", None], None),
+    (["fail", None], None),
+    ([], None),
+    (iter(["success"]), "success"),
+])
+def test_combined_verdict(verdicts, verdict):
+    assert combined_verdict(verdicts) == verdict
@@ -0,0 +1,35 @@
+# tests/test_tracing.py
+"""
+test_tracing.py
+
+Tests of the latency tracing layer (utils/tracing.py).
+"""
+import pytest
+
+from utils.tracing import Tracer, percentile
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    ([], 0.5, 0.0),
+    ([7], 0.95, 7),
+    ([1, 2, 3, 4], 0.25, 1),
+    ([1, 2, 3, 4], 0.5, 2),
+    ([1, 2, 3, 4], 0.75, 3),
+    ([1, 2, 3, 4], 1.0, 4),
+    ([4, 3, 2, 1], 0.75, 3),
+    (list(range(1, 21)), 0.95, 19),
+    (list(range(1, 101)), 0.95, 95),
+    (list(range(1, 101)), 0.5, 50),
+    ([1, 2, 3], 0.0, 1),
+])
+def test_percentile_is_nearest_rank(values, fraction, expected):
+    assert percentile(values, fraction) == expected
+
+def test_spans_are_summarized_and_exported(tmp_path):
+    tracer = Tracer()
+    with tracer.span("generate", "llm", model="fake") as span:
+        span.set(response_chars=10)
+    lines = tracer.summary_lines()
+    assert any("generate" in line for line in lines)
+    path = tmp_path / "trace.json"
+    tracer.export_chrome_trace(str(path))
+    assert path.read_text(encoding="utf-8").strip()
@@ -0,0 +1,37 @@
+# tests/test_write_buffer.py
+"""
+test_write_buffer.py
+
+Tests of the atomic file writes (utils/write_buffer.py): the written files get the
+permissions of a plain open(), or keep the ones of the file they replace.
+"""
+import os
+import stat
+
+import pytest
+
+from utils.write_buffer import write_file_atomically
+
+posix = pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+@posix
+def test_new_file_gets_the_mode_of_open(tmp_path):
+    reference = tmp_path / "reference.py"
+    reference.write_text("x = 1")
+    path = tmp_path / "src" / "app.py"
+    write_file_atomically(str(path), "x = 2")
+    assert path.read_text() == "x = 2"
+    assert file_mode(path) == file_mode(reference)
+    assert [name for name in os.listdir(path.parent) if name.endswith(".tmp")] == []
+
+@posix
+def test_replaced_file_keeps_its_mode(tmp_path):
+    path = tmp_path / "run.sh"
+    path.write_text("echo 1")
+    os.chmod(path, 0o750)
+    write_file_atomically(str(path), "echo 2")
+    assert path.read_text() == "echo 2"
+    assert file_mode(path) == 0o750
@@ -0,0 +1,194 @@
+# utils/checkpoint.py
+"""
+checkpoint.py
+
+This file defines the checkpoints that make runs resumable and incremental. The
+output of every pipeline stage (reports, backlogs, serialized task graphs) is
+saved under build/<project>/checkpoints/ together with a fingerprint of its
+inputs (upstream outputs, project properties, prompt templates, model and
+options), and each development stage keeps a manifest of the task nodes whose
+files are on disk with the fingerprint they were generated from. A later run
+reuses every stage and node whose fingerprint did not change, so a crashed run
+continues where it stopped and an edited input only regenerates what depends on it.
+
+Functions:
+
+- input_fingerprint(*parts): Returns the sha256 fingerprint of JSON compatible inputs.
+
+Classes:
+
+- RunCheckpoint: Stage checkpoints of a project.
+  - __init__(self, project_base_path, reuse): Uses the checkpoints folder of the project.
+    - reuse (bool): False regenerates every stage and node (the previous outputs are replaced).
+  - reuse_stage(name, fingerprint): Returns (True, saved result) when the stage can be reused.
+  - save_stage(name, value, fingerprint): Saves the (JSON compatible) result of a stage.
+  - node_manifest(stage_name): Returns the node manifest of a development stage.
+  - summary_lines(): Returns the rebuilt/reused report of the run.
+
+- NodeManifest: Append-only JSONL record of the finished task nodes of a stage.
+  - is_done(key, fingerprint): Tells whether a node is finished and up to date.
+  - mark_done(key, paths, fingerprint): Records a finished node and the files it wrote.
+  - forget(key): Removes a node that is about to be regenerated.
+"""
+import hashlib
+import json
+import os
+import threading
+from utils.write_buffer import read_text_file, write_file_atomically
+
+# Format version of the checkpoint files
+CHECKPOINT_VERSION = 2
+
+# Folder of the checkpoints inside the project folder
+CHECKPOINT_DIR = "checkpoints"
+
+def input_fingerprint(*parts):
+    """
+    Returns the sha256 fingerprint of the given inputs (JSON compatible values).
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class NodeManifest:
+    """
+    Record of the finished nodes of a task graph, one JSON object per line.
+    Each line is flushed when it is written, so it survives a crash of the run.
+    """
+    def __init__(self, path, reuse=True):
+        self.path = path
+        self.reuse = reuse
+        self.entries = {}
+        self.reused = 0
+        self.rebuilt = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            for line in read_text_file(path).splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Line cut by a crash
+                if entry.get("removed"):
+                    self.entries.pop(entry["node"], None)
+                else:
+                    self.entries[entry["node"]] = entry
+        # Compact the manifest to one line per node
+        write_file_atomically(path, "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self.entries.values()))
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def paths(self, key):
+        entry = self.entries.get(key)
+        return entry["paths"] if entry else []
+
+    def is_done(self, key, fingerprint=None):
+        """
+        Tells whether the node was finished with the same fingerprint and its files still exist.
+        """
+        entry = self.entries.get(key)
+        if not self.reuse or entry is None:
+            return False
+        if fingerprint is not None and entry.get("fingerprint") != fingerprint:
+            return False
+        return all(os.path.exists(path) for path in entry["paths"])
+
+    def mark_done(self, key, paths=(), fingerprint=None):
+        entry = {"node": key, "paths": list(paths), "fingerprint": fingerprint}
+        with self._lock:
+            self.entries[key] = entry
+            self._append(entry)
+
+    def forget(self, key):
+        """
+        Removes a node from the manifest before it is regenerated, so an interrupted
+        regeneration is never mistaken for a finished node.
+        """
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._append({"node": key, "removed": True})
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+class RunCheckpoint:
+    """
+    Stage checkpoints of a project, saved under build/<project>/checkpoints/.
+    """
+    def __init__(self, project_base_path, reuse=True):
+        self.directory = os.path.join(project_base_path, CHECKPOINT_DIR)
+        self.reuse = reuse
+        self.manifests = {}
+        self.stages_reused = []
+        self.stages_rebuilt = []
+        self._lock = threading.Lock()
+
+    def _stage_path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def reuse_stage(self, name, fingerprint):
+        """
+        Returns the saved result of a stage when its inputs did not change.
+
+        Returns:
+            - tuple: (True, result) when the stage is reused, (False, None) when it must run.
+        """
+        path = self._stage_path(name)
+        if self.reuse and os.path.exists(path):
+            try:
+                data = json.loads(read_text_file(path))
+            except ValueError:
+                data = {}
+            if data.get("version") == CHECKPOINT_VERSION and data.get("fingerprint") == fingerprint:
+                with self._lock:
+                    self.stages_reused.append(name)
+                return True, data["value"]
+        # The stage is regenerated: drop its old result, so an interrupted
+        # run never mixes it with the new results of the upstream stages
+        if os.path.exists(path):
+            os.remove(path)
+        with self._lock:
+            self.stages_rebuilt.append(name)
+        return False, None
+
+    def save_stage(self, name, value, fingerprint=None):
+        """
+        Saves the result of a stage. The file is replaced atomically, so a crash
+        never leaves a partial checkpoint.
+        """
+        content = json.dumps({"version": CHECKPOINT_VERSION, "stage": name, "fingerprint": fingerprint, "value": value},
+                             ensure_ascii=False)
+        write_file_atomically(self._stage_path(name), content)
+
+    def node_manifest(self, stage_name):
+        """
+        Returns the node manifest of a development stage (one instance per stage).
+        """
+        with self._lock:
+            manifest = self.manifests.get(stage_name)
+            if manifest is None:
+                os.makedirs(self.directory, exist_ok=True)
+                manifest = NodeManifest(os.path.join(self.directory, f"{stage_name}.nodes.jsonl"), reuse=self.reuse)
+                self.manifests[stage_name] = manifest
+            return manifest
+
+    def summary_lines(self):
+        """
+        Returns the report of what the run regenerated and what it reused.
+
+        Returns:
+            - list: Report lines.
+        """
+        lines = [f"  stages reused : {', '.join(self.stages_reused) or '-'}",
+                 f"  stages rebuilt: {', '.join(self.stages_rebuilt) or '-'}"]
+        for stage_name, manifest in self.manifests.items():
+            lines.append(f"  {stage_name}: {manifest.reused} task nodes reused, {manifest.rebuilt} rebuilt")
+        return lines
+
+    def close(self):
+        with self._lock:
+            for manifest in self.manifests.values():
+                manifest.close()
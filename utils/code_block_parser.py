@@ -0,0 +1,108 @@
+# utils/code_block_parser.py
+"""
+code_block_parser.py
+
+This file defines the incremental parser of multi-file model responses.
+Files are delimited by "##begin##filename.ext" and "##end##filename.ext" markers.
+The parser can be fed a complete response or the chunks of a streamed response,
+and returns each file as soon as its end marker is read.
+
+Classes:
+
+- CodeBlockParser: Line-based state machine that extracts (filename, code) blocks.
+  - feed(chunk): Consumes a piece of text, returns the files completed by it.
+  - feed_line(line): Consumes a complete line, returns the completed file or None.
+  - finish(): Flushes the pending text, returns the remaining files.
+"""
+from utils.pattern_matching import PatternMatching
+
+class CodeBlockParser:
+    """
+    Incremental parser of "##begin##" / "##end##" delimited code blocks.
+    """
+    def __init__(self):
+        # Compiled patterns along with the
+        # right group indexes to be extracted
+        self.patterns = PatternMatching().filename_pattern_set_no_hashtag()
+        self.current_filename = None
+        self.current_code = []
+        self.inside_code_block = False  # Flag to check if execution is inside a code block
+        self._pending = ""
+
+    def feed(self, chunk):
+        """
+        Consumes a chunk of streamed text.
+
+        Args:
+            - chunk (str): Text received from the model.
+
+        Returns:
+            - list: (filename, code) tuples completed by this chunk.
+        """
+        self._pending += chunk
+        lines = self._pending.splitlines(keepends=True)
+        # Keep the last line pending until its line break arrives
+        # (a trailing "\r" may still be followed by "\n")
+        if lines and (lines[-1].splitlines()[0] == lines[-1] or lines[-1].endswith("\r")):
+            self._pending = lines.pop()
+        else:
+            self._pending = ""
+        completed = []
+        for line in lines:
+            block = self.feed_line(line.splitlines()[0])
+            if block:
+                completed.append(block)
+        return completed
+
+    def feed_line(self, line):
+        """
+        Consumes a complete line (without line break).
+
+        Returns:
+            - tuple: (filename, code) when the line closes a code block, otherwise None.
+        """
+        # 1st condition: file name retrieval
+        if ("##begin##") in line:
+            # Match the line against all patterns at once (first matching rule wins)
+            if self.current_filename == None:
+                filename_match = self.patterns.match(line)
+                if filename_match:
+                    # Update current filename
+                    self.current_filename = filename_match.group(filename_match.index)
+                    self.inside_code_block = True  # Enter the code block
+        # 2nd conition: end of file
+        elif self.inside_code_block and ( ("##end##") in line or line == '```' ):  # End of the code block
+            block = None
+            if self.current_filename:
+                # Save the current filename and its code
+                block = (self.current_filename, "\n".join(self.current_code).strip())
+            self.current_filename = None  # Reset filename
+            self.current_code = []  # Reset code
+            self.inside_code_block = False # Reset code block flag
+            return block
+        # 3rd condition: Add line to the current code block
+        # (if inside a code block)
+        elif self.inside_code_block and self.current_filename and not line.startswith('```'):
+            self.current_code.append(line)
+        return None
+
+    def finish(self):
+        """
+        Flushes the pending line and returns the last file's code if it was not closed.
+
+        Returns:
+            - list: (filename, code) tuples still open at the end of the response.
+        """
+        completed = []
+        for line in self._pending.splitlines():
+            block = self.feed_line(line)
+            if block:
+                completed.append(block)
+        self._pending = ""
+        # Save the last file's code if it exists
+        if self.current_filename:
+            completed.append((self.current_filename, "\n".join(self.current_code).strip()))
+            self.current_filename = None
+            self.current_code = []
+            self.inside_code_block = False
+        return completed
@@ -0,0 +1,288 @@
+# utils/endpoint_pool.py
+"""
+endpoint_pool.py
+
+This file defines the pool of Ollama endpoints (servers) used when several hosts
+serve the same models. It has the request() interface of a connection pool
+(utils/http_pool.py), so the model clients (utils/ollama_client.py) of all agents
+use one or several hosts the same way.
+
+Each request goes to the healthy endpoint with the fewest requests in flight
+(least outstanding requests), ties going to the endpoint with the lowest average
+latency. An endpoint failing eject_after requests in a row is ejected for
+eject_seconds and readmitted once a health check (GET /api/tags) succeeds. A
+request failing on an endpoint is retried on another one.
+
+With hedging (hedge_after seconds, off by default), a request still unanswered after
+that delay is sent to a second endpoint as well and the first response wins. The
+other request is cancelled at once: while it waits for its response, the socket of
+its connection is shut down (see RequestCancel), so Ollama sees the client leave and
+stops the generation; a response that already arrived is closed unread.
+
+Classes:
+
+- EndpointPool: Balanced pool of endpoints.
+  - __init__(self, base_urls, retries, eject_after, eject_seconds, hedge_after, **pool_settings):
+    pool_settings are passed to the connection pool (HTTPConnectionPool) of each endpoint.
+  - request(method, path, body, headers): Sends a request to the best endpoint and returns its response.
+  - broadcast(method, path, body, headers): Sends a request to every healthy endpoint (model loads and unloads).
+  - stats(): Returns the connection counters of all endpoints and the counters of each endpoint.
+  - summary_lines(): Returns the throughput and latency report of each endpoint.
+  - close(): Closes the idle connections.
+"""
+import http.client
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.http_pool import (DEFAULT_MAX_CONNECTIONS, DEFAULT_RETRIES, RETRY_STATUSES, HTTPConnectionPool, HTTPStatusError,
+                             RequestCancel)
+from utils.run_log import emit_event
+from utils.tracing import percentile
+
+# Consecutive failures that eject an endpoint, and how long it stays out before its health check
+DEFAULT_EJECT_AFTER = 3
+DEFAULT_EJECT_SECONDS = 30
+
+# Request answered by a healthy Ollama server
+HEALTH_CHECK_PATH = "/api/tags"
+
+class _Endpoint:
+    def __init__(self, pool):
+        self.url = pool.base_url
+        self.pool = pool
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected = False
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.hedges_won = 0
+        self.latencies = []
+
+    def mean_latency(self):
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    def percentile_latency(self, fraction):
+        return percentile(self.latencies, fraction)
+
+class EndpointPool:
+    """
+    Requests balanced over several servers, with health-based ejection and optional hedging.
+    """
+    def __init__(self, base_urls, retries=DEFAULT_RETRIES, eject_after=DEFAULT_EJECT_AFTER,
+                 eject_seconds=DEFAULT_EJECT_SECONDS, hedge_after=0, **pool_settings):
+        # The retries move to another endpoint: each connection pool only tries once
+        self.endpoints = [_Endpoint(HTTPConnectionPool(url, retries=0, **pool_settings)) for url in base_urls]
+        self.base_url = ", ".join(endpoint.url for endpoint in self.endpoints)
+        self.retries = retries
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.hedge_after = hedge_after
+        self.retried = 0
+        self.hedges = 0
+        self.started_at = time.perf_counter()
+        max_connections = pool_settings.get("max_connections", DEFAULT_MAX_CONNECTIONS)
+        self._executor = ThreadPoolExecutor(max_workers=2 * max_connections * len(self.endpoints),
+                                            thread_name_prefix="endpoint")
+        self._lock = threading.Lock()
+
+    def _available(self, endpoint, now):
+        """
+        Tells whether an endpoint takes requests. An ejected endpoint whose time is over is
+        health-checked first (by a single caller; the others skip it meanwhile).
+        """
+        with self._lock:
+            if not endpoint.ejected:
+                return True
+            if endpoint.ejected_until > now:
+                return False
+            endpoint.ejected_until = now + self.eject_seconds
+        try:
+            endpoint.pool.request("GET", HEALTH_CHECK_PATH, retries=0).read()
+        except (OSError, http.client.HTTPException, HTTPStatusError):
+            return False
+        with self._lock:
+            endpoint.ejected = False
+            endpoint.consecutive_failures = 0
+        emit_event("endpoint_readmitted", endpoint=endpoint.url)
+        return True
+
+    def _choose(self, exclude=()):
+        """
+        Returns the available endpoint with the fewest requests in flight. When every endpoint
+        is excluded or ejected, the one coming back first is used anyway.
+        """
+        now = time.monotonic()
+        candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude] or self.endpoints
+        available = [endpoint for endpoint in candidates if self._available(endpoint, now)]
+        with self._lock:
+            if not available:
+                return min(candidates, key=lambda endpoint: endpoint.ejected_until)
+            return min(available, key=lambda endpoint: (endpoint.outstanding, endpoint.mean_latency()))
+
+    def _send(self, endpoint, method, path, body, headers, cancel=None):
+        started_at = time.perf_counter()
+        with self._lock:
+            endpoint.outstanding += 1
+
+        def done(completed):
+            with self._lock:
+                endpoint.outstanding -= 1
+                if completed:
+                    endpoint.requests += 1
+                    endpoint.consecutive_failures = 0
+                    endpoint.latencies.append(time.perf_counter() - started_at)
+
+        try:
+            return endpoint.pool.request(method, path, body, headers, on_done=done, cancel=cancel)
+        except HTTPStatusError as e:
+            self._failed(endpoint, e.status in RETRY_STATUSES)
+            raise
+        except (OSError, http.client.HTTPException):
+            # A cancelled hedge is not a failure of its endpoint
+            self._failed(endpoint, cancel is None or not cancel.cancelled)
+            raise
+
+    def _failed(self, endpoint, transient):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if not transient:
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.ejected or endpoint.consecutive_failures < self.eject_after:
+                return
+            endpoint.ejected = True
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            endpoint.ejections += 1
+        emit_event("endpoint_ejected", endpoint=endpoint.url, failures=endpoint.consecutive_failures)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Sends a request to the best endpoint, retrying the transient errors on the other endpoints.
+
+        Returns:
+            - PooledResponse: The response. Read or close it to free its connection.
+        """
+        tried = []
+        attempt = 0
+        while True:
+            endpoint = self._choose(exclude=tried)
+            try:
+                if self.hedge_after > 0 and len(self.endpoints) > 1:
+                    return self._hedged_request(endpoint, method, path, body, headers, tried)
+                return self._send(endpoint, method, path, body, headers)
+            except HTTPStatusError as e:
+                if e.status not in RETRY_STATUSES:
+                    raise
+                error = e
+            except (OSError, http.client.HTTPException) as e:
+                error = e
+            if attempt >= self.retries:
+                raise error
+            tried.append(endpoint)
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            if len(set(tried)) >= len(self.endpoints):
+                # Every endpoint failed: wait before going around again
+                time.sleep(self.endpoints[0].pool.backoff_delay(attempt - 1))
+                tried = []
+
+    def _hedged_request(self, endpoint, method, path, body, headers, tried):
+        cancels = {}
+        primary_cancel = RequestCancel()
+        primary = self._executor.submit(self._send, endpoint, method, path, body, headers, primary_cancel)
+        cancels[primary] = primary_cancel
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        second = self._choose(exclude=[endpoint, *tried])
+        if second is endpoint:
+            return primary.result()
+        with self._lock:
+            self.hedges += 1
+        hedge_cancel = RequestCancel()
+        hedge = self._executor.submit(self._send, second, method, path, body, headers, hedge_cancel)
+        cancels[hedge] = hedge_cancel
+        winner = None
+        pending = {primary, hedge}
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+        for future in (primary, hedge):
+            if future is not winner:
+                # Stops the losing request in flight, or closes its response once it arrives
+                cancels[future].cancel()
+                future.add_done_callback(_close_response)
+        if winner is None:
+            return primary.result()
+        if winner is hedge:
+            with self._lock:
+                second.hedges_won += 1
+        return winner.result()
+
+    def broadcast(self, method, path, body=None, headers=None):
+        """
+        Sends a request to every endpoint that is not ejected and reads the responses.
+        Fails only when no endpoint answered.
+        """
+        endpoints = [endpoint for endpoint in self.endpoints if not endpoint.ejected] or self.endpoints
+        futures = [self._executor.submit(lambda endpoint=endpoint: self._send(endpoint, method, path, body, headers).read())
+                   for endpoint in endpoints]
+        errors = [future.exception() for future in futures]
+        if all(errors):
+            raise errors[0]
+
+    def stats(self):
+        """
+        Returns the connection counters summed over the endpoints (see HTTPConnectionPool.stats())
+        and, under "endpoints", the counters of each endpoint.
+        """
+        totals = {}
+        for endpoint in self.endpoints:
+            for key, value in endpoint.pool.stats().items():
+                totals[key] = totals.get(key, 0) + value
+        elapsed_minutes = max(time.perf_counter() - self.started_at, 1e-9) / 60
+        with self._lock:
+            totals["retries"] = totals.get("retries", 0) + self.retried
+            totals["hedges"] = self.hedges
+            totals["endpoints"] = {
+                endpoint.url: {"requests": endpoint.requests, "per_minute": endpoint.requests / elapsed_minutes,
+                               "mean_latency": endpoint.mean_latency(), "p95_latency": endpoint.percentile_latency(0.95),
+                               "failures": endpoint.failures, "ejections": endpoint.ejections,
+                               "hedges_won": endpoint.hedges_won, "ejected": endpoint.ejected}
+                for endpoint in self.endpoints
+            }
+        return totals
+
+    def summary_lines(self):
+        """
+        Returns the report of the endpoints of the run.
+
+        Returns:
+            - list: Report lines.
+        """
+        stats = self.stats()
+        lines = [f"  retries on another endpoint: {stats['retries']}, hedged requests: {stats['hedges']}"]
+        for url, counters in stats["endpoints"].items():
+            lines.append(f"  {url}: {counters['requests']} requests ({counters['per_minute']:.1f}/min), "
+                         f"latency mean {counters['mean_latency']:.2f}s p95 {counters['p95_latency']:.2f}s, "
+                         f"{counters['failures']} failures, {counters['ejections']} ejections, "
+                         f"{counters['hedges_won']} hedges won")
+        return lines
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.pool.close()
+        self._executor.shutdown(wait=False)
+
+def _close_response(future):
+    """
+    Closes the unread response of the losing request of a hedge (see RequestCancel for the
+    requests still in flight).
+    """
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
@@ -0,0 +1,301 @@
+# utils/http_pool.py
+"""
+http_pool.py
+
+This file defines a thread-safe pool of keep-alive HTTP connections to one server,
+shared by the model clients of all agents (see utils/ollama_client.py). Requests
+reuse idle connections instead of opening one per call, have separate connect and
+read timeouts (a stalled request fails instead of blocking the run forever) and
+are retried with exponential backoff and jitter on transient errors: refused or
+reset connections, timeouts and HTTP 429/502/503/504 responses. A keep-alive
+connection closed by the server while idle is replaced at once, without counting
+as a retry.
+
+Classes:
+
+- HTTPConnectionPool: Keep-alive connection pool of a server.
+  - __init__(self, base_url, max_connections, connect_timeout, read_timeout, retries, backoff, max_backoff):
+    - max_connections (int): Connections open at the same time (further requests wait for one).
+    - connect_timeout / read_timeout (float): Seconds to connect and to wait for each read.
+    - retries (int): Retries of a request failing with a transient error.
+    - backoff / max_backoff (float): First and largest delay between retries (doubled at each retry, with jitter).
+  - request(method, path, body, headers, retries, on_done, cancel): Sends a request and returns a PooledResponse.
+  - stats(): Returns the connection, request, retry and error counters.
+  - close(): Closes the idle connections.
+
+- PooledResponse: Response whose connection returns to the pool once its body is read.
+
+- RequestCancel: Cancels a request in flight from another thread (e.g. the loser of a hedge).
+
+- HTTPStatusError: Error status returned by the server (after the retries of the transient ones).
+"""
+import http.client
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_CONNECT_TIMEOUT = 10
+# Generations on CPU hosts take minutes: the read timeout only catches stalled requests
+DEFAULT_READ_TIMEOUT = 600
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+
+# Statuses of an overloaded or restarting server, worth retrying
+RETRY_STATUSES = frozenset((429, 502, 503, 504))
+
+# Errors of a keep-alive connection the server closed while it was idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+class HTTPStatusError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+class RequestCancel:
+    """
+    Cancels a request while it is in flight (sent, waiting for the response headers) from
+    another thread: the socket of its connection is shut down, which interrupts the blocked
+    send or read and tells the server the client is gone. The cancelled request is not retried.
+    """
+    def __init__(self):
+        self.cancelled = False
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def attach(self, connection):
+        with self._lock:
+            self._connection = connection
+            cancelled = self.cancelled
+        if cancelled:
+            _shutdown(connection)
+
+    def detach(self):
+        with self._lock:
+            self._connection = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            connection = self._connection
+        if connection is not None:
+            _shutdown(connection)
+
+def _shutdown(connection):
+    sock = connection.sock
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+class PooledResponse:
+    """
+    HTTP response holding a pool connection. The connection goes back to the pool once the
+    body is read (read() or a complete iteration over its lines) and is discarded when the
+    response is closed before that.
+    """
+    def __init__(self, pool, connection, response, on_done=None):
+        self._pool = pool
+        self._connection = connection
+        self._response = response
+        self._on_done = on_done
+        self.status = response.status
+
+    def read(self):
+        try:
+            data = self._response.read()
+        except BaseException:
+            self._discard()
+            raise
+        self._release()
+        return data
+
+    def __iter__(self):
+        completed = False
+        try:
+            for line in self._response:
+                yield line
+            completed = True
+        finally:
+            if completed:
+                self._release()
+            else:
+                self._discard()
+
+    def close(self):
+        self._discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _release(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._pool._release(connection, reusable=not self._response.will_close)
+            if self._on_done is not None:
+                self._on_done(True)
+
+    def _discard(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._response.close()
+            self._pool._release(connection, reusable=False)
+            if self._on_done is not None:
+                self._on_done(False)
+
+class HTTPConnectionPool:
+    """
+    Keep-alive connections to one server, shared by threads.
+    """
+    def __init__(self, base_url, max_connections=DEFAULT_MAX_CONNECTIONS, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == "https"
+        self.max_connections = max(1, max_connections)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.opened = 0
+        self.reused = 0
+        self.requests = 0
+        self.retried = 0
+        self.stale = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._idle = []     # Most recently used last
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.connect_timeout)
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        return connection
+
+    def _acquire(self):
+        """
+        Returns (connection, reused): an idle connection, or a new one.
+        """
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop(), True
+        try:
+            connection = self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.opened += 1
+        return connection, False
+
+    def _release(self, connection, reusable):
+        if reusable:
+            with self._lock:
+                self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def backoff_delay(self, attempt):
+        """
+        Delay before the retry following the given attempt (0 = first): exponential, with jitter
+        so that the clients failing together do not retry together.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def request(self, method, path, body=None, headers=None, retries=None, on_done=None, cancel=None):
+        """
+        Sends a request, retrying the transient errors.
+
+        Args:
+            - retries (int): Retries of this request. Defaults to the pool setting.
+            - on_done (callable): Called with True once the body of a successful response is read,
+              or with False when the response is closed before that.
+            - cancel (RequestCancel): Cancels the request until its response headers arrive.
+
+        Returns:
+            - PooledResponse: The response (status below 400). Read or close it to free its connection.
+
+        Raises:
+            - HTTPStatusError: Error status returned by the server.
+            - OSError / http.client.HTTPException: Connection error or timeout after the retries.
+        """
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            reused = False
+            try:
+                connection, reused = self._acquire()
+                try:
+                    if cancel is not None:
+                        cancel.attach(connection)
+                    connection.request(method, path, body=body, headers=headers or {})
+                    response = connection.getresponse()
+                except BaseException:
+                    self._release(connection, reusable=False)
+                    raise
+                finally:
+                    if cancel is not None:
+                        cancel.detach()
+            except (OSError, http.client.HTTPException) as e:
+                error = e
+                if cancel is not None and cancel.cancelled:
+                    raise
+                if reused and isinstance(e, STALE_CONNECTION_ERRORS):
+                    # The server closed the idle connection: try again on another one
+                    with self._lock:
+                        self.stale += 1
+                    continue
+                if isinstance(e, socket.timeout):
+                    with self._lock:
+                        self.timeouts += 1
+            else:
+                with self._lock:
+                    self.requests += 1
+                if response.status < 400:
+                    return PooledResponse(self, connection, response, on_done)
+                pooled = PooledResponse(self, connection, response)
+                detail = pooled.read().decode("utf-8", errors="replace")
+                error = HTTPStatusError(response.status, detail)
+                if response.status not in RETRY_STATUSES:
+                    with self._lock:
+                        self.failures += 1
+                    raise error
+            if attempt >= retries:
+                with self._lock:
+                    self.failures += 1
+                raise error
+            delay = self.backoff_delay(attempt)
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            return {"opened": self.opened, "reused": self.reused, "requests": self.requests, "retries": self.retried,
+                    "stale": self.stale, "timeouts": self.timeouts, "failures": self.failures, "idle": len(self._idle)}
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,167 @@
+# utils/llm_cache.py
+"""
+llm_cache.py
+
+This file defines a persistent, content-addressed cache for language model
+responses. Entries are keyed by a hash of the model name, the generation
+options and the full prompt, stored compressed in a SQLite database and
+evicted in least-recently-used order once the cache grows past its size limit.
+
+Classes:
+
+- LLMResponseCache: On-disk response cache shared by all agents.
+  - __init__(self, db_path, max_bytes, enabled): Opens (or creates) the cache database.
+    - db_path (str): Path to the SQLite database file.
+    - max_bytes (int): Maximum size of the stored (compressed) payloads.
+    - enabled (bool): When False the cache is bypassed (always a miss, nothing stored).
+
+  - make_key(model, options, prompt): Builds the content address of a request.
+  - get(key): Returns the cached response or None.
+  - put(key, response): Stores a response and evicts old entries if needed.
+  - stats(): Returns the hit/miss/bytes counters.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Default size limit for the compressed payloads (256 MB)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class LLMResponseCache:
+    """
+    Persistent LLM response cache backed by SQLite with zlib compressed payloads.
+    """
+    def __init__(self, db_path, max_bytes=DEFAULT_MAX_BYTES, enabled=True, compression_level=6):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        """
+        Opens the database and creates the entries table if needed.
+        """
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The connection is shared between threads, access is serialized by self._lock
+        self._connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(model, options, prompt):
+        """
+        Builds the content address of a request.
+
+        Args:
+            - model (str): Model name.
+            - options (dict): Generation options that influence the response.
+            - prompt (str): Full prompt sent to the model.
+
+        Returns:
+            - str: Hex digest identifying the request.
+        """
+        digest = hashlib.sha256()
+        digest.update(str(model).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached response for the key or None on a miss.
+        """
+        if not self.enabled:
+            self.misses += 1
+            return None
+        with self._lock:
+            row = self._connection.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+            self.hits += 1
+            self.bytes_read += len(row[0])
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key, response):
+        """
+        Stores a response in the cache and evicts the least recently used
+        entries when the size limit is exceeded.
+        """
+        if not self.enabled or response is None:
+            return
+        payload = zlib.compress(response.encode("utf-8"), self.compression_level)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self.bytes_written += len(payload)
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        Must be called with self._lock held.
+        """
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            - dict: hits, misses, bytes_read, bytes_written and evictions.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,191 @@
+# utils/model_scheduler.py
+"""
+model_scheduler.py
+
+This file defines the model-affinity scheduler placed in front of the model calls.
+The pipeline runs the analyst (phi3), squad leader (llama3.1) and developers
+(deepseek-coder) concurrently, and on a host that can only keep one model in
+memory every alternation makes Ollama unload a model and load another. The
+scheduler admits the calls of the loaded model(s) and queues the calls of the
+other models; a model is only swapped out once its queue is drained (or its turn
+is used up while other models wait), and then the model with the most pending
+calls is loaded next.
+
+The scheduler is an acquire/release gate with plain arguments and results, so the
+same object can be shared by several processes through a multiprocessing manager.
+The caller admitted first after a swap loads the model (unloading the evicted
+ones and warming the new one up) and reports the load time with loaded().
+
+Classes:
+
+- ModelScheduler: Model-affinity gate.
+  - __init__(self, max_loaded_models, max_turn): Models kept loaded together and calls admitted
+    per turn while other models wait (0 = drain the whole queue).
+  - acquire(model): Waits for the model's turn. Returns (must_load, evicted models).
+  - loaded(model, seconds): Marks a model as loaded (seconds = load time, None when unknown).
+  - release(model): Ends a call.
+  - stats(): Returns the switch, load and wait counters (total and per model).
+  - summary_lines(): Returns the report of the run.
+
+- ModelSchedulerManager: Multiprocessing manager serving a ModelScheduler to several processes
+  (start() it, then manager.ModelScheduler(...) returns a proxy that can be passed to the processes).
+"""
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+
+# Models kept loaded together (Ollama's OLLAMA_MAX_LOADED_MODELS)
+DEFAULT_MAX_LOADED_MODELS = 1
+
+# Calls admitted for the loaded model while other models wait, before it is swapped out
+DEFAULT_MAX_TURN = 64
+
+class ModelScheduler:
+    """
+    Groups the model calls by model to minimize the model swaps.
+    """
+    def __init__(self, max_loaded_models=DEFAULT_MAX_LOADED_MODELS, max_turn=DEFAULT_MAX_TURN):
+        self.max_loaded_models = max(1, max_loaded_models)
+        self.max_turn = max_turn
+        self.switches = 0
+        self._loaded = OrderedDict()    # model -> {"ready", "in_flight", "turn"}
+        self._waiting = {}              # model -> number of queued calls
+        self._first_waiting = {}        # model -> arrival time of its oldest queued call
+        self._models = {}               # model -> counters
+        self._condition = threading.Condition()
+
+    def _counters(self, model):
+        return self._models.setdefault(model, {"calls": 0, "loads": 0, "load_seconds": 0.0, "wait_seconds": 0.0})
+
+    def _blocked_models(self):
+        """
+        Models with queued calls that are not loaded.
+        """
+        return [model for model, count in self._waiting.items() if count and model not in self._loaded]
+
+    def _next_model(self):
+        """
+        Model loaded next: the one with the most queued calls (the oldest queue on ties).
+        """
+        blocked = self._blocked_models()
+        return min(blocked, key=lambda model: (-self._waiting[model], self._first_waiting[model])) if blocked else None
+
+    def _evictable(self, model):
+        state = self._loaded[model]
+        if not state["ready"] or state["in_flight"]:
+            return False
+        return not self._waiting.get(model) or self._turn_over(state)
+
+    def _turn_over(self, state):
+        return self.max_turn > 0 and state["turn"] >= self.max_turn
+
+    def _admit(self, model):
+        """
+        Admits a call when possible. Returns None (wait) or (must_load, evicted models).
+        """
+        state = self._loaded.get(model)
+        if state is not None:
+            if not state["ready"]:
+                return None
+            # The loaded model keeps its turn unless models that are not loaded are waiting
+            if self._blocked_models() and self._turn_over(state):
+                return None
+            state["in_flight"] += 1
+            state["turn"] += 1
+            self._loaded.move_to_end(model)
+            return False, []
+        if self._next_model() != model:
+            return None
+        evicted = []
+        while len(self._loaded) >= self.max_loaded_models:
+            candidates = [name for name in self._loaded if self._evictable(name)]
+            if not candidates:
+                # Undo the evictions of this attempt: nothing is swapped until a model is drained
+                for name, state in evicted:
+                    self._loaded[name] = state
+                return None
+            name = candidates[0]
+            evicted.append((name, self._loaded.pop(name)))
+        self.switches += len(evicted)
+        self._loaded[model] = {"ready": False, "in_flight": 1, "turn": 1}
+        return True, [name for name, _ in evicted]
+
+    def acquire(self, model):
+        """
+        Waits until a call of the model can be sent.
+
+        Returns:
+            - tuple: (must_load, evicted). When must_load is True the caller loads the model
+              (after unloading the evicted models) and reports it with loaded().
+        """
+        started_at = time.perf_counter()
+        with self._condition:
+            self._waiting[model] = self._waiting.get(model, 0) + 1
+            self._first_waiting.setdefault(model, started_at)
+            while True:
+                admission = self._admit(model)
+                if admission is not None:
+                    break
+                self._condition.wait()
+            self._waiting[model] -= 1
+            if self._waiting[model]:
+                self._first_waiting[model] = time.perf_counter()
+            else:
+                del self._waiting[model]
+                del self._first_waiting[model]
+            counters = self._counters(model)
+            counters["calls"] += 1
+            counters["wait_seconds"] += time.perf_counter() - started_at
+            self._condition.notify_all()
+            return admission
+
+    def loaded(self, model, seconds=None):
+        """
+        Marks the model as loaded, letting its other queued calls through.
+        """
+        with self._condition:
+            state = self._loaded.get(model)
+            if state is not None:
+                state["ready"] = True
+            counters = self._counters(model)
+            counters["loads"] += 1
+            if seconds is not None:
+                counters["load_seconds"] += seconds
+            self._condition.notify_all()
+
+    def release(self, model):
+        with self._condition:
+            state = self._loaded.get(model)
+            if state is not None:
+                state["in_flight"] -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            models = {model: dict(counters) for model, counters in self._models.items()}
+            return {"switches": self.switches,
+                    "loads": sum(counters["loads"] for counters in models.values()),
+                    "load_seconds": sum(counters["load_seconds"] for counters in models.values()),
+                    "wait_seconds": sum(counters["wait_seconds"] for counters in models.values()),
+                    "models": models}
+
+    def summary_lines(self):
+        """
+        Returns the report of the model swaps of the run.
+
+        Returns:
+            - list: Report lines.
+        """
+        stats = self.stats()
+        lines = [f"  model switches: {stats['switches']}, loads: {stats['loads']}, "
+                 f"load time: {stats['load_seconds']:.1f}s, queue wait: {stats['wait_seconds']:.1f}s"]
+        for model, counters in stats["models"].items():
+            lines.append(f"  {model}: {counters['calls']} calls, {counters['loads']} loads "
+                         f"({counters['load_seconds']:.1f}s), waited {counters['wait_seconds']:.1f}s")
+        return lines
+
+class ModelSchedulerManager(BaseManager):
+    pass
+
+ModelSchedulerManager.register("ModelScheduler", ModelScheduler)
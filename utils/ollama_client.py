@@ -0,0 +1,195 @@
+# utils/ollama_client.py
+"""
+ollama_client.py
+
+This file defines a first-party client for the Ollama generate API
+(POST /api/generate), implemented with the standard library. It can replace the
+langchain Ollama model passed to the agents (model, _default_params, invoke,
+generate, stream) and also exposes the "context" state returned by Ollama, so a
+prompt prefix shared by several calls is evaluated once and its state reused for
+each call-specific suffix (see utils/prefix_context.py). Requests go through a
+keep-alive connection pool with timeouts and retries (utils/http_pool.py), which
+the clients of all agents can share.
+
+Classes:
+
+- OllamaClient: Ollama model client.
+  - __init__(self, model, base_url, timeout, keep_alive, pool, **options): Client of a model.
+    - base_url (str): Ollama server address (default http://localhost:11434).
+    - timeout (float): Read timeout in seconds (of the client's own pool).
+    - keep_alive (str): How long Ollama keeps the model loaded after a request.
+    - pool (HTTPConnectionPool or EndpointPool): Shared connection pool of the server, or pool of several
+      servers (utils/endpoint_pool.py). Defaults to a pool of this client.
+    - options: Generation options (num_ctx, temperature, num_predict...).
+  - request(prompt, context, options, stream): Sends a generate request and returns the response object(s).
+  - prefill(prefix): Evaluates a prompt prefix only and returns its context state.
+  - generate_with_context(prompt, context): Generates the response to prompt following a context state.
+  - warm_up(): Loads the model (empty prompt) for keep_alive, on every server of the pool.
+  - unload(model): Unloads a model from the server(s) (keep_alive = 0).
+
+- OllamaError: Error returned by the server or raised by the connection.
+"""
+import http.client
+import json
+
+from utils.http_pool import HTTPConnectionPool, HTTPStatusError
+
+# Default Ollama server address
+DEFAULT_BASE_URL = "http://localhost:11434"
+
+# Default request timeout (seconds): long generations on CPU hosts take minutes
+DEFAULT_TIMEOUT = 600
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+class OllamaError(RuntimeError):
+    pass
+
+class Generation:
+    def __init__(self, text, generation_info=None):
+        self.text = text
+        self.generation_info = generation_info
+
+class GenerationResult:
+    def __init__(self, generations):
+        self.generations = generations
+
+def generation_info(response):
+    """
+    Returns the token counts and timings of a generate response (the fields langchain keeps).
+    """
+    return {key: value for key, value in response.items() if key not in ("response", "context", "model", "created_at")}
+
+class OllamaClient:
+    """
+    Client of an Ollama model using the generate API.
+    """
+    # The server returns the evaluated tokens ("context"), so prompt prefixes can be reused
+    supports_context = True
+
+    def __init__(self, model, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT, keep_alive=None, pool=None, **options):
+        self.model = model
+        self.pool = pool or HTTPConnectionPool(base_url, read_timeout=timeout)
+        self.base_url = self.pool.base_url
+        self.keep_alive = keep_alive
+        self.options = {key: value for key, value in options.items() if value is not None}
+
+    @property
+    def num_ctx(self):
+        return self.options.get("num_ctx")
+
+    @property
+    def num_predict(self):
+        return self.options.get("num_predict")
+
+    @property
+    def _default_params(self):
+        return {"model": self.model, "options": dict(self.options), "keep_alive": self.keep_alive}
+
+    def _payload(self, prompt, context=None, options=None, stream=False):
+        payload = {"model": self.model, "prompt": prompt, "stream": stream, "options": {**self.options, **(options or {})}}
+        if context is not None:
+            payload["context"] = context
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _open(self, path, payload, everywhere=False):
+        """
+        Sends a request to the pool. With everywhere, pools of several servers send it to all of
+        them and read the responses (nothing is returned then).
+        """
+        send = self.pool.request
+        if everywhere:
+            send = getattr(self.pool, "broadcast", send)
+        try:
+            return send("POST", path, json.dumps(payload).encode("utf-8"), JSON_HEADERS)
+        except HTTPStatusError as e:
+            raise OllamaError(f"Ollama returned HTTP {e.status} for {self.model}: {e.body}") from e
+        except (OSError, http.client.HTTPException) as e:
+            raise OllamaError(f"Could not reach Ollama at {self.base_url}: {e!r}") from e
+
+    def request(self, prompt, context=None, options=None, stream=False):
+        """
+        Sends a generate request.
+
+        Returns:
+            - dict: The response object, or an iterator of the streamed response objects when stream is True.
+        """
+        response = self._open("/api/generate", self._payload(prompt, context, options, stream))
+        if stream:
+            return self._stream_objects(response)
+        with response:
+            data = json.loads(response.read().decode("utf-8"))
+        if data.get("error"):
+            raise OllamaError(data["error"])
+        return data
+
+    def _stream_objects(self, response):
+        with response:
+            for line in response:
+                if not line.strip():
+                    continue
+                data = json.loads(line.decode("utf-8"))
+                if data.get("error"):
+                    raise OllamaError(data["error"])
+                yield data
+
+    def prefill(self, prefix):
+        """
+        Evaluates a prompt prefix without generating tokens. Ollama does not honor "num_predict" = 0
+        (it generates a full response, so no context is returned): see utils/prefix_context.py.
+
+        Returns:
+            - dict: The response object; its "context" is None when the server does not return
+              a reusable state (which includes responses that generated text).
+        """
+        data = self.request(prefix, options={"num_predict": 0})
+        if data.get("response"):
+            data["context"] = None
+        return data
+
+    def generate_with_context(self, prompt, context):
+        """
+        Generates the response to prompt as a continuation of a context state returned by prefill().
+
+        Returns:
+            - dict: The response object.
+        """
+        return self.request(prompt, context=context)
+
+    def warm_up(self):
+        """
+        Loads the model without generating (empty prompt), keeping it loaded for keep_alive.
+        """
+        self._send_everywhere(self._payload(""))
+
+    def unload(self, model=None):
+        """
+        Asks the server to unload a model (this one by default) right away (keep_alive = 0).
+        """
+        self._send_everywhere({"model": model or self.model, "prompt": "", "stream": False, "keep_alive": 0})
+
+    def _send_everywhere(self, payload):
+        response = self._open("/api/generate", payload, everywhere=True)
+        if response is not None:
+            with response:
+                response.read()
+
+    def invoke(self, prompt):
+        return self.request(prompt)["response"]
+
+    def generate(self, prompts):
+        generations = []
+        for prompt in prompts:
+            data = self.request(prompt)
+            generations.append([Generation(data["response"], generation_info(data))])
+        return GenerationResult(generations)
+
+    def stream(self, prompt):
+        for data in self.request(prompt, stream=True):
+            if data.get("response"):
+                yield data["response"]
+
+    def __repr__(self):
+        return f"OllamaClient({self.model}, {self.base_url})"
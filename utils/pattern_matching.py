@@ -1,5 +1,81 @@
 # utils/pattern_matching.py
 
+import re
+
+class FrozenDict(dict):
+    """
+    Read-only dictionary. It behaves (and prints) like a plain dict but cannot be modified.
+    """
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+class PatternMatch:
+    """
+    Result of a PatternSet match: the winning rule and its groups.
+    """
+    __slots__ = ("rule", "index", "text", "groups")
+
+    def __init__(self, rule, index, text, groups):
+        self.rule = rule        # Position of the winning rule in the set
+        self.index = index      # Index stored with the rule (group index or rule kind)
+        self.text = text        # Text matched by the winning pattern
+        self.groups = groups    # Groups of the winning pattern (group 1 first)
+
+    def group(self, number=0):
+        """
+        Returns a group of the winning pattern, numbered as in the pattern itself.
+        """
+        return self.groups[number - 1] if number else self.text
+
+    def __repr__(self):
+        return f"PatternMatch(rule={self.rule}, index={self.index}, groups={self.groups})"
+
+class PatternSet:
+    """
+    Ordered set of (pattern, index) rules compiled once and matched in a single pass.
+
+    match(text) returns the same result as trying re.search() with each pattern
+    in order and keeping the first one that matches: every pattern is wrapped in a
+    lookahead that searches it from the start of the text, and the alternation
+    stops at the first lookahead that succeeds. Patterns must not use numbered backreferences.
+    """
+    def __init__(self, rules, flags=0):
+        self.rules = tuple(rules)
+        self.compiled = tuple(re.compile(pattern, flags) for pattern, _ in self.rules)
+        self._spans = []
+        alternatives = []
+        group = 1
+        for compiled in self.compiled:
+            # The wrapper group holds the whole match, the pattern groups follow it
+            self._spans.append((group, compiled.groups))
+            alternatives.append(f"(?=(?s:.*?)({compiled.pattern}))")
+            group += 1 + compiled.groups
+        self._combined = re.compile("(?:" + "|".join(alternatives) + ")", flags)
+
+    def match(self, text):
+        """
+        Matches the text against all rules.
+
+        Returns:
+            - PatternMatch: Winning rule and its groups, or None if no rule matches.
+        """
+        combined_match = self._combined.match(text)
+        if combined_match is None:
+            return None
+        for rule, (wrapper_group, group_count) in enumerate(self._spans):
+            if combined_match.start(wrapper_group) != -1:
+                groups = combined_match.groups()[wrapper_group - 1:wrapper_group + group_count]
+                return PatternMatch(rule, self.rules[rule][1], groups[0], groups[1:])
+        return None
+
 class PatternMatching:
     """
     Class containing patterns for the matching operations.
@@ -70,35 +146,34 @@ class PatternMatching:
         List of common file comment styles for different programming languages
 
         Returns:
-            - object{}: List maping of comment styles.
-        """
-        comment_styles = {
-                'css': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'html': {'single': '', 'multi_start': '<!--', 'multi_end': '-->'},
-                'xml': {'single': '', 'multi_start': '<!--', 'multi_end': '-->'},
-                'c': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'cpp': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'java': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'js': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'ts': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'py': {'single': '#', 'multi_start': '"""', 'multi_end': '"""'},
-                'rb': {'single': '#', 'multi_start': '=begin', 'multi_end': '=end'},
-                'sh': {'single': '#', 'multi_start': '', 'multi_end': ''},
-                'php': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'go': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'swift': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'scala': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'lua': {'single': '--', 'multi_start': '--[[', 'multi_end': ']]'},
-                'vb': {'single': "'", 'multi_start': '', 'multi_end': ''},
-                'vbs': {'single': "'", 'multi_start': '', 'multi_end': ''},
-                'v': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
-                'vhd': {'single': '--', 'multi_start': '', 'multi_end': ''},
-                'fsharp': {'single': '//', 'multi_start': '(*', 'multi_end': '*)'},
-                'lisp': {'single': ';', 'multi_start': '#|', 'multi_end': '|#'},
-                # Adicione mais linguagens conforme necessário
-            }
-        return comment_styles
-    
+            - object{}: Frozen (read-only) maping of comment styles.
+        """
+        return COMMENT_STYLES
+
+    def filename_pattern_set(self):
+        """
+        Compiled set of the file name matching patterns with "#".
+        """
+        return FILENAME_PATTERNS
+
+    def filename_pattern_set_no_hashtag(self):
+        """
+        Compiled set of the file name matching patterns without "#".
+        """
+        return FILENAME_PATTERNS_NO_HASHTAG
+
+    def foldername_pattern_set(self):
+        """
+        Compiled set of the folder name matching patterns with "#".
+        """
+        return FOLDERNAME_PATTERNS
+
+    def language_extension_pattern(self):
+        """
+        Compiled pattern matching a file name with one of the known language extensions.
+        """
+        return LANGUAGE_EXTENSION_PATTERN
+
     def language_extensions_list(self):
         """
         List of common file extensions for different programming languages
@@ -115,6 +190,43 @@ class PatternMatching:
                 'xml'
             ]
         return language_extensions
-    
 
-    
\ No newline at end of file
+
+# Patterns compiled once at import time
+_pattern_matching = PatternMatching()
+FILENAME_PATTERNS = PatternSet(_pattern_matching.filename_matching_patterns())
+FILENAME_PATTERNS_NO_HASHTAG = PatternSet(_pattern_matching.filename_matching_patterns_no_hashtag())
+FOLDERNAME_PATTERNS = PatternSet(_pattern_matching.foldername_matching_patterns())
+
+# Matches filenames with extensions (e.g., filename.ext)
+# The extension must match one of the valid language extensions
+LANGUAGE_EXTENSION_PATTERN = re.compile(r'\b\w+\.(' + '|'.join(_pattern_matching.language_extensions_list()) + r')\b', re.IGNORECASE)
+
+# Frozen lookup table of comment styles per file extension
+COMMENT_STYLES = FrozenDict({
+    extension: FrozenDict(style) for extension, style in {
+        'css': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'html': {'single': '', 'multi_start': '<!--', 'multi_end': '-->'},
+        'xml': {'single': '', 'multi_start': '<!--', 'multi_end': '-->'},
+        'c': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'cpp': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'java': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'js': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'ts': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'py': {'single': '#', 'multi_start': '"""', 'multi_end': '"""'},
+        'rb': {'single': '#', 'multi_start': '=begin', 'multi_end': '=end'},
+        'sh': {'single': '#', 'multi_start': '', 'multi_end': ''},
+        'php': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'go': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'swift': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'scala': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'lua': {'single': '--', 'multi_start': '--[[', 'multi_end': ']]'},
+        'vb': {'single': "'", 'multi_start': '', 'multi_end': ''},
+        'vbs': {'single': "'", 'multi_start': '', 'multi_end': ''},
+        'v': {'single': '//', 'multi_start': '/*', 'multi_end': '*/'},
+        'vhd': {'single': '--', 'multi_start': '', 'multi_end': ''},
+        'fsharp': {'single': '//', 'multi_start': '(*', 'multi_end': '*)'},
+        'lisp': {'single': ';', 'multi_start': '#|', 'multi_end': '|#'},
+        # Adicione mais linguagens conforme necessário
+    }.items()
+})
@@ -0,0 +1,106 @@
+# utils/prefix_context.py
+"""
+prefix_context.py
+
+This file defines the store of evaluated prompt prefixes. Prompts sharing a large
+prefix (project properties and general report for the backlogs, generated code
+for the syntax and execution checks) are sent as prefix + suffix: the prefix is
+evaluated once by the model and the returned context state is reused for every
+suffix, so its tokens are not prefilled again. Models or servers that do not
+return a reusable state fall back to the full prompt.
+
+The store is off by default (CODEGENIES_PREFIX_CONTEXT): it relies on a server that
+evaluates a prompt without generating ("num_predict" = 0) and continues a context
+with the raw suffix, as the fake server does (benchmarks/fake_ollama_server.py).
+Ollama applies the chat template to the prefix and to the suffix as separate turns,
+and a "num_predict" that is not positive does not limit the generation.
+
+Classes:
+
+- PrefixContextStore: Thread-safe LRU store of prefix context states, shared by the agents.
+  - __init__(self, max_entries, min_prefix_chars): Store size and smallest prefix worth reusing.
+  - context(llm, prefix): Returns the context state of a prefix, evaluating it on first use (None when unavailable).
+  - record_fallback(): Counts a call sent as a full prompt because the state could not be used.
+  - stats(): Returns the prefill/reuse/fallback counters and the prefill tokens avoided.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Number of prefix states kept (each holds up to num_ctx token ids)
+DEFAULT_MAX_ENTRIES = 32
+
+# Prefixes shorter than this are sent with the prompt (a separate prefill would cost more)
+DEFAULT_MIN_PREFIX_CHARS = 1024
+
+class PrefixContextStore:
+    """
+    Context states of evaluated prompt prefixes, keyed by model, options and prefix.
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, min_prefix_chars=DEFAULT_MIN_PREFIX_CHARS):
+        self.max_entries = max_entries
+        self.min_prefix_chars = min_prefix_chars
+        self.prefills = 0
+        self.reuses = 0
+        self.fallbacks = 0
+        self.tokens_avoided = 0
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def usable(self, llm, prefix):
+        """
+        Tells whether a prompt with this prefix should be sent as prefix + suffix.
+        """
+        return bool(prefix) and len(prefix) >= self.min_prefix_chars and getattr(llm, "supports_context", False)
+
+    def _key(self, llm, prefix):
+        options = json.dumps(getattr(llm, "_default_params", {}), sort_keys=True, default=str)
+        return hashlib.sha256(f"{llm.model}\0{options}\0{prefix}".encode("utf-8")).hexdigest()
+
+    def context(self, llm, prefix):
+        """
+        Returns the context state of the prefix: the first caller evaluates it, concurrent
+        callers wait for that evaluation and later callers reuse the stored state.
+
+        Returns:
+            - list: The context state, or None when the server did not return a reusable one.
+        """
+        key = self._key(llm, prefix)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    if entry["context"] is not None:
+                        self.reuses += 1
+                        self.tokens_avoided += entry["tokens"]
+                    return entry["context"]
+            data = llm.prefill(prefix)
+            entry = {"context": data.get("context") or None, "tokens": data.get("prompt_eval_count") or 0}
+            with self._lock:
+                self.prefills += 1
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            return entry["context"]
+
+    def forget(self, llm, prefix):
+        """
+        Drops the state of a prefix the server refused, so the next call evaluates it again.
+        """
+        with self._lock:
+            self._entries.pop(self._key(llm, prefix), None)
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def stats(self):
+        with self._lock:
+            return {"prefills": self.prefills, "reuses": self.reuses, "fallbacks": self.fallbacks,
+                    "tokens_avoided": self.tokens_avoided}
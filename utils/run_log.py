@@ -0,0 +1,145 @@
+# utils/run_log.py
+"""
+run_log.py
+
+This file defines the sinks used to record a run while it is executing:
+the human-readable console log, written incrementally with line-buffered I/O and
+optional size-based rotation, and an optional structured JSONL event stream. Both
+are flushed at the end of every line, so a crash or a kill does not lose the tail
+of the log.
+
+Functions:
+
+- text_preview(text, limit): Truncated preview of a text with its hash and size.
+- text_digest(text): Short sha256 digest of a text.
+- set_event_log(event_log): Installs the process-wide event stream (None disables it).
+- emit_event(event, **fields): Writes an event to the installed event stream, if any.
+
+Classes:
+
+- RunLog: File-like log sink with line-buffered writes and rotation.
+  - __init__(self, path, max_bytes, backup_count, append): Opens the log file.
+    - max_bytes (int): Size that triggers the rotation (0 disables it).
+    - backup_count (int): Number of rotated files kept (path.1, path.2, ...).
+    - append (bool): Continues an existing log (resumed runs) instead of replacing it.
+
+- EventLog: JSONL event stream.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Line buffering: every complete line is handed to the OS at once
+LOG_BUFFERING = 1
+
+def text_digest(text):
+    """
+    Returns a short sha256 digest identifying a text.
+    """
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()[:12]
+
+def text_preview(text, limit):
+    """
+    Returns a preview of the text truncated to limit characters, followed by its hash and size.
+    """
+    if text is None:
+        return str(text)
+    text = str(text)
+    body = text if len(text) <= limit else f"{text[:limit]}... [+{len(text) - limit} chars]"
+    return f"{body} [sha256:{text_digest(text)}, {len(text)} chars]"
+
+class RunLog:
+    """
+    Log sink written incrementally to disk, so a crash keeps everything logged so far
+    and the log does not have to be held in memory.
+    """
+    def __init__(self, path, max_bytes=0, backup_count=3, append=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8', buffering=LOG_BUFFERING)
+        self._size = self._file.tell()
+
+    def write(self, message):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(message)
+            self._size += len(message)
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def _rotate(self):
+        """
+        Moves path to path.1 (path.1 to path.2, ...) and starts a new file.
+        Must be called with self._lock held.
+        """
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, 'w', encoding='utf-8', buffering=LOG_BUFFERING)
+        self._size = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class EventLog:
+    """
+    Structured event stream: one JSON object per line.
+    """
+    def __init__(self, path, append=False):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8', buffering=LOG_BUFFERING)
+
+    def emit(self, event, **fields):
+        record = {"time": time.time(), "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+# Process-wide event stream (None disables the events)
+_event_log = None
+
+def set_event_log(event_log):
+    """
+    Installs the process-wide event stream. None disables it.
+    """
+    global _event_log
+    _event_log = event_log
+
+def emit_event(event, **fields):
+    """
+    Writes an event to the installed event stream, if any.
+    """
+    if _event_log is not None:
+        _event_log.emit(event, **fields)
@@ -0,0 +1,153 @@
+# utils/stage_scheduler.py
+"""
+stage_scheduler.py
+
+This file defines a small scheduler that runs the pipeline stages of a project
+as a directed acyclic graph. Each stage starts as soon as all the stages it
+depends on are finished, so independent stages run concurrently.
+
+Classes:
+
+- Stage: A named unit of work and the names of the stages it depends on.
+- StageScheduler: Runs the stages and records their timings.
+  - __init__(self, max_workers): Initializes the scheduler.
+    - max_workers (int): Maximum number of stages running at the same time.
+
+  - add_stage(name, func, dependencies): Registers a stage.
+    - func (callable): Receives the dict of finished stage results and returns the stage result.
+  - run(): Runs all stages and returns their results.
+  - critical_path(): Returns the chain of stages that determined the total run time.
+  - report_lines(): Returns the per-stage timing report.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from utils.tracing import span
+
+class Stage:
+    def __init__(self, name, func, dependencies=()):
+        self.name = name
+        self.func = func
+        self.dependencies = tuple(dependencies)
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    def __repr__(self):
+        return f"Stage({self.name}, dependencies={list(self.dependencies)})"
+
+class StageScheduler:
+    """
+    Runs a DAG of stages, starting each stage as soon as its inputs exist.
+    """
+    def __init__(self, max_workers=4):
+        self.max_workers = max(1, max_workers)
+        self.stages = {}
+        self.results = {}
+        self.run_started_at = None
+        self.run_finished_at = None
+        self._lock = threading.Lock()
+
+    def add_stage(self, name, func, dependencies=()):
+        """
+        Registers a stage. Dependencies must be registered before the stage itself.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        for dependency in dependencies:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+        self.stages[name] = Stage(name, func, dependencies)
+
+    def _run_stage(self, stage):
+        with self._lock:
+            inputs = dict(self.results)
+        stage.started_at = time.perf_counter()
+        try:
+            with span(stage.name, "stage"):
+                return stage.func(inputs)
+        finally:
+            stage.finished_at = time.perf_counter()
+
+    def run(self):
+        """
+        Runs all registered stages.
+
+        Returns:
+            - dict: Result of every stage, keyed by stage name.
+        """
+        pending = dict(self.stages)
+        running = {}
+        self.run_started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while pending or running:
+                    # Submit every stage whose dependencies are finished (in registration order)
+                    for name in list(pending):
+                        stage = pending[name]
+                        if all(dependency in self.results for dependency in stage.dependencies):
+                            running[executor.submit(self._run_stage, stage)] = stage
+                            del pending[name]
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage = running.pop(future)
+                        result = future.result()
+                        with self._lock:
+                            self.results[stage.name] = result
+            except BaseException:
+                # Do not start new stages, let the running ones finish and propagate the error
+                for future in running:
+                    future.cancel()
+                raise
+            finally:
+                self.run_finished_at = time.perf_counter()
+        return self.results
+
+    def critical_path(self):
+        """
+        Returns the chain of stages that determined the total wall-clock time:
+        starting from the last stage to finish, it follows the dependency that
+        finished last at each step.
+
+        Returns:
+            - list: Stages of the critical path, in execution order.
+        """
+        finished = [stage for stage in self.stages.values() if stage.finished_at is not None]
+        if not finished:
+            return []
+        stage = max(finished, key=lambda s: s.finished_at)
+        path = [stage]
+        while stage.dependencies:
+            stage = max((self.stages[d] for d in stage.dependencies), key=lambda s: s.finished_at or 0.0)
+            path.append(stage)
+        return list(reversed(path))
+
+    def report_lines(self):
+        """
+        Returns the timing report of the run: start offset and wall-clock time
+        of every stage, total run time and the critical path.
+
+        Returns:
+            - list: Report lines.
+        """
+        lines = []
+        for stage in sorted(self.stages.values(), key=lambda s: s.started_at or float("inf")):
+            if stage.started_at is None:
+                lines.append(f"  {stage.name:<24} not executed")
+                continue
+            offset = stage.started_at - self.run_started_at
+            lines.append(f"  {stage.name:<24} start +{offset:8.2f}s  wall {stage.duration:8.2f}s")
+        if self.run_started_at is not None and self.run_finished_at is not None:
+            total = self.run_finished_at - self.run_started_at
+            serial = sum(stage.duration for stage in self.stages.values())
+            lines.append(f"  total wall {total:.2f}s (sum of stages {serial:.2f}s)")
+        path = self.critical_path()
+        if path:
+            path_time = sum(stage.duration for stage in path)
+            lines.append(f"  critical path ({path_time:.2f}s): " + " -> ".join(stage.name for stage in path))
+        return lines
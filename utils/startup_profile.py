@@ -0,0 +1,91 @@
+# utils/startup_profile.py
+"""
+startup_profile.py
+
+This file defines the startup profile of a run (python main.py --profile-startup),
+which reports where the cold start goes:
+
+- the wall time of each startup phase (imports of main.py, translations, __pycache__
+  cleanup, deferred imports of the model stack and of the interactive prompts);
+- the slowest imports, measured by a fresh interpreter with "python -X importtime"
+  (modules imported directly by the profiled ones, with their cumulative times).
+
+Classes:
+
+- StartupProfile: Wall times of the startup phases.
+  - phase(name): Context manager timing a phase.
+  - record(name, seconds): Records a phase timed elsewhere.
+  - summary_lines(): Returns the report of the phases.
+
+Functions:
+
+- import_times(modules, cwd, max_depth): Imports modules in a fresh interpreter with -X importtime
+  and returns the self and cumulative times of each import, slowest first.
+- import_time_lines(imports, top): Returns the report of the slowest imports.
+"""
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+# "import time:       self [us] |  cumulative | imported package" lines of -X importtime
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+class StartupProfile:
+    """
+    Wall times of the startup phases, in the order they ran.
+    """
+    def __init__(self):
+        self.phases = []
+
+    def record(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started_at)
+
+    def summary_lines(self):
+        total = sum(seconds for _, seconds in self.phases) or 1e-9
+        lines = [f"  {name:<44} {seconds * 1000:9.1f} ms {100 * seconds / total:5.1f}%" for name, seconds in self.phases]
+        lines.append(f"  {'total':<44} {total * 1000:9.1f} ms")
+        return lines
+
+def import_times(modules, cwd=None, max_depth=1):
+    """
+    Imports modules in a fresh interpreter with "python -X importtime".
+
+    Args:
+        - modules (list): Names of the modules to import.
+        - cwd (str): Working directory of the interpreter (the project root).
+        - max_depth (int): Deepest import level reported (0 = the modules themselves, 1 = their direct imports).
+
+    Returns:
+        - list: (module, self seconds, cumulative seconds, depth) of each import, slowest first.
+          Modules that fail to import are reported up to the failure.
+    """
+    statement = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        # One space at the top level, two more for each nested import
+        depth = (len(match.group(3)) - 1) // 2
+        if depth <= max_depth:
+            imports.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6, depth))
+    return sorted(imports, key=lambda item: item[2], reverse=True)
+
+def import_time_lines(imports, top=15):
+    """
+    Returns the report of the slowest imports (see import_times()).
+    """
+    return [f"  {module:<44} self {self_seconds * 1000:8.1f} ms  cumulative {cumulative * 1000:8.1f} ms"
+            for module, self_seconds, cumulative, _ in imports[:top]]
@@ -0,0 +1,317 @@
+# utils/static_checks.py
+"""
+static_checks.py
+
+This file defines the local syntax checks of the generated files, run before the
+model is asked to check their syntax (see Developer.test_code). Each file is
+checked with the tooling available in the standard library:
+
+- Python: compile() (syntax errors, including the ones found while compiling, such as
+  "return" outside a function);
+- JSON: json.loads();
+- JavaScript, TypeScript, CSS, Java, C-like languages: bracket balance, skipping strings,
+  comments and (JavaScript) regular expression literals;
+- HTML: stray closing tags and unclosed elements, plus the bracket balance of the
+  inline scripts and styles.
+
+Only the errors of real parsers (Python and JSON) are certain. The bracket and tag checks
+are heuristics (a quote in HTML text or a regular expression they misread is reported as
+an error), so their findings are hints given to the model check rather than failures.
+Files of other languages, including JSX and TSX (whose markup text is not code), are not
+checked locally (the model check is still needed for them).
+
+Classes:
+
+- StaticCheckResult: Result of a set of files.
+  - issues (list): "file:line:column: message" of each parser error found (certain errors).
+  - hints (list): "file:line:column: message" of each heuristic finding (possible errors).
+  - unchecked (list): Files without a local checker.
+  - clean: True when every file was checked and nothing was found.
+
+- StaticChecker: Checks the files and counts the model calls saved (thread-safe counters).
+  - check_files(files): Checks a {filename: code} dictionary. Returns a StaticCheckResult.
+  - record_saved_calls(count): Counts model calls avoided thanks to the checks.
+  - stats(): Returns the file and saved call counters.
+
+Functions:
+
+- check_source(filename, code): Returns the errors of a file (list), or None without a local checker.
+- is_heuristic(filename): Tells whether the errors of check_source are heuristic findings.
+"""
+import json
+import os
+import threading
+from html.parser import HTMLParser
+
+# Extensions checked by a real parser: their errors are certain
+PARSER_EXTENSIONS = {".py", ".pyw", ".json"}
+
+# Extensions checked by bracket balance, and the ones whose "/" may start a regular expression literal.
+# JSX and TSX are left out: the text of their markup ("{item.name}'s item") is not code
+BRACKET_EXTENSIONS = {".js", ".mjs", ".cjs", ".ts", ".css", ".scss", ".java", ".c", ".h", ".cpp",
+                      ".hpp", ".cs", ".go", ".kt", ".swift"}
+REGEX_EXTENSIONS = {".js", ".mjs", ".cjs", ".ts"}
+HTML_EXTENSIONS = {".html", ".htm"}
+
+# Characters after which a "/" starts a regular expression literal rather than a division
+REGEX_PRECEDING = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+# Keywords after which a "/" starts a regular expression literal
+REGEX_KEYWORDS = {"return", "typeof", "case", "yield", "await", "in", "of", "delete", "void", "throw", "new", "else", "do"}
+
+# Languages without "//" line comments ("//" appears in their URLs)
+NO_LINE_COMMENT_EXTENSIONS = {".css"}
+
+BRACKET_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+# HTML elements without a closing tag, or whose closing tag may be omitted
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source",
+                 "track", "wbr", "!doctype"}
+OPTIONAL_CLOSE_ELEMENTS = {"p", "li", "dt", "dd", "tr", "td", "th", "thead", "tbody", "tfoot", "option", "optgroup",
+                           "colgroup", "caption", "html", "head", "body", "rt", "rp"}
+
+def _location(filename, line, column, message):
+    return f"{filename}:{line}:{column}: {message}"
+
+def check_python(filename, code):
+    try:
+        compile(code, filename, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return [_location(filename, e.lineno or 0, e.offset or 0, e.msg)]
+    except ValueError as e:
+        # Null bytes in the source
+        return [_location(filename, 0, 0, str(e))]
+    return []
+
+def check_json(filename, code):
+    try:
+        json.loads(code)
+    except json.JSONDecodeError as e:
+        return [_location(filename, e.lineno, e.colno, e.msg)]
+    return []
+
+def _starts_regex(code, index, previous):
+    """
+    Tells whether the "/" at index starts a regular expression literal (JavaScript).
+    """
+    if previous in REGEX_PRECEDING:
+        return True
+    if not previous.isalpha():
+        return False
+    start = index
+    while start > 0 and code[start - 1].isspace():
+        start -= 1
+    end = start
+    while start > 0 and (code[start - 1].isalnum() or code[start - 1] in "_$"):
+        start -= 1
+    return code[start:end] in REGEX_KEYWORDS
+
+def check_brackets(filename, code, regex_literals=False, first_line=1, line_comments=True):
+    """
+    Checks that the brackets of C-like code are balanced, skipping strings, comments and
+    (with regex_literals) regular expression literals.
+    """
+    stack = []
+    issues = []
+    line = first_line
+    line_start = 0
+    previous = ""   # Last significant character
+    index = 0
+    length = len(code)
+    while index < length:
+        character = code[index]
+        if character == "\n":
+            line += 1
+            line_start = index + 1
+            index += 1
+            continue
+        if character.isspace():
+            index += 1
+            continue
+        pair = code[index:index + 2]
+        if pair == "//" and line_comments:
+            end = code.find("\n", index)
+            index = length if end == -1 else end
+            continue
+        if pair == "/*":
+            end = code.find("*/", index + 2)
+            end = length if end == -1 else end + 2
+            line += code.count("\n", index, end)
+            if "\n" in code[index:end]:
+                line_start = code.rfind("\n", index, end) + 1
+            index = end
+            continue
+        if character in "\"'`" or (character == "/" and regex_literals and _starts_regex(code, index, previous)):
+            # Strings (template literals may span lines) and regular expressions: skip to the closing quote
+            quote = character
+            index += 1
+            while index < length and code[index] != quote:
+                if code[index] == "\\":
+                    index += 1
+                elif code[index] == "\n":
+                    if quote != "`":
+                        break
+                    line += 1
+                    line_start = index + 1
+                index += 1
+            if index < length and code[index] == quote:
+                index += 1
+            previous = quote
+            continue
+        if character in "([{":
+            stack.append((character, line, index - line_start + 1))
+        elif character in ")]}":
+            if not stack or stack[-1][0] != BRACKET_PAIRS[character]:
+                issues.append(_location(filename, line, index - line_start + 1, f"unexpected '{character}'"))
+                return issues
+            stack.pop()
+        previous = character
+        index += 1
+    for bracket, bracket_line, column in stack:
+        issues.append(_location(filename, bracket_line, column, f"'{bracket}' is never closed"))
+    return issues
+
+class _HTMLChecker(HTMLParser):
+    def __init__(self, filename):
+        super().__init__(convert_charrefs=True)
+        self.filename = filename
+        self.stack = []
+        self.issues = []
+        self._embedded = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        self.stack.append((tag, self.getpos()))
+        if tag in ("script", "style"):
+            self._embedded = tag
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_data(self, data):
+        if self._embedded is not None and data.strip():
+            self.issues.extend(check_brackets(self.filename, data, regex_literals=self._embedded == "script",
+                                              first_line=self.getpos()[0], line_comments=self._embedded == "script"))
+
+    def handle_endtag(self, tag):
+        self._embedded = None
+        if tag in VOID_ELEMENTS:
+            return
+        open_tags = [name for name, _ in self.stack]
+        if tag not in open_tags:
+            line, column = self.getpos()
+            self.issues.append(_location(self.filename, line, column + 1, f"closing tag </{tag}> without an opening tag"))
+            return
+        # Elements left open inside this one must allow an omitted closing tag
+        while self.stack:
+            name, (line, column) = self.stack.pop()
+            if name == tag:
+                break
+            if name not in OPTIONAL_CLOSE_ELEMENTS:
+                self.issues.append(_location(self.filename, line, column + 1, f"<{name}> is never closed"))
+
+    def finish(self):
+        self.close()
+        for name, (line, column) in self.stack:
+            if name not in OPTIONAL_CLOSE_ELEMENTS:
+                self.issues.append(_location(self.filename, line, column + 1, f"<{name}> is never closed"))
+        return self.issues
+
+def check_html(filename, code):
+    checker = _HTMLChecker(filename)
+    checker.feed(code)
+    return checker.finish()
+
+def check_source(filename, code):
+    """
+    Checks the syntax of a file with the local tooling of its language.
+
+    Returns:
+        - list: The errors found ("file:line:column: message"), or None when the language has no local checker.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".py", ".pyw"):
+        return check_python(filename, code)
+    if extension == ".json":
+        return check_json(filename, code)
+    if extension in HTML_EXTENSIONS:
+        return check_html(filename, code)
+    if extension in BRACKET_EXTENSIONS:
+        return check_brackets(filename, code, regex_literals=extension in REGEX_EXTENSIONS,
+                              line_comments=extension not in NO_LINE_COMMENT_EXTENSIONS)
+    return None
+
+def is_heuristic(filename):
+    """
+    Tells whether the errors found by check_source in a file are heuristic findings (bracket
+    balance, HTML tags) rather than the errors of a real parser.
+    """
+    return os.path.splitext(filename)[1].lower() not in PARSER_EXTENSIONS
+
+class StaticCheckResult:
+    __slots__ = ("issues", "hints", "unchecked", "files")
+
+    def __init__(self, issues, unchecked, files, hints=()):
+        self.issues = issues
+        self.hints = list(hints)
+        self.unchecked = unchecked
+        self.files = files
+
+    @property
+    def clean(self):
+        return bool(self.files) and not self.issues and not self.hints and not self.unchecked
+
+class StaticChecker:
+    """
+    Local syntax checks of the generated files, with counters shared by the developers of a run.
+    """
+    def __init__(self):
+        self.files_checked = 0
+        self.files_with_errors = 0
+        self.files_with_hints = 0
+        self.files_unchecked = 0
+        self.llm_calls_saved = 0
+        self._lock = threading.Lock()
+
+    def check_files(self, files):
+        """
+        Checks generated files.
+
+        Args:
+            - files (dict): Code of each file name.
+
+        Returns:
+            - StaticCheckResult: Parser errors, heuristic findings and files without a local checker.
+        """
+        issues = []
+        hints = []
+        unchecked = []
+        errors = 0
+        flagged = 0
+        for filename, code in files.items():
+            file_issues = check_source(str(filename), code if isinstance(code, str) else str(code))
+            if file_issues is None:
+                unchecked.append(filename)
+            elif file_issues and is_heuristic(str(filename)):
+                flagged += 1
+                hints.extend(file_issues)
+            elif file_issues:
+                errors += 1
+                issues.extend(file_issues)
+        with self._lock:
+            self.files_checked += len(files) - len(unchecked)
+            self.files_unchecked += len(unchecked)
+            self.files_with_errors += errors
+            self.files_with_hints += flagged
+        return StaticCheckResult(issues, unchecked, list(files), hints)
+
+    def record_saved_calls(self, count):
+        with self._lock:
+            self.llm_calls_saved += count
+
+    def stats(self):
+        with self._lock:
+            return {"files_checked": self.files_checked, "files_with_errors": self.files_with_errors,
+                    "files_with_hints": self.files_with_hints, "files_unchecked": self.files_unchecked,
+                    "llm_calls_saved": self.llm_calls_saved}
@@ -0,0 +1,329 @@
+# utils/test_runner.py
+"""
+test_runner.py
+
+This file defines the sandboxed runner of the generated Python tests. Instead of
+asking the model to imagine the execution of the code and its tests, the generated
+files are written to a temporary directory and the tests are run by pytest (or
+unittest when pytest is not installed) in a separate Python process with:
+
+- CPU time, address space, file size and open file limits (resource.setrlimit, set by a
+  bootstrap script inside the child process; not available on Windows);
+- a wall-clock timeout, after which the whole process group is killed;
+- an isolated interpreter (-I) with a minimal environment, running in the temporary directory.
+
+The limits protect the run from runaway code (infinite loops, memory hogs); they are
+not a security boundary (the tests can still reach the network and the file system).
+
+At most max_workers test processes run at the same time, whichever developer threads
+request them. The bootstrap writes the results as JSON, so passed and failed tests,
+with their error messages, are reported in a structured way. Only the test files
+(test_*.py and *_test.py) are collected; a run collecting no test is not a result,
+so the execution check is left to the model.
+
+Classes:
+
+- SandboxRunResult: Result of a test run (status, passed count, failures, output, seconds).
+  - ok: True when the tests ran and all of them passed.
+  - summary(): Execution report sent to the model.
+  - failure_lines(): One line per failed test.
+
+- SandboxedTestRunner: Runs the tests of generated files.
+  - __init__(self, max_workers, cpu_seconds, memory_mb, wall_seconds, python)
+  - run(files): Runs the tests of a {filename: code} dictionary. Returns a SandboxRunResult,
+    or None when the files have no Python test files or no test was collected.
+  - record_saved_calls(count): Counts model calls avoided thanks to the runs.
+  - stats(): Returns the run counters.
+
+Functions:
+
+- has_python_tests(files): Tells whether generated files contain Python test files.
+"""
+import importlib.util
+import json
+import os
+import posixpath
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_CPU_SECONDS = 30
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_WALL_SECONDS = 60
+
+# Largest file the tests may write (bytes) and number of open files
+MAX_FILE_BYTES = 64 * 1024 * 1024
+MAX_OPEN_FILES = 256
+
+# Characters of output and of each failure message kept in the results
+MAX_OUTPUT_CHARS = 4000
+MAX_MESSAGE_CHARS = 1500
+
+BOOTSTRAP_FILE = "_sandbox_bootstrap.py"
+
+# Runs inside the sandboxed process: applies the limits, runs the tests and writes the JSON report
+BOOTSTRAP = r'''
+import json, os, sys
+settings = json.loads(sys.argv[1])
+try:
+    import resource
+    for name, value in settings["limits"].items():
+        limit = getattr(resource, name, None)
+        if limit is not None:
+            try:
+                # The CPU soft limit sends SIGXCPU, the hard one a second later SIGKILL
+                resource.setrlimit(limit, (value, value + 1 if name == "RLIMIT_CPU" else value))
+            except (ValueError, OSError):
+                pass
+except ImportError:
+    pass
+
+root = settings["root"]
+sys.path[:0] = settings["path"]
+results = {"passed": 0, "failures": []}
+
+def failure(test, message):
+    results["failures"].append({"test": test, "message": message[-settings["message_chars"]:]})
+
+if settings["framework"] == "pytest":
+    import pytest
+
+    class Collector:
+        # pytest passes the hook arguments by name
+        def pytest_runtest_logreport(self, report):
+            if report.when == "call" and report.passed:
+                results["passed"] += 1
+            elif report.failed:
+                failure(report.nodeid, report.longreprtext)
+
+        def pytest_collectreport(self, report):
+            if report.failed:
+                failure(report.nodeid or "collection", report.longreprtext)
+
+    pytest.main([root, "-q", "-p", "no:cacheprovider", "--rootdir", root, "-o", "python_files=test_*.py *_test.py"],
+                plugins=[Collector()])
+else:
+    import unittest
+    suite = unittest.TestSuite(unittest.defaultTestLoader.discover(root, pattern=pattern, top_level_dir=root)
+                               for pattern in ("test_*.py", "*_test.py"))
+    result = unittest.TextTestRunner(stream=sys.stderr, verbosity=1).run(suite)
+    for test, trace in result.failures + result.errors:
+        failure(str(test), trace)
+    results["passed"] = result.testsRun - len(result.failures) - len(result.errors) - len(result.skipped)
+
+with open(settings["report"], "w", encoding="utf-8") as f:
+    json.dump(results, f)
+'''
+
+class SandboxRunResult:
+    __slots__ = ("status", "passed", "failures", "output", "seconds")
+
+    def __init__(self, status, passed=0, failures=None, output="", seconds=0.0):
+        self.status = status        # "passed", "failed", "timeout", "error" or "empty" (no test collected)
+        self.passed = passed
+        self.failures = failures or []
+        self.output = output
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.status == "passed"
+
+    def failure_lines(self):
+        lines = []
+        for failure in self.failures:
+            message = failure["message"].strip().splitlines()
+            # pytest marks the error lines with "E", unittest ends its traceback with the error
+            errors = [line[1:].strip() for line in message if line.startswith("E ")]
+            detail = " ".join(errors) if errors else (message[-1] if message else "failed")
+            lines.append(f"{failure['test']}: {detail}")
+        if self.status in ("timeout", "error") and not self.failures:
+            lines.append(self.output.strip().splitlines()[-1] if self.output.strip() else self.status)
+        return lines
+
+    def summary(self):
+        """
+        Returns the execution report of the tests, with the full messages of the failures.
+        """
+        lines = [f"Test execution ({self.status}): {self.passed} passed, {len(self.failures)} failed, {self.seconds:.1f}s"]
+        for failure in self.failures:
+            lines.append(f"FAILED {failure['test']}\n{failure['message'].strip()}")
+        if self.status in ("timeout", "error"):
+            lines.append(self.output.strip())
+        return "\n".join(lines)
+
+def _safe_path(filename):
+    """
+    Relative path of a generated file inside the sandbox directory (absolute paths and ".." are dropped).
+    """
+    path = posixpath.normpath(str(filename).replace('\\', '/').lstrip('/'))
+    parts = [part for part in path.split('/') if part not in ('', '.', '..')]
+    return os.path.join(*parts) if parts else None
+
+def _is_test_file(filename):
+    """
+    Tells whether a file is collected by the test run (test_*.py or *_test.py).
+    """
+    name = os.path.basename(str(filename))
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+def has_python_tests(files):
+    """
+    Tells whether generated files contain Python test files.
+    """
+    return any(_is_test_file(filename) for filename in files)
+
+class SandboxedTestRunner:
+    """
+    Runs generated Python tests in resource-limited subprocesses.
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, cpu_seconds=DEFAULT_CPU_SECONDS, memory_mb=DEFAULT_MEMORY_MB,
+                 wall_seconds=DEFAULT_WALL_SECONDS, python=None):
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.wall_seconds = wall_seconds
+        self.python = python or sys.executable
+        self.framework = "pytest" if importlib.util.find_spec("pytest") is not None else "unittest"
+        self.runs = 0
+        self.passed_runs = 0
+        self.failed_runs = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.empty_runs = 0
+        self.seconds = 0.0
+        self.llm_calls_saved = 0
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+        self._lock = threading.Lock()
+
+    def _write_files(self, root, files):
+        """
+        Writes the Python files (and data files) to the sandbox. Returns the directories holding Python files.
+        """
+        directories = {root}
+        for filename, code in files.items():
+            path = _safe_path(filename)
+            if path is None:
+                continue
+            full_path = os.path.join(root, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(code)
+            if full_path.endswith(".py"):
+                directories.add(os.path.dirname(full_path))
+        return sorted(directories)
+
+    def _limits(self):
+        limits = {"RLIMIT_FSIZE": MAX_FILE_BYTES, "RLIMIT_NOFILE": MAX_OPEN_FILES}
+        if self.cpu_seconds:
+            limits["RLIMIT_CPU"] = int(self.cpu_seconds)
+        if self.memory_mb:
+            limits["RLIMIT_AS"] = int(self.memory_mb) * 1024 * 1024
+        return limits
+
+    def run(self, files):
+        """
+        Runs the tests of generated files in a sandboxed subprocess.
+
+        Args:
+            - files (dict): Code of each file name.
+
+        Returns:
+            - SandboxRunResult: The result, or None when the files have no Python test files or
+              the run collected no test (the execution check is then left to the model).
+        """
+        if not has_python_tests(files):
+            return None
+        with self._slots:
+            result = self._run(files)
+        with self._lock:
+            self.runs += 1
+            self.seconds += result.seconds
+            if result.status == "passed":
+                self.passed_runs += 1
+            elif result.status == "failed":
+                self.failed_runs += 1
+            elif result.status == "timeout":
+                self.timeouts += 1
+            elif result.status == "empty":
+                self.empty_runs += 1
+            else:
+                self.errors += 1
+        return None if result.status == "empty" else result
+
+    def _run(self, files):
+        started_at = time.perf_counter()
+        sandbox = tempfile.mkdtemp(prefix="codegenies_tests_")
+        try:
+            root = os.path.join(sandbox, "project")
+            os.makedirs(root)
+            python_path = self._write_files(root, files)
+            bootstrap = os.path.join(sandbox, BOOTSTRAP_FILE)
+            with open(bootstrap, "w", encoding="utf-8") as f:
+                f.write(BOOTSTRAP)
+            report_path = os.path.join(sandbox, "report.json")
+            settings = {"root": root, "path": python_path, "report": report_path, "framework": self.framework,
+                        "limits": self._limits(), "message_chars": MAX_MESSAGE_CHARS}
+            env = {"PATH": os.environ.get("PATH", ""), "HOME": sandbox, "TMPDIR": sandbox, "PYTHONDONTWRITEBYTECODE": "1",
+                   "PYTHONHASHSEED": "0", "PYTHONIOENCODING": "utf-8"}
+            # -I ignores PYTHONPATH and the user site: the bootstrap adds the sandbox directories to sys.path
+            command = [self.python, "-I", bootstrap, json.dumps(settings)]
+            process = subprocess.Popen(command, cwd=root, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, start_new_session=hasattr(os, "killpg"))
+            try:
+                output, _ = process.communicate(timeout=self.wall_seconds or None)
+            except subprocess.TimeoutExpired:
+                self._kill(process)
+                output, _ = process.communicate()
+                output = output.decode("utf-8", errors="replace")[-MAX_OUTPUT_CHARS:]
+                return SandboxRunResult("timeout", output=f"{output}\nTimed out after {self.wall_seconds}s",
+                                     seconds=time.perf_counter() - started_at)
+            output = output.decode("utf-8", errors="replace")[-MAX_OUTPUT_CHARS:]
+            seconds = time.perf_counter() - started_at
+            try:
+                with open(report_path, encoding="utf-8") as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                reason = self._exit_reason(process.returncode)
+                return SandboxRunResult("error", output=f"{output}\n{reason}".strip(), seconds=seconds)
+            if report["failures"]:
+                status = "failed"
+            else:
+                status = "passed" if report["passed"] else "empty"
+            return SandboxRunResult(status, report["passed"], report["failures"], output, seconds)
+        finally:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+    @staticmethod
+    def _kill(process):
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+                return
+            except OSError:
+                pass
+        process.kill()
+
+    @staticmethod
+    def _exit_reason(returncode):
+        if returncode is not None and returncode < 0:
+            signal_number = -returncode
+            if signal_number == getattr(signal, "SIGXCPU", None):
+                return "CPU time limit exceeded"
+            if signal_number == getattr(signal, "SIGKILL", None):
+                return "Killed (CPU time or memory limit exceeded)"
+            return f"Terminated by signal {signal_number}"
+        return f"Exited with code {returncode} without a report"
+
+    def record_saved_calls(self, count):
+        with self._lock:
+            self.llm_calls_saved += count
+
+    def stats(self):
+        with self._lock:
+            return {"runs": self.runs, "passed": self.passed_runs, "failed": self.failed_runs, "timeouts": self.timeouts,
+                    "errors": self.errors, "empty": self.empty_runs, "seconds": self.seconds, "llm_calls_saved": self.llm_calls_saved}
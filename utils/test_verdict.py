@@ -0,0 +1,92 @@
+# utils/test_verdict.py
+"""
+test_verdict.py
+
+This file defines the deterministic verdict of the syntax and execution check
+results (see Developer.test_code). When every result clearly passes or clearly
+fails, the verdict is known without asking the model to evaluate the results.
+A result is clear when it only holds passing phrases ("no syntax errors",
+"all tests passed", "5 passed", "OK") or only failing ones (Python exceptions,
+tracebacks, "FAILED", "2 failed"), in English or Portuguese. Results holding both
+kinds of phrases, or none, are ambiguous and left to the model, like passing phrases
+that are negated or hedged ("not all tests passed", "no errors were found, but...",
+a question).
+
+Functions:
+
+- parse_verdict(text): Returns "success", "fail" or None (ambiguous) for a check result.
+- combined_verdict(verdicts): Returns "success" when all the verdicts pass, "fail" when all are
+  clear and one fails, or None when one is ambiguous.
+"""
+import re
+
+PASS_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+        r"\bno (syntax |runtime |execution )?(errors?|issues|problems) (were |was )?(found|detected)\b",
+        r"\bwithout (any )?(syntax )?errors\b",
+        r"\b(the )?(syntax|code) (is|looks) (correct|valid)\b",
+        r"\ball (the )?(\d+ )?tests? (passed|succeeded|pass)\b",
+        r"\btests? passed successfully\b",
+        r"^\s*OK\b",
+        r"\b[1-9]\d* passed\b",
+        r"\bnenhum (erro|problema)( de sintaxe)? (foi )?(encontrado|detectado)\b",
+        r"\bsem erros\b",
+        r"\b(a )?sintaxe (está )?(correta|válida)\b",
+        r"\btodos os (\d+ )?testes passaram\b",
+    )
+]
+
+FAIL_PATTERNS = [
+    re.compile(pattern, re.MULTILINE) for pattern in (
+        r"\b[A-Z][a-z]+(Error|Exception)\b",
+        r"\bTraceback \(most recent call last\)",
+        r"\bFAILED\b",
+        r"\b[1-9]\d* (failed|failures?|errors?)\b",
+        r"\bFAILED \((failures|errors)=\d+",
+        r"(?i)\btests? (failed|falhou|falharam)\b",
+        r"(?i)\b(erro|erros) de (sintaxe|execução)\b",
+    )
+]
+
+# Phrases negating an error, which must not count as failures ("No SyntaxError", "0 failed", "nenhum erro de sintaxe")
+NEGATED_FAILURE_PATTERN = re.compile(r"\b(?i:no|without|sem|nenhum)\s+[A-Z][a-z]+(Error|Exception)\b|\b0 (failed|failures?|errors?)\b|"
+                                     r"(?i:\b(nenhum|sem) (erro|erros) de (sintaxe|execução)\b)")
+
+# Words negating or qualifying a passing phrase ("not all tests passed", "..., but line 3 fails", a question)
+HEDGE_PATTERN = re.compile(r"\bnot (all|every)\b|\b(but|however|although|except)\b|\?|"
+                           r"\bnem (todos|todas)\b|\b(mas|porém|entretanto|contudo|exceto)\b|\bno entanto\b",
+                           re.IGNORECASE)
+
+def parse_verdict(text):
+    """
+    Reads the verdict of a syntax or execution check result.
+
+    Args:
+        - text (str): Result returned by the model (or by a local check).
+
+    Returns:
+        - str: "success" or "fail" when the result is clear, None when it is ambiguous.
+    """
+    if not text or not text.strip():
+        return None
+    passing = any(pattern.search(text) for pattern in PASS_PATTERNS)
+    unnegated = NEGATED_FAILURE_PATTERN.sub("", text)
+    failing = any(pattern.search(unnegated) for pattern in FAIL_PATTERNS)
+    if passing and not failing:
+        return None if HEDGE_PATTERN.search(text) else "success"
+    if failing and not passing:
+        return "fail"
+    return None
+
+def combined_verdict(verdicts):
+    """
+    Combines the verdicts of the check results.
+
+    Returns:
+        - str: "success" when every result passes, "fail" when every result is clear and one fails,
+          None when a result is ambiguous.
+    """
+    verdicts = list(verdicts)
+    if not verdicts or None in verdicts:
+        return None
+    return "success" if all(verdict == "success" for verdict in verdicts) else "fail"
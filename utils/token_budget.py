@@ -0,0 +1,261 @@
+# utils/token_budget.py
+"""
+token_budget.py
+
+This file defines the token budget of the prompts sent to the models. Prompts
+made of fixed templates plus large context (project properties, reports) can
+grow past the context window of the model (num_ctx), which Ollama truncates
+silently. The budget estimates the prompt tokens for each model and, when a
+prompt does not fit, compacts its context parts step by step: boilerplate
+removal and deduplication first, then a summary of the largest parts (made once
+and reused), and a truncation marked with "[...]" as the last resort.
+
+Functions:
+
+- estimate_prompt_tokens(text, model): Token count estimate for a model.
+- record_token_count(model, chars, tokens): Calibrates the estimates with a count reported by the model.
+- compact_text(text): Removes boilerplate, decoration and repeated paragraphs or sentences.
+
+Classes:
+
+- TokenBudget: Prompt token budget of a model.
+  - __init__(self, llm, max_prompt_tokens, compaction, summarizer): Budget of the prompts sent to llm.
+    - max_prompt_tokens (int): Prompt budget. 0 uses the model context (num_ctx) minus the response tokens.
+    - compaction (bool): When False, prompts over the budget are only reported.
+    - summarizer (callable): summarizer(text, max_tokens) returns a summary of the text, or None.
+  - fit(before, context, after, separator): Returns the prompt and its CompactionResult.
+
+- CompactionResult: Tokens of a prompt before and after compaction and the steps applied.
+"""
+import hashlib
+import math
+import re
+import threading
+
+# Context window used by Ollama when the model has no num_ctx option
+DEFAULT_CONTEXT_TOKENS = 2048
+
+# Tokens kept for the response when the model has no num_predict option
+DEFAULT_RESPONSE_TOKENS = 1024
+
+# Tokens kept for the instructions of a summary request
+SUMMARY_INSTRUCTION_TOKENS = 128
+
+# Characters per token of the model families (rough averages for English and Portuguese text)
+CHARS_PER_TOKEN = (("llama3", 4.2), ("phi3", 3.6), ("deepseek", 3.8), ("codegemma", 4.0))
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Token counts reported by the models, per model: [prompt characters, prompt tokens]
+_observed = {}
+_observed_lock = threading.Lock()
+
+# Lines without content: separators and empty markdown decoration
+DECORATION_LINE = re.compile(r'^\s*(?:[-=_*#~`|]{3,}|[#*>]+)\s*$')
+# Chat boilerplate the models add around their reports
+BOILERPLATE_LINE = re.compile(
+    r"^\s*(?:sure|certainly|of course|here is|here's|i hope this|let me know|feel free|"
+    r"claro|certamente|aqui está|espero que|fique à vontade|qualquer dúvida)\b.*$", re.IGNORECASE)
+# Markdown emphasis markers and heading prefixes (the text is kept)
+EMPHASIS = re.compile(r'\*\*|__|^#{1,6}\s+', re.MULTILINE)
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+# Sentences shorter than this are never considered repetitions
+MIN_DEDUPLICATED_SENTENCE = 24
+
+def _chars_per_token(model):
+    with _observed_lock:
+        observed = _observed.get(model)
+    if observed and observed[1] > 0:
+        return observed[0] / observed[1]
+    name = (model or "").lower()
+    for family, ratio in CHARS_PER_TOKEN:
+        if family in name:
+            return ratio
+    return DEFAULT_CHARS_PER_TOKEN
+
+def estimate_prompt_tokens(text, model=None):
+    """
+    Estimates the tokens of a text for a model, from the characters per token of its
+    family or, once the model reported real counts, from the observed ratio.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / _chars_per_token(model))
+
+def record_token_count(model, chars, tokens):
+    """
+    Records the prompt token count reported by a model (Ollama's prompt_eval_count).
+    Counts far from any plausible ratio (e.g. prompts partly served from the model's
+    own cache) are ignored.
+    """
+    if not tokens or not chars or not 2.0 <= chars / tokens <= 6.0:
+        return
+    with _observed_lock:
+        observed = _observed.setdefault(model, [0, 0])
+        observed[0] += chars
+        observed[1] += tokens
+
+def _normalized(text):
+    return " ".join(text.lower().split())
+
+def compact_text(text):
+    """
+    Removes what does not carry information: chat boilerplate, separator lines,
+    markdown emphasis, repeated blank lines and spaces, and paragraphs or sentences
+    repeated verbatim (ignoring case and spacing).
+    """
+    paragraphs = []
+    seen = set()
+    for paragraph in re.split(r'\n\s*\n', EMPHASIS.sub('', text)):
+        lines = []
+        for line in paragraph.splitlines():
+            if DECORATION_LINE.match(line) or BOILERPLATE_LINE.match(line):
+                continue
+            line = " ".join(line.split())
+            if line:
+                lines.append(line)
+        if not lines:
+            continue
+        kept_lines = []
+        for line in lines:
+            sentences = []
+            for sentence in SENTENCE_END.split(line):
+                key = _normalized(sentence)
+                if len(key) >= MIN_DEDUPLICATED_SENTENCE:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                sentences.append(sentence)
+            if sentences:
+                kept_lines.append(" ".join(sentences))
+        if kept_lines:
+            paragraphs.append("\n".join(kept_lines))
+    return "\n\n".join(paragraphs)
+
+def _truncate(text, max_chars):
+    """
+    Cuts a text at a line or word boundary and marks the cut.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars - 6)]
+    boundary = max(cut.rfind('\n'), cut.rfind(' '))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return f"{cut.rstrip()}\n[...]"
+
+class CompactionResult:
+    __slots__ = ("original_tokens", "tokens", "limit", "steps", "context")
+
+    def __init__(self, original_tokens, limit):
+        self.original_tokens = original_tokens
+        self.tokens = original_tokens
+        self.limit = limit
+        self.steps = []
+        self.context = []       # Context parts of the final prompt
+
+    @property
+    def saved_tokens(self):
+        return self.original_tokens - self.tokens
+
+    @property
+    def over_budget(self):
+        return self.tokens > self.limit
+
+    def __repr__(self):
+        return f"CompactionResult({self.original_tokens} -> {self.tokens} tokens, limit={self.limit}, steps={self.steps})"
+
+class TokenBudget:
+    """
+    Prompt token budget of a model, with the context compaction used to respect it.
+    """
+    def __init__(self, llm, max_prompt_tokens=0, compaction=True, summarizer=None):
+        self.model = getattr(llm, "model", llm.__class__.__name__)
+        context_tokens = getattr(llm, "num_ctx", None) or DEFAULT_CONTEXT_TOKENS
+        response_tokens = getattr(llm, "num_predict", None)
+        if not response_tokens or response_tokens < 0:
+            response_tokens = DEFAULT_RESPONSE_TOKENS
+        self.limit = max_prompt_tokens or context_tokens - min(response_tokens, context_tokens // 2)
+        self.compaction = compaction
+        self.summarizer = summarizer
+        self.saved_tokens = 0
+        self._summaries = {}
+        self._summary_locks = {}
+        self._lock = threading.Lock()
+
+    def settings(self):
+        """
+        Settings that change the compacted prompts (part of the stage fingerprints).
+        """
+        return {"prompt_token_budget": self.limit, "context_compaction": self.compaction}
+
+    def estimate(self, text):
+        return estimate_prompt_tokens(text, self.model)
+
+    def _summary(self, text, max_tokens):
+        """
+        Summarizes a context part once: concurrent prompts sharing the same part
+        wait for the first summary instead of requesting their own.
+        """
+        key = (hashlib.sha256(text.encode("utf-8")).hexdigest(), max_tokens)
+        with self._lock:
+            key_lock = self._summary_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._summaries:
+                self._summaries[key] = self.summarizer(text, max_tokens)
+            return self._summaries[key]
+
+    def fit(self, before=(), context=(), after=(), separator="\n\n"):
+        """
+        Builds the prompt before + context + after, compacting the context parts when
+        the prompt exceeds the budget. A prompt within the budget is returned unchanged.
+
+        Args:
+            - before, after (list): Fixed parts (templates and instructions), never compacted.
+            - context (list): Context parts (properties, reports) that may be compacted.
+
+        Returns:
+            - tuple: (prompt, CompactionResult)
+        """
+        before, context, after = list(before), list(context), list(after)
+
+        def build(parts):
+            return separator.join(before + parts + after)
+
+        prompt = build(context)
+        result = CompactionResult(self.estimate(prompt), self.limit)
+        result.context = context
+        if not result.over_budget or not self.compaction:
+            return prompt, result
+
+        fixed_tokens = self.estimate(build([]))
+        steps = [("compact", lambda part, share: compact_text(part))]
+        if self.summarizer is not None:
+            steps.append(("summary", self._summarized))
+        steps.append(("truncate", lambda part, share: _truncate(part, int(share * _chars_per_token(self.model)))))
+        for step_name, step in steps:
+            # Context tokens left for each part, in proportion to its current size
+            available = max(0, self.limit - fixed_tokens)
+            total = sum(self.estimate(part) for part in context) or 1
+            compacted = []
+            for part in context:
+                share = available * self.estimate(part) // total
+                compacted.append(step(part, share) if self.estimate(part) > share or step_name == "compact" else part)
+            context = compacted
+            result.context = context
+            result.steps.append(step_name)
+            prompt = build(context)
+            result.tokens = self.estimate(prompt)
+            if not result.over_budget:
+                break
+        with self._lock:
+            self.saved_tokens += result.saved_tokens
+        return prompt, result
+
+    def _summarized(self, part, share):
+        # The text to summarize must fit the model context as well
+        source = _truncate(part, int(max(0, self.limit - SUMMARY_INSTRUCTION_TOKENS) * _chars_per_token(self.model)))
+        summary = self._summary(source, share)
+        # A failed or longer summary keeps the part as it was
+        if not summary or self.estimate(summary) >= self.estimate(part):
+            return part
+        return summary
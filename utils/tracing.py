@@ -0,0 +1,193 @@
+# utils/tracing.py
+"""
+tracing.py
+
+This file defines the latency tracing layer of a run. Spans record the wall
+time of the LLM calls, agent methods, task graph operations and pipeline stages
+together with their attributes (agent, model, prompt/response sizes, cache status).
+They are exported as Chrome trace-event JSON (chrome://tracing, Perfetto) and
+summarized in a p50/p95 table.
+
+Functions:
+
+- set_tracer(tracer): Installs the process-wide tracer (None disables tracing).
+- get_tracer(): Returns the installed tracer or None.
+- span(name, category, **attributes): Context manager recording a span in the installed tracer.
+- traced(name, category): Decorator recording a span around each call of a function.
+- estimate_tokens(text): Rough token count of a text (4 characters per token).
+
+Classes:
+
+- Span: A timed operation with its attributes.
+- Tracer: Thread-safe span recorder.
+  - export_chrome_trace(path): Writes the spans as Chrome trace events.
+  - summary_lines(): Returns the p50/p95 table per stage and per model.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+def estimate_tokens(text):
+    """
+    Rough token count of a text, used when the model does not report it (about 4 characters per token).
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+class Span:
+    __slots__ = ("name", "category", "started_at", "finished_at", "thread_id", "attributes")
+
+    def __init__(self, name, category, attributes):
+        self.name = name
+        self.category = category
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        """
+        Adds attributes to the span (e.g. response size once it is known).
+        """
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self):
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def __repr__(self):
+        return f"Span({self.category}:{self.name}, {self.duration:.3f}s)"
+
+class Tracer:
+    """
+    Records the spans of a run.
+    """
+    def __init__(self):
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category, **attributes):
+        current_span = Span(name, category, attributes)
+        try:
+            yield current_span
+        except Exception as e:
+            current_span.set(error=str(e))
+            raise
+        finally:
+            current_span.finished_at = time.perf_counter()
+            with self._lock:
+                self.spans.append(current_span)
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the spans as Chrome trace-event JSON ("X" complete events, microseconds).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        process_id = os.getpid()
+        events = []
+        for recorded_span in spans:
+            events.append({
+                "name": recorded_span.name,
+                "cat": recorded_span.category,
+                "ph": "X",
+                "ts": round((recorded_span.started_at - self.origin) * 1e6, 1),
+                "dur": round(recorded_span.duration * 1e6, 1),
+                "pid": process_id,
+                "tid": recorded_span.thread_id,
+                "args": recorded_span.attributes,
+            })
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def summary_lines(self):
+        """
+        Returns the latency table: count, total, p50 and p95 per span (category and name)
+        and, for the LLM calls, per model.
+
+        Returns:
+            - list: Table lines.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        groups = {}
+        for recorded_span in spans:
+            groups.setdefault(f"{recorded_span.category}:{recorded_span.name}", []).append(recorded_span.duration)
+            if recorded_span.category == "llm" and recorded_span.attributes.get("model"):
+                groups.setdefault(f"model:{recorded_span.attributes['model']}", []).append(recorded_span.duration)
+
+        lines = [f"  {'span':<48} {'count':>6} {'total':>10} {'p50':>9} {'p95':>9}"]
+        for key in sorted(groups, key=lambda k: -sum(groups[k])):
+            durations = groups[key]
+            lines.append(f"  {key[:48]:<48} {len(durations):>6} {sum(durations):>9.2f}s "
+                         f"{percentile(durations, 0.5):>8.2f}s {percentile(durations, 0.95):>8.2f}s")
+        return lines
+
+# Process-wide tracer (None disables tracing)
+_tracer = None
+
+def set_tracer(tracer):
+    """
+    Installs the process-wide tracer. None disables tracing.
+    """
+    global _tracer
+    _tracer = tracer
+
+def get_tracer():
+    return _tracer
+
+class _NoSpan:
+    """
+    Span used while tracing is disabled: accepts attributes and records nothing.
+    """
+    def set(self, **attributes):
+        pass
+
+@contextmanager
+def span(name, category, **attributes):
+    """
+    Records a span in the installed tracer, if any.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield _NoSpan()
+        return
+    with tracer.span(name, category, **attributes) as current_span:
+        yield current_span
+
+def traced(name, category):
+    """
+    Decorator recording a span around each call of the function. For methods,
+    the agent name is added to the span attributes.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attributes = {}
+            agent_name = getattr(args[0], "name", None) if args else None
+            if isinstance(agent_name, str):
+                attributes["agent"] = agent_name
+            with span(name, category, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,7 +1,86 @@
 # utils/translation_utils.py
+"""
+translation_utils.py
 
+This file loads the l18n translation files into a process-wide, read-only
+catalog. Every file is read once (lazily on first use, or eagerly with
+preload_translations()), so lookups are plain dictionary accesses with no file I/O.
+
+Functions:
+
+- load_translations(module_name, language): Returns the translations of a module for a language.
+- translate_string(module_name, key, language): Translates a key, returning the key itself if not found.
+- preload_translations(): Loads every l18n/**/*.json file at once.
+"""
 import os
 import json
+import glob
+import threading
+from types import MappingProxyType
+
+# Root folder of the translation files
+L18N_DIR = os.path.join(os.path.dirname(__file__), "..", "l18n")
+
+# Process-wide catalog: module name -> read-only {language: read-only {key: text}}
+_catalog = {}
+_catalog_lock = threading.Lock()
+
+_EMPTY = MappingProxyType({})
+
+def _translations_file(module_name):
+    """
+    Returns the path of the translation file of a module.
+    """
+    if "main" in module_name:
+        return os.path.join(L18N_DIR, f"{module_name}.json")
+    elif "prompts" in module_name:
+        return os.path.join(L18N_DIR, "agents", "prompt-templates", f"{module_name}.json")
+    else:
+        return os.path.join(L18N_DIR, "agents", f"{module_name}.json")
+
+def _read_translations_file(translations_file):
+    """
+    Reads a translation file from disk.
+    """
+    with open(translations_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _freeze(translations):
+    """
+    Turns the {language: {key: text}} dictionary of a module into read-only mappings.
+    """
+    return MappingProxyType({language: MappingProxyType(texts) for language, texts in translations.items()})
+
+def _module_catalog(module_name):
+    """
+    Returns the catalog entry of a module, loading its file on first use.
+    """
+    module_translations = _catalog.get(module_name)
+    if module_translations is None:
+        with _catalog_lock:
+            module_translations = _catalog.get(module_name)
+            if module_translations is None:
+                module_translations = _freeze(_read_translations_file(_translations_file(module_name)))
+                _catalog[module_name] = module_translations
+    return module_translations
+
+def preload_translations():
+    """
+    Loads all translation files into the catalog.
+
+    Returns:
+    - int: Number of modules in the catalog.
+    """
+    modules = {}
+    for translations_file in sorted(glob.glob(os.path.join(L18N_DIR, "**", "*.json"), recursive=True)):
+        module_name = os.path.splitext(os.path.basename(translations_file))[0]
+        modules[module_name] = _read_translations_file(translations_file)
+
+    with _catalog_lock:
+        for module_name, translations in modules.items():
+            _catalog[module_name] = _freeze(translations)
+
+    return len(_catalog)
 
 def load_translations(module_name, language):
     """
@@ -12,31 +91,22 @@ def load_translations(module_name, language):
     - language (str): Language code ("pt-br" or "en-us").
 
     Returns:
-    - dict: Translations dictionary for the specified module and language.
+    - Mapping: Read-only translations for the specified module and language.
     """
-    base_dir = os.path.dirname(__file__)
-    if "main" in module_name:
-        translations_file = os.path.join(base_dir, f"../l18n/{module_name}.json")
-    elif "prompts" in module_name:
-        translations_file = os.path.join(base_dir, f"../l18n/agents/prompt-templates/{module_name}.json")
-    else:
-        translations_file = os.path.join(base_dir, f"../l18n/agents/{module_name}.json")
-    with open(translations_file, "r", encoding="utf-8") as f:
-        translations = json.load(f)
-    # Return translations for the specified language, default to empty dictionary if not found
-    return translations.get(language, {})  
+    # Return translations for the specified language, default to empty mapping if not found
+    return _module_catalog(module_name).get(language, _EMPTY)
 
 def translate_string(module_name, key, language):
     """
     Translate the given string key based on the selected language.
-    
+
     Args:
     - key (str): Key to translate.
     - language (str): Language code ("pt-br" or "en-us").
-    
+
     Returns:
     - str: Translated string if available, otherwise returns the original key.
     """
     translations = load_translations(module_name, language)
     # Return the translation if found, otherwise return the original key
-    return translations.get(key, key)
\ No newline at end of file
+    return translations.get(key, key)
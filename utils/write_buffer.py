@@ -0,0 +1,184 @@
+# utils/write_buffer.py
+"""
+write_buffer.py
+
+This file defines the staging buffer used to write the generated code files.
+Contributions of every task touching a file are merged in memory (ordered set
+of headers plus code body) and each file is written once, atomically, when the
+task graph is finished or when the buffer grows past its memory threshold.
+
+Functions:
+
+- file_lock(path): Returns the lock that serializes writes to a file path.
+- read_text_file(path): Reads a text file (utf-8 with iso-8859-1 fallback).
+- write_file_atomically(path, content): Writes a file through a temporary file and a rename.
+
+Classes:
+
+- StagedWriteBuffer: Per-path staging buffer.
+  - __init__(self, split_headers, max_bytes): Initializes the buffer.
+    - split_headers (callable): Splits code into (header_lines, code_lines).
+    - max_bytes (int): Buffered bytes that trigger a flush of all files.
+
+  - add(path, content): Merges a contribution into the staged file.
+  - flush(): Writes every staged file and returns the failures.
+  - flushes (int): Number of flushes so far (including the ones triggered by max_bytes).
+"""
+import os
+import tempfile
+import threading
+
+# Default memory threshold of the staging buffer (64 MB)
+DEFAULT_MAX_BUFFERED_BYTES = 64 * 1024 * 1024
+
+# Process umask, read once at import (os.umask() can only be read by setting it, which is not thread-safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Registry of per-file locks used when several tasks write the same path
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+def file_lock(path):
+    """
+    Returns the lock that serializes writes to the given file path.
+    """
+    key = os.path.abspath(path)
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = threading.Lock()
+        return lock
+
+def read_text_file(path):
+    """
+    Reads a text file as utf-8, falling back to iso-8859-1.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(path, 'r', encoding='iso-8859-1') as f:
+            return f.read()
+
+def write_file_atomically(path, content):
+    """
+    Writes the file to a temporary file in the same folder and renames it over
+    the target, so readers never see a partially written file. The file keeps the
+    mode of the file it replaces; a new file gets the mode open() would give it.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temporary_path, mode)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+class StagedFile:
+    """
+    Staged content of one file: ordered header set and code body parts.
+    """
+    __slots__ = ("headers", "header_set", "code_parts", "size")
+
+    def __init__(self):
+        self.headers = []
+        self.header_set = set()
+        self.code_parts = []
+        self.size = 0
+
+    def add(self, header_lines, code_lines):
+        added = 0
+        for header in header_lines:
+            if header not in self.header_set:
+                self.header_set.add(header)
+                self.headers.append(header)
+                added += len(header) + 1
+        code = '\n'.join(code_lines).strip()
+        if code:
+            self.code_parts.append(code)
+            added += len(code) + 1
+        self.size += added
+        return added
+
+    def render(self):
+        final_content = '\n'.join(self.headers).strip()
+        for code in self.code_parts:
+            final_content += '\n' + code
+        return final_content.strip()
+
+class StagedWriteBuffer:
+    """
+    Accumulates the generated code per output path and flushes each file once.
+    """
+    def __init__(self, split_headers, max_bytes=DEFAULT_MAX_BUFFERED_BYTES):
+        self.split_headers = split_headers
+        self.max_bytes = max_bytes
+        self.files = {}
+        self.buffered_bytes = 0
+        self.files_written = 0
+        self.flushes = 0
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def _staged_file(self, path):
+        staged_file = self.files.get(path)
+        if staged_file is None:
+            staged_file = self.files[path] = StagedFile()
+            # Files already on disk keep their content, new contributions are merged after it
+            if os.path.exists(path):
+                header_lines, code_lines = self.split_headers(read_text_file(path))
+                staged_file.headers = list(header_lines)
+                staged_file.header_set = set(header_lines)
+                self.buffered_bytes += staged_file.add([], code_lines)
+        return staged_file
+
+    def add(self, path, content):
+        """
+        Merges generated code into the staged file: new headers are added after the
+        existing ones (without duplicates) and the code after the existing code.
+
+        Args:
+            - path (str): Path of the output file.
+            - content (str): Cleaned code to be added to the file.
+        """
+        header_lines, code_lines = self.split_headers(content)
+        with self._lock:
+            self.buffered_bytes += self._staged_file(path).add(header_lines, code_lines)
+            over_threshold = self.buffered_bytes > self.max_bytes
+        if over_threshold:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every staged file atomically and empties the buffer. Files touched
+        again afterwards are merged with their written content.
+
+        Returns:
+            - list: (path, error) of the files that could not be written.
+        """
+        with self._lock:
+            files = self.files
+            self.files = {}
+            self.buffered_bytes = 0
+            self.flushes += 1
+        failures = []
+        for path, staged_file in files.items():
+            try:
+                with file_lock(path):
+                    write_file_atomically(path, staged_file.render())
+                self.files_written += 1
+            except Exception as e:
+                failures.append((path, e))
+        self.failures.extend(failures)
+        return failures